@@ -0,0 +1,92 @@
+"""
+Symmetry augmentation of spread simulation samples.
+
+The spread dynamics are (approximately) symmetric under the 8 rotations and
+reflections of the square grid, provided the wind direction is transformed
+along with the grid. Applying a random one of these dihedral transforms to
+each training sample gives up to 8 variants of every simulated sequence.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+# Number of dihedral transforms of the square grid. Transform t reflects the
+# rows when t >= 4 and then rotates by (t % 4) * 90 degrees counter-clockwise.
+DIHEDRAL_TRANSFORMS = 8
+
+# Channel holding the wind direction as a fraction of a full turn. The
+# simulation moves downwind by (cos, sin) of 2 * pi * direction in (row, col).
+WIND_DIRECTION_CHANNEL = 3
+
+
+def dihedral_transform(
+    states: np.ndarray,
+    transform: int,
+    wind_channel: Optional[int] = WIND_DIRECTION_CHANNEL
+) -> np.ndarray:
+    """
+    Rotate and/or reflect states, remapping the wind direction to match.
+    
+    A rotation by 90 degrees turns the wind by a quarter turn and a row
+    reflection maps direction d to 0.5 - d, so wind keeps pointing at the
+    same (transformed) cells.
+    
+    Args:
+        states: States (..., H, W, F) on a square grid
+        transform: Dihedral transform index in [0, DIHEDRAL_TRANSFORMS)
+        wind_channel: Feature index of the wind direction (None to leave features as they are)
+        
+    Returns:
+        Transformed copy of the states (the states themselves for transform 0)
+    """
+    if not 0 <= transform < DIHEDRAL_TRANSFORMS:
+        raise ValueError(f"Dihedral transform must be in [0, {DIHEDRAL_TRANSFORMS}), got {transform}")
+    if transform == 0:
+        return states
+    
+    reflect, quarter_turns = transform >= 4, transform % 4
+    
+    transformed = np.flip(states, axis=-3) if reflect else states
+    transformed = np.array(np.rot90(transformed, k=quarter_turns, axes=(-3, -2)))
+    
+    if wind_channel is not None and transformed.shape[-1] > wind_channel:
+        wind = transformed[..., wind_channel]
+        if reflect:
+            wind = 0.5 - wind
+        transformed[..., wind_channel] = np.mod(wind + 0.25 * quarter_turns, 1)
+    
+    return transformed
+
+
+def augment_batch(
+    X: np.ndarray,
+    y: np.ndarray,
+    rng: np.random.Generator,
+    wind_channel: Optional[int] = WIND_DIRECTION_CHANNEL
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Apply an independent random dihedral transform to every sample of a batch.
+    
+    Each input sequence and its target get the same transform. Samples are
+    transformed in groups sharing a transform, so a batch costs at most
+    DIHEDRAL_TRANSFORMS array operations.
+    
+    Args:
+        X: Input sequences (batch, time_steps, H, W, F)
+        y: Targets (batch, H, W, F)
+        rng: Random generator choosing the transforms
+        wind_channel: Feature index of the wind direction
+        
+    Returns:
+        Tuple of augmented (X, y) arrays
+    """
+    transforms = rng.integers(0, DIHEDRAL_TRANSFORMS, size=len(X))
+    X_augmented, y_augmented = np.empty_like(X), np.empty_like(y)
+    
+    for transform in np.unique(transforms):
+        idx = np.flatnonzero(transforms == transform)
+        X_augmented[idx] = dihedral_transform(X[idx], int(transform), wind_channel)
+        y_augmented[idx] = dihedral_transform(y[idx], int(transform), wind_channel)
+    
+    return X_augmented, y_augmented
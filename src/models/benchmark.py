@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the AgriDefender pathogen spread simulation and prediction code.
+"""
+
+import os
+import sys
+import time
+import argparse
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+
+# Add project root to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.models.data_generator import (
+    DEFAULT_DTYPE,
+    SIMULATION_ENGINES,
+    generate_initial_state,
+    generate_synthetic_dataset,
+    simulate_spread
+)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+def benchmark_simulation_engines(
+    grid_sizes: List[int],
+    time_steps: int = 5,
+    threat_type: str = 'FUNGAL',
+    engines: Optional[List[str]] = None,
+    repeats: int = 1,
+    random_seed: int = 42,
+    dtype: str = DEFAULT_DTYPE
+) -> List[Dict[str, float]]:
+    """
+    Time simulate_spread for each engine and grid size.
+
+    Args:
+        grid_sizes: Spatial dimensions to benchmark
+        time_steps: Number of time steps per simulation
+        threat_type: Threat type to simulate
+        engines: Simulation engines to compare (defaults to all)
+        repeats: Number of runs per configuration (the fastest is reported)
+        random_seed: Random seed for the initial state and simulation
+        dtype: dtype to simulate in
+
+    Returns:
+        List of result rows with grid size, engine, seconds and max difference
+        from the first engine (only meaningful for the deterministic radial pattern)
+    """
+    if engines is None:
+        engines = list(SIMULATION_ENGINES)
+
+    results = []
+
+    for spatial_dim in grid_sizes:
+        initial_state = generate_initial_state(
+            spatial_dim=spatial_dim,
+            concentration=0.7,
+            num_points=3,
+            random_seed=random_seed,
+            dtype=dtype
+        )
+
+        reference = None
+        for engine in engines:
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                sequence = simulate_spread(
+                    initial_state=initial_state,
+                    time_steps=time_steps,
+                    threat_type=threat_type,
+                    engine=engine,
+                    rng=np.random.default_rng(random_seed),
+                    dtype=dtype
+                )
+                timings.append(time.perf_counter() - start)
+
+            if reference is None:
+                reference = sequence
+            max_diff = float(np.max(np.abs(sequence - reference)))
+
+            results.append({
+                'grid_size': spatial_dim,
+                'engine': engine,
+                'seconds': min(timings),
+                'max_diff': max_diff
+            })
+            logger.info(f"{engine} engine at {spatial_dim}x{spatial_dim}: "
+                        f"{min(timings):.3f}s for {time_steps} steps (max diff {max_diff:.2e})")
+
+    return results
+
+
+def benchmark_dataset_generation(
+    dataset_size: int,
+    batch_sizes: List[Optional[int]],
+    spatial_dim: int = 32,
+    time_steps: int = 7,
+    random_seed: int = 42
+) -> List[Dict[str, float]]:
+    """
+    Time generate_synthetic_dataset with per-sample and batched simulation.
+
+    Args:
+        dataset_size: Number of samples to generate
+        batch_sizes: Simulation batch sizes to compare (None for one simulation per sample)
+        spatial_dim: Spatial dimension of the grid
+        time_steps: Number of time steps in each sequence
+        random_seed: Random seed for the dataset
+
+    Returns:
+        List of result rows with batch size, seconds and samples per second
+    """
+    results = []
+
+    for batch_size in batch_sizes:
+        np.random.seed(random_seed)
+        start = time.perf_counter()
+        generate_synthetic_dataset(
+            dataset_size=dataset_size,
+            spatial_dim=spatial_dim,
+            time_steps=time_steps,
+            batch_size=batch_size
+        )
+        seconds = time.perf_counter() - start
+
+        results.append({
+            'batch_size': batch_size or 1,
+            'seconds': seconds,
+            'samples_per_second': dataset_size / seconds
+        })
+        logger.info(f"Batch size {batch_size or 1}: {seconds:.3f}s ({dataset_size / seconds:.1f} samples/s)")
+
+    return results
+
+
+def benchmark_inference_latency(
+    batch_sizes: List[int],
+    spatial_dim: int = 32,
+    time_steps: int = 7,
+    features: int = 5,
+    lstm_units: int = 64,
+    rollout_steps: int = 200,
+    warmup_steps: int = 5,
+    random_seed: int = 42
+) -> List[Dict[str, float]]:
+    """
+    Compare the per-step latency of a rollout with model.predict and with the compiled inference path.
+
+    Args:
+        batch_sizes: Numbers of outbreaks rolled out together
+        spatial_dim: Spatial dimension of the grid
+        time_steps: Number of input time steps of the model
+        features: Number of features per grid cell
+        lstm_units: Number of LSTM units of the (untrained) model
+        rollout_steps: Timed rollout steps per configuration
+        warmup_steps: Untimed steps run first
+        random_seed: Random seed for the inputs
+
+    Returns:
+        List of result rows with batch size, path and the p50 and p99 step latency in milliseconds
+    """
+    # Imported here so the simulation benchmarks do not need TensorFlow
+    from src.models.spread_prediction import INPUT_DTYPE, PathogenSpreadModel
+
+    model = PathogenSpreadModel(spatial_dim=spatial_dim, time_steps=time_steps, features=features,
+                                lstm_units=lstm_units)
+    paths = {
+        'predict': lambda inputs: model.model.predict(inputs, verbose=0),
+        'compiled': lambda inputs: model._inference_fn(inputs).numpy()
+    }
+
+    rng = np.random.default_rng(random_seed)
+    results = []
+
+    for batch_size in batch_sizes:
+        inputs = rng.random((batch_size, time_steps, spatial_dim, spatial_dim, features)).astype(INPUT_DTYPE)
+
+        for path, step in paths.items():
+            timings = []
+            for k in range(warmup_steps + rollout_steps):
+                start = time.perf_counter()
+                # One rollout step: predict the next frame and feed it back
+                next_frame = step(inputs)
+                inputs[:, :-1] = inputs[:, 1:]
+                inputs[:, -1] = next_frame
+                if k >= warmup_steps:
+                    timings.append(time.perf_counter() - start)
+
+            p50, p99 = np.percentile(np.array(timings) * 1000, [50, 99])
+            results.append({'batch_size': batch_size, 'path': path, 'p50_ms': float(p50), 'p99_ms': float(p99)})
+            logger.info(f"{path} with batch size {batch_size}: p50 {p50:.2f}ms, p99 {p99:.2f}ms per step")
+
+    return results
+
+
+def benchmark_rollout(
+    batch_sizes: List[int],
+    spatial_dim: int = 32,
+    time_steps: int = 7,
+    lstm_units: int = 64,
+    rollout_steps: int = 50,
+    random_seed: int = 42
+) -> List[Dict[str, float]]:
+    """
+    Compare full and incremental rollouts of predict_spread_batch.
+
+    Args:
+        batch_sizes: Numbers of outbreaks rolled out together
+        spatial_dim: Spatial dimension of the grid
+        time_steps: Number of input time steps of the model
+        lstm_units: Number of LSTM units of the (untrained) model
+        rollout_steps: Predicted time steps per rollout
+        random_seed: Random seed for the initial states
+
+    Returns:
+        List of result rows with batch size, mode, milliseconds per step and
+        max difference from the full rollout
+    """
+    from src.models.spread_prediction import PathogenSpreadModel
+
+    model = PathogenSpreadModel(spatial_dim=spatial_dim, time_steps=time_steps, lstm_units=lstm_units)
+    results = []
+
+    for batch_size in batch_sizes:
+        initial_states = np.stack([
+            generate_initial_state(spatial_dim=spatial_dim, num_points=3, random_seed=random_seed + k)
+            for k in range(batch_size)
+        ])
+
+        reference = None
+        for mode in ('full', 'incremental'):
+            incremental = mode == 'incremental'
+            # Warm up, including building the incremental functions
+            model.predict_spread_batch(initial_states, 2, incremental=incremental)
+
+            start = time.perf_counter()
+            predictions = model.predict_spread_batch(initial_states, rollout_steps, incremental=incremental)
+            ms_per_step = (time.perf_counter() - start) * 1000 / rollout_steps
+
+            if reference is None:
+                reference = predictions
+            max_diff = float(np.max(np.abs(predictions - reference)))
+
+            results.append({'batch_size': batch_size, 'mode': mode, 'ms_per_step': ms_per_step, 'max_diff': max_diff})
+            logger.info(f"{mode} rollout with batch size {batch_size}: {ms_per_step:.2f}ms per step "
+                        f"(max diff {max_diff:.2e})")
+
+    return results
+
+
+def main():
+    """Command line interface for running the benchmarks."""
+    parser = argparse.ArgumentParser(description="Benchmark pathogen spread simulation")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    engines_parser = subparsers.add_parser("engines", help="Compare simulate_spread engines")
+    engines_parser.add_argument("--grid-sizes", type=str, default="32,128,512", help="Comma-separated grid sizes")
+    engines_parser.add_argument("--time-steps", type=int, default=5, help="Number of simulated time steps")
+    engines_parser.add_argument("--threat-type", type=str, default="FUNGAL", help="Threat type to simulate")
+    engines_parser.add_argument("--engines", type=str, default=",".join(SIMULATION_ENGINES),
+                                help="Comma-separated simulation engines to compare")
+    engines_parser.add_argument("--repeats", type=int, default=1, help="Runs per configuration")
+    engines_parser.add_argument("--dtype", type=str, default=DEFAULT_DTYPE, help="dtype to simulate in")
+
+    dataset_parser = subparsers.add_parser("dataset", help="Compare synthetic dataset generation throughput")
+    dataset_parser.add_argument("--dataset-size", type=int, default=256, help="Number of samples to generate")
+    dataset_parser.add_argument("--batch-sizes", type=str, default="1,16,64,256",
+                                help="Comma-separated simulation batch sizes (1 means per-sample)")
+    dataset_parser.add_argument("--spatial-dim", type=int, default=32, help="Spatial dimension of the grid")
+    dataset_parser.add_argument("--time-steps", type=int, default=7, help="Number of time steps in each sequence")
+
+    inference_parser = subparsers.add_parser("inference", help="Compare model.predict and compiled inference latency")
+    inference_parser.add_argument("--batch-sizes", type=str, default="1,8,32",
+                                  help="Comma-separated numbers of outbreaks rolled out together")
+    inference_parser.add_argument("--spatial-dim", type=int, default=32, help="Spatial dimension of the grid")
+    inference_parser.add_argument("--time-steps", type=int, default=7, help="Number of input time steps")
+    inference_parser.add_argument("--lstm-units", type=int, default=64, help="Number of LSTM units")
+    inference_parser.add_argument("--rollout-steps", type=int, default=200, help="Timed rollout steps")
+
+    rollout_parser = subparsers.add_parser("rollout", help="Compare full and incremental model rollouts")
+    rollout_parser.add_argument("--batch-sizes", type=str, default="1,8,32",
+                                help="Comma-separated numbers of outbreaks rolled out together")
+    rollout_parser.add_argument("--spatial-dim", type=int, default=32, help="Spatial dimension of the grid")
+    rollout_parser.add_argument("--time-steps", type=int, default=7, help="Number of input time steps")
+    rollout_parser.add_argument("--rollout-steps", type=int, default=50, help="Predicted time steps per rollout")
+
+    args = parser.parse_args()
+
+    if args.benchmark == "engines":
+        results = benchmark_simulation_engines(
+            grid_sizes=[int(size) for size in args.grid_sizes.split(",")],
+            time_steps=args.time_steps,
+            threat_type=args.threat_type,
+            engines=args.engines.split(","),
+            repeats=args.repeats,
+            dtype=args.dtype
+        )
+
+        print(f"{'grid':>6} {'engine':>12} {'seconds':>10} {'max diff':>10}")
+        for row in results:
+            print(f"{row['grid_size']:>6} {row['engine']:>12} {row['seconds']:>10.3f} {row['max_diff']:>10.2e}")
+
+    elif args.benchmark == "dataset":
+        batch_sizes = [int(size) for size in args.batch_sizes.split(",")]
+        results = benchmark_dataset_generation(
+            dataset_size=args.dataset_size,
+            batch_sizes=[size if size > 1 else None for size in batch_sizes],
+            spatial_dim=args.spatial_dim,
+            time_steps=args.time_steps
+        )
+
+        print(f"{'batch':>6} {'seconds':>10} {'samples/s':>10}")
+        for row in results:
+            print(f"{row['batch_size']:>6} {row['seconds']:>10.3f} {row['samples_per_second']:>10.1f}")
+
+    elif args.benchmark == "inference":
+        results = benchmark_inference_latency(
+            batch_sizes=[int(size) for size in args.batch_sizes.split(",")],
+            spatial_dim=args.spatial_dim,
+            time_steps=args.time_steps,
+            lstm_units=args.lstm_units,
+            rollout_steps=args.rollout_steps
+        )
+
+        print(f"{'batch':>6} {'path':>10} {'p50 ms':>10} {'p99 ms':>10}")
+        for row in results:
+            print(f"{row['batch_size']:>6} {row['path']:>10} {row['p50_ms']:>10.2f} {row['p99_ms']:>10.2f}")
+
+    elif args.benchmark == "rollout":
+        results = benchmark_rollout(
+            batch_sizes=[int(size) for size in args.batch_sizes.split(",")],
+            spatial_dim=args.spatial_dim,
+            time_steps=args.time_steps,
+            rollout_steps=args.rollout_steps
+        )
+
+        print(f"{'batch':>6} {'mode':>12} {'ms/step':>10} {'max diff':>10}")
+        for row in results:
+            print(f"{row['batch_size']:>6} {row['mode']:>12} {row['ms_per_step']:>10.2f} {row['max_diff']:>10.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Calibration of the SPREAD_BEHAVIORS parameters against observed outbreaks.
+
+Each threat type is fitted with the cross-entropy method: every iteration
+samples a population of candidate parameter sets, simulates all of them
+against the observed outbreaks as batched simulations spread over a process
+pool, and refits the sampling distribution to the best candidates. The
+result is written as a versioned parameter file for load_spread_behaviors.
+"""
+
+import os
+import sys
+import time
+import copy
+import argparse
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+# Add project root to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.models.data_generator import (
+    CALIBRATED_PARAMETERS,
+    SPREAD_BEHAVIORS,
+    save_spread_behaviors,
+    simulate_spread_batch
+)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Search range of each calibrated parameter
+PARAMETER_BOUNDS = {
+    'spread_rate': (0.01, 0.6),
+    'weather_influence': (0.0, 1.0),
+    'intensity_decay': (0.0, 0.5)
+}
+
+
+def load_observations(path: str) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Load observed outbreaks from an .npz file.
+    
+    The file holds 'initial_state' (H, W, F) states the outbreaks start from
+    and 'observed' (T, H, W) concentrations (or 0/1 detections) at the
+    following T time steps, optionally with a leading outbreak dimension.
+    
+    Args:
+        path: Path of the observations file
+        
+    Returns:
+        Tuple of (initial_states, observed) of shapes (N, H, W, F) and (N, T, H, W)
+    """
+    with np.load(path) as observations:
+        initial_states = observations['initial_state'].astype(np.float64)
+        observed = observations['observed'].astype(np.float64)
+    
+    if initial_states.ndim == 3:
+        initial_states, observed = initial_states[None], observed[None]
+    if observed.shape[0] != initial_states.shape[0] or observed.shape[2:] != initial_states.shape[1:3]:
+        raise ValueError(f"Observations {observed.shape} do not match initial states {initial_states.shape}")
+    
+    return initial_states, observed
+
+
+def _to_parameters(unit_candidates: np.ndarray) -> np.ndarray:
+    """
+    Map candidates from the unit cube to the parameter bounds.
+    
+    Args:
+        unit_candidates: Candidates (P, len(CALIBRATED_PARAMETERS)) in [0, 1]
+        
+    Returns:
+        Candidates in parameter units
+    """
+    low, high = np.array([PARAMETER_BOUNDS[name] for name in CALIBRATED_PARAMETERS]).T
+    return low + unit_candidates * (high - low)
+
+
+def _to_unit(parameters: np.ndarray) -> np.ndarray:
+    """
+    Map parameters to the unit cube of the parameter bounds.
+    
+    Args:
+        parameters: Parameters (..., len(CALIBRATED_PARAMETERS))
+        
+    Returns:
+        Parameters scaled to [0, 1]
+    """
+    low, high = np.array([PARAMETER_BOUNDS[name] for name in CALIBRATED_PARAMETERS]).T
+    return np.clip((parameters - low) / (high - low), 0, 1)
+
+
+def _evaluate_candidates(task: Tuple) -> np.ndarray:
+    """
+    Process pool entry point: score candidate parameters in one batched simulation.
+    
+    Args:
+        task: Tuple of (threat_type, candidates (P, len(CALIBRATED_PARAMETERS)),
+            initial_states, observed, replicates, seed_sequence)
+            
+    Returns:
+        Mean squared error of each candidate (P,)
+    """
+    threat_type, candidates, initial_states, observed, replicates, seed_sequence = task
+    num_outbreaks, time_steps = observed.shape[:2]
+    
+    # Scenarios are ordered candidate-major, then outbreak, then replicate
+    behaviors = []
+    for candidate in candidates:
+        behavior = dict(SPREAD_BEHAVIORS.get(threat_type, SPREAD_BEHAVIORS['FUNGAL']))
+        behavior.update(zip(CALIBRATED_PARAMETERS, map(float, candidate)))
+        behaviors.extend([behavior] * (num_outbreaks * replicates))
+    
+    scenarios = np.repeat(initial_states, replicates, axis=0)
+    sequences = simulate_spread_batch(
+        np.tile(scenarios, (len(candidates), 1, 1, 1)),
+        time_steps=time_steps + 1,
+        threat_types=threat_type,
+        rng=np.random.default_rng(seed_sequence),
+        dtype='float64',
+        behaviors=behaviors
+    )
+    
+    simulated = sequences[:, 1:, :, :, 0].reshape((len(candidates), num_outbreaks, replicates) + observed.shape[1:])
+    errors = (simulated - observed[None, :, None]) ** 2
+    
+    return errors.reshape(len(candidates), -1).mean(axis=1)
+
+
+def calibrate_threat_type(
+    threat_type: str,
+    initial_states: np.ndarray,
+    observed: np.ndarray,
+    iterations: int = 20,
+    population_size: int = 64,
+    elite_fraction: float = 0.2,
+    replicates: int = 2,
+    batch_size: int = 16,
+    workers: Optional[int] = None,
+    random_seed: Optional[int] = None,
+    tolerance: float = 0.005
+) -> Dict[str, Any]:
+    """
+    Fit the spread behavior of one threat type to observed outbreaks.
+    
+    Candidates are evaluated in batches of batch_size candidates, each one
+    simulate_spread_batch call covering every outbreak and replicate, so the
+    results only depend on random_seed and not on the number of workers.
+    
+    Args:
+        threat_type: Threat type to calibrate (its spread pattern is kept)
+        initial_states: Initial states of the outbreaks (N, H, W, F)
+        observed: Observed concentrations (N, T, H, W) after each initial state
+        iterations: Maximum number of optimizer iterations
+        population_size: Candidates evaluated per iteration
+        elite_fraction: Fraction of the best candidates the distribution is refitted to
+        replicates: Stochastic simulations per candidate and outbreak
+        batch_size: Candidates per batched simulation
+        workers: Number of worker processes evaluating batches
+        random_seed: Root seed for the candidates and simulations
+        tolerance: Stop once the sampling spread of every parameter is below
+            this fraction of its range
+            
+    Returns:
+        Dictionary with the fitted behavior, its loss (from one more
+        evaluation of exactly the returned parameters), the best single
+        candidate and its loss, the elite mean loss history and the number
+        of candidates evaluated per minute
+    """
+    num_elite = max(2, int(population_size * elite_fraction))
+    if iterations < 1:
+        raise ValueError(f"iterations must be at least 1, got {iterations}")
+    if population_size < num_elite:
+        raise ValueError(f"population_size must be at least the {num_elite} elite candidates, got {population_size}")
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+    
+    root_seed = np.random.SeedSequence(random_seed)
+    sampling_rng = np.random.default_rng(root_seed.spawn(1)[0])
+    
+    # Start from the current parameters with a wide spread
+    current = SPREAD_BEHAVIORS.get(threat_type, SPREAD_BEHAVIORS['FUNGAL'])
+    mean = _to_unit(np.array([current[name] for name in CALIBRATED_PARAMETERS]))
+    std = np.full(len(CALIBRATED_PARAMETERS), 0.25)
+    
+    best_candidate, best_loss = None, np.inf
+    history = []
+    start = time.perf_counter()
+    
+    with ExitStack() as stack:
+        if workers is not None and workers > 1:
+            # Spawned workers avoid forking a parent that may hold TensorFlow threads
+            executor = stack.enter_context(
+                ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            )
+            evaluate = executor.map
+        else:
+            evaluate = map
+        
+        for iteration in range(iterations):
+            unit_candidates = np.clip(mean + std * sampling_rng.standard_normal((population_size, len(mean))), 0, 1)
+            candidates = _to_parameters(unit_candidates)
+            
+            batch_starts = range(0, population_size, batch_size)
+            tasks = [
+                (threat_type, candidates[i:i + batch_size], initial_states, observed, replicates, seed_sequence)
+                for i, seed_sequence in zip(batch_starts, root_seed.spawn(len(batch_starts)))
+            ]
+            losses = np.concatenate(list(evaluate(_evaluate_candidates, tasks)))
+            
+            elite = np.argsort(losses)[:num_elite]
+            mean = unit_candidates[elite].mean(axis=0)
+            std = unit_candidates[elite].std(axis=0)
+            
+            if losses[elite[0]] < best_loss:
+                best_candidate, best_loss = candidates[elite[0]], float(losses[elite[0]])
+            history.append(float(losses[elite].mean()))
+            logger.info(f"{threat_type} iteration {iteration + 1}: best loss {best_loss:.6f}, "
+                        f"elite mean loss {history[-1]:.6f}")
+            
+            if np.all(std < tolerance):
+                break
+    
+    seconds = time.perf_counter() - start
+    evaluated = population_size * len(history)
+    logger.info(f"Calibrated {threat_type} with {evaluated} candidates in {seconds:.1f}s "
+                f"({60 * evaluated / seconds:.0f} candidates/min)")
+    
+    # The refitted mean is less sensitive to simulation noise than the single best draw
+    fitted = _to_parameters(mean)
+    behavior = dict(current)
+    behavior.update({name: round(float(value), 4) for name, value in zip(CALIBRATED_PARAMETERS, fitted)})
+    
+    # The elite mean loss belongs to the last population, not to the refitted parameters
+    fitted_loss = _evaluate_candidates((
+        threat_type, np.array([[behavior[name] for name in CALIBRATED_PARAMETERS]]),
+        initial_states, observed, replicates, root_seed.spawn(1)[0]
+    ))
+    
+    return {
+        'behavior': behavior,
+        'loss': float(fitted_loss[0]),
+        'best_loss': best_loss,
+        'best_candidate': dict(zip(CALIBRATED_PARAMETERS, map(float, best_candidate))),
+        'history': history,
+        'candidates_evaluated': evaluated,
+        'candidates_per_minute': 60 * evaluated / seconds
+    }
+
+
+def calibrate_spread_behaviors(
+    observations: Dict[str, Tuple[np.ndarray, np.ndarray]],
+    output_path: Optional[str] = None,
+    **kwargs
+) -> Dict[str, Any]:
+    """
+    Calibrate the spread behaviors of several threat types.
+    
+    Threat types without observations keep their current parameters.
+    
+    Args:
+        observations: Dict mapping threat types to (initial_states, observed) arrays
+        output_path: Path to write the versioned parameter file to
+        **kwargs: Options passed to calibrate_threat_type
+        
+    Returns:
+        The parameter file contents
+    """
+    behaviors = copy.deepcopy(SPREAD_BEHAVIORS)
+    calibration = {}
+    
+    for threat_type, (initial_states, observed) in observations.items():
+        result = calibrate_threat_type(threat_type, initial_states, observed, **kwargs)
+        behaviors[threat_type] = result.pop('behavior')
+        calibration[threat_type] = result
+    
+    if output_path:
+        parameters = save_spread_behaviors(output_path, behaviors, calibration)
+        logger.info(f"Spread behaviors version {parameters['version']} saved to {output_path}")
+        return parameters
+    
+    return {'behaviors': behaviors, 'calibration': calibration}
+
+
+def main():
+    """Command line interface for calibrating spread behaviors."""
+    parser = argparse.ArgumentParser(description="Calibrate spread behaviors against observed outbreaks")
+    parser.add_argument("--observations", type=str, action="append", required=True,
+                        help="THREAT_TYPE=path.npz with 'initial_state' and 'observed' arrays (repeatable)")
+    parser.add_argument("--output", type=str, required=True, help="Path of the parameter file to write")
+    parser.add_argument("--iterations", type=int, default=20, help="Maximum optimizer iterations per threat type")
+    parser.add_argument("--population", type=int, default=64, help="Candidates evaluated per iteration")
+    parser.add_argument("--replicates", type=int, default=2, help="Simulations per candidate and outbreak")
+    parser.add_argument("--batch-size", type=int, default=16, help="Candidates per batched simulation")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes evaluating candidates")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed")
+    
+    args = parser.parse_args()
+    
+    observations = {}
+    for entry in args.observations:
+        threat_type, path = entry.split("=", 1)
+        observations[threat_type.upper()] = load_observations(path)
+    
+    calibrate_spread_behaviors(
+        observations,
+        output_path=args.output,
+        iterations=args.iterations,
+        population_size=args.population,
+        replicates=args.replicates,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        random_seed=args.seed
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,17 @@
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 import matplotlib.pyplot as plt
 import logging
-from typing import Tuple, List, Dict, Any, Optional
+import os
+import json
+import copy
+import hashlib
+import multiprocessing
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from contextlib import ExitStack
+from typing import Tuple, List, Dict, Any, Iterator, Optional, Sequence, Union
 
 # Configure logging
 logging.basicConfig(
@@ -38,280 +48,2689 @@ SPREAD_BEHAVIORS = {
     }
 }
 
+# Backends available to simulate_spread
+SIMULATION_ENGINES = ('loop', 'vectorized', 'sparse')
+
+# Maximum absolute difference between the 'loop' and 'vectorized' engines
+# for the radial pattern when both draw from identically seeded generators.
+# Both apply the same additive contributions, so they only differ by
+# floating-point summation order. The 'sparse' engine matches 'vectorized'
+# for every pattern within this tolerance plus SPARSE_SUPPORT_TOLERANCE.
+RADIAL_ENGINE_TOLERANCE = 1e-9
+
+# Concentration below which the 'sparse' engine clears a cell and drops it
+# from the support. Decay never reaches exactly 0, so without it the support
+# would keep every cell ever infected. Cleared cells are far below the
+# thresholds at which cells spread, so they differ from the 'vectorized'
+# engine by less than this value.
+SPARSE_SUPPORT_TOLERANCE = 1e-6
+
+# Radius of the diffusion stamped around a jump landing point
+JUMP_DIFFUSION_RADIUS = 2
+
+# Name of the manifest written alongside sharded datasets
+DATASET_MANIFEST = 'manifest.json'
+
+# Version of the sample generation code. Bump whenever a change alters the
+# samples produced for a given seed so cached datasets are regenerated.
+GENERATOR_VERSION = 1
+
+# Models for the temperature, humidity and wind channels: 'discs' stamps a
+# few random discs and drifts with white noise each step, 'gaussian' uses
+# spatially and temporally correlated FFT-filtered fields (GaussianEnvironment)
+ENVIRONMENT_MODELS = ('discs', 'gaussian')
+DEFAULT_CORRELATION_LENGTH = 8.0
+DEFAULT_TEMPORAL_CORRELATION = 0.9
+
+# Standard deviation of the 'gaussian' initial variation per channel, and
+# the per-step amplitude of the weather drift (channels 1-4)
+ENVIRONMENT_VARIATION = {1: 0.05, 2: 0.075, 4: 0.05}
+ENVIRONMENT_DRIFT = np.array([0.02, 0.03, 0.05, 0.04])
+
+# Floating-point policy for generated data. Everything is produced in float32
+# by default (the dtype the model trains in); float16 may be requested to
+# halve storage, in which case the simulation itself still runs in float32.
+DEFAULT_DTYPE = 'float32'
+SUPPORTED_DTYPES = ('float16', 'float32', 'float64')
+
+# Calibrated SPREAD_BEHAVIORS parameter files. A file named by the
+# environment variable is loaded at import, which is also how spawned worker
+# processes pick up parameters loaded in their parent.
+SPREAD_BEHAVIORS_ENV = 'SPREAD_BEHAVIORS_FILE'
+BEHAVIORS_FORMAT_VERSION = 1
+CALIBRATED_PARAMETERS = ('spread_rate', 'weather_influence', 'intensity_decay')
+DEFAULT_SPREAD_BEHAVIORS = copy.deepcopy(SPREAD_BEHAVIORS)
+
+
+def resolve_dtype(dtype: Union[str, np.dtype, type, None] = None) -> np.dtype:
+    """
+    Validate a dtype against the data dtype policy.
+    
+    Args:
+        dtype: Requested dtype, or None for DEFAULT_DTYPE
+        
+    Returns:
+        The requested dtype as a numpy dtype
+    """
+    dtype = np.dtype(DEFAULT_DTYPE if dtype is None else dtype)
+    if dtype.name not in SUPPORTED_DTYPES:
+        raise ValueError(f"Unsupported dtype '{dtype.name}', expected one of {SUPPORTED_DTYPES}")
+    return dtype
+
+
+def _compute_dtype(dtype: Union[str, np.dtype, type, None]) -> np.dtype:
+    """
+    Get the dtype simulations run in for a requested storage dtype.
+    
+    Args:
+        dtype: Requested storage dtype
+        
+    Returns:
+        float32 for float16 storage, otherwise the storage dtype itself
+    """
+    dtype = resolve_dtype(dtype)
+    return np.dtype(np.float32) if dtype == np.float16 else dtype
+
+
+def spread_behaviors_version(behaviors: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
+    """
+    Hash a set of spread behaviors.
+    
+    Args:
+        behaviors: Behaviors per threat type (defaults to the current SPREAD_BEHAVIORS)
+        
+    Returns:
+        Hex digest identifying the parameters
+    """
+    behaviors = SPREAD_BEHAVIORS if behaviors is None else behaviors
+    return hashlib.sha256(json.dumps(behaviors, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def save_spread_behaviors(
+    path: str,
+    behaviors: Dict[str, Dict[str, Any]],
+    calibration: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Write a versioned spread behavior parameter file.
+    
+    Args:
+        path: Path of the JSON parameter file
+        behaviors: Behaviors per threat type, in the format of SPREAD_BEHAVIORS
+        calibration: Optional description of how the parameters were obtained
+        
+    Returns:
+        The written parameter file contents
+    """
+    parameters = {
+        'format_version': BEHAVIORS_FORMAT_VERSION,
+        'version': spread_behaviors_version(behaviors),
+        'created': datetime.now().isoformat(),
+        'behaviors': behaviors,
+        'calibration': calibration or {}
+    }
+    
+    # Write to a temporary file first so readers never see a partial file
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(parameters, f, indent=2)
+    os.replace(tmp_path, path)
+    
+    return parameters
+
+
+def load_spread_behaviors(path: str) -> Dict[str, Any]:
+    """
+    Load a spread behavior parameter file into SPREAD_BEHAVIORS.
+    
+    Threat types in the file replace the parameters of the same type and
+    types missing from it keep their current parameters. The path is also
+    exported in SPREAD_BEHAVIORS_ENV so spawned worker processes load it.
+    
+    Args:
+        path: Path of a file written by save_spread_behaviors
+        
+    Returns:
+        The parameter file contents
+    """
+    with open(path, 'r') as f:
+        parameters = json.load(f)
+    
+    if parameters.get('format_version') != BEHAVIORS_FORMAT_VERSION:
+        raise ValueError(f"Unsupported spread behavior file format {parameters.get('format_version')} in {path}")
+    for threat_type, behavior in parameters['behaviors'].items():
+        missing = [key for key in CALIBRATED_PARAMETERS + ('pattern',) if key not in behavior]
+        if missing:
+            raise ValueError(f"Spread behavior of {threat_type} in {path} is missing {missing}")
+    
+    SPREAD_BEHAVIORS.update(copy.deepcopy(parameters['behaviors']))
+    os.environ[SPREAD_BEHAVIORS_ENV] = os.path.abspath(path)
+    logger.info(f"Loaded spread behaviors version {parameters['version']} from {path}")
+    
+    return parameters
+
+
+if os.getenv(SPREAD_BEHAVIORS_ENV):
+    load_spread_behaviors(os.environ[SPREAD_BEHAVIORS_ENV])
+
+
+def _radial_kernel(radius: int) -> np.ndarray:
+    """
+    Build the linear fall-off kernel used by radial spread.
+    
+    Args:
+        radius: Spread radius in cells
+        
+    Returns:
+        Kernel of shape (2*radius+1, 2*radius+1) with weight 1 - dist/radius
+        inside the radius and 0 outside
+    """
+    offsets = np.arange(-radius, radius + 1)
+    dist = np.sqrt(offsets[:, None] ** 2 + offsets[None, :] ** 2)
+    return np.where(dist <= radius, 1 - dist / radius, 0.0)
+
+
+def _convolve_same(field: np.ndarray, kernel: np.ndarray) -> np.ndarray:
+    """
+    Convolve the last two axes of a field with a small symmetric kernel, zero-padded at the edges.
+    
+    Each non-zero kernel tap is applied as one shifted slice addition, so the
+    cost is O(taps * H * W) with no Python loop over cells.
+    
+    Args:
+        field: Array of shape (..., H, W)
+        kernel: Square kernel with odd side length
+        
+    Returns:
+        Convolved field with the same shape as the input
+    """
+    height, width = field.shape[-2:]
+    radius = kernel.shape[0] // 2
+    result = np.zeros_like(field)
+    
+    for di, dj in zip(*np.nonzero(kernel)):
+        oi, oj = di - radius, dj - radius
+        # Contribution from source (i, j) lands on (i + oi, j + oj)
+        result[..., max(0, oi):height + min(0, oi), max(0, oj):width + min(0, oj)] += (
+            kernel[di, dj] * field[..., max(0, -oi):height - max(0, oi), max(0, -oj):width - max(0, oj)]
+        )
+    
+    return result
+
+
+def radial_spread_vectorized(
+    concentration: np.ndarray,
+    favorability: np.ndarray,
+    spread_rate: Union[float, np.ndarray],
+    radius_scale: float = 3,
+    threshold: float = 0.01
+) -> np.ndarray:
+    """
+    Compute radial spread contributions for the whole grid at once.
+    
+    Equivalent to visiting every cell above the threshold and adding
+    concentration * (1 - dist/radius) * spread_rate * favorability to each
+    neighbour within int(1 + radius_scale * spread_rate * favorability) cells.
+    Source cells are grouped by radius and each group is convolved with its
+    fall-off kernel.
+    
+    Args:
+        concentration: Pathogen concentration (..., H, W)
+        favorability: Environmental favorability (..., H, W)
+        spread_rate: Spread rate of the threat type, or an array broadcastable
+            to the grid shape (e.g. (N, 1, 1) for a batch of scenarios)
+        radius_scale: Multiplier turning favorability into a spread radius
+        threshold: Minimum concentration for a cell to spread
+        
+    Returns:
+        Concentration increments (..., H, W) to add to the next state
+    """
+    active = concentration > threshold
+    source = np.where(active, concentration * spread_rate * favorability, 0.0)
+    radius = (1 + radius_scale * spread_rate * favorability).astype(int)
+    
+    contribution = np.zeros_like(source)
+    for r in np.unique(radius[active]):
+        group = np.where(radius == r, source, 0.0)
+        contribution += _convolve_same(group, _radial_kernel(int(r)))
+    
+    return contribution
+
+
+def _active_cells(
+    concentration: np.ndarray,
+    threshold: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Locate the cells above a concentration threshold.
+    
+    Args:
+        concentration: Pathogen concentration (..., H, W)
+        threshold: Minimum concentration for a cell to be active
+        
+    Returns:
+        Tuple of (mask, offsets, rows, cols) where mask is the boolean activity
+        grid and offsets is the flat index of the first cell of the grid each
+        active cell belongs to (0 for a single grid)
+    """
+    mask = concentration > threshold
+    index = np.nonzero(mask)
+    rows, cols = index[-2], index[-1]
+    
+    height, width = concentration.shape[-2:]
+    if concentration.ndim > 2:
+        offsets = np.ravel_multi_index(index[:-2], concentration.shape[:-2]) * height * width
+    else:
+        offsets = np.zeros_like(rows)
+    
+    return mask, offsets, rows, cols
+
+
+def _scatter_add(
+    shape: Tuple[int, ...],
+    offsets: np.ndarray,
+    rows: np.ndarray,
+    cols: np.ndarray,
+    weights: np.ndarray
+) -> np.ndarray:
+    """
+    Accumulate weights into grids at the given cells, dropping out-of-bounds cells.
+    
+    Args:
+        shape: Grid shape (..., H, W)
+        offsets: Flat index of the grid each contribution belongs to
+        rows: Row indices of each contribution
+        cols: Column indices of each contribution
+        weights: Value of each contribution
+        
+    Returns:
+        Grid of summed contributions
+    """
+    height, width = shape[-2:]
+    inside = (rows >= 0) & (rows < height) & (cols >= 0) & (cols < width)
+    flat_index = (offsets + rows * width + cols)[inside]
+    totals = np.bincount(flat_index, weights=weights[inside], minlength=int(np.prod(shape)))
+    # bincount returns integers when there is nothing to accumulate
+    return totals.astype(weights.dtype, copy=False).reshape(shape)
+
+
+def directional_spread_vectorized(
+    concentration: np.ndarray,
+    favorability: np.ndarray,
+    wind_direction: np.ndarray,
+    wind_speed: np.ndarray,
+    spread_rate: Union[float, np.ndarray],
+    weather_influence: Union[float, np.ndarray],
+    rng: np.random.Generator,
+    threshold: float = 0.01
+) -> np.ndarray:
+    """
+    Compute wind-driven directional spread contributions for the whole grid at once.
+    
+    Every active cell pushes concentration downwind for
+    int(1 + 4 * spread_rate * favorability) steps and scatters three weaker
+    contributions in random directions at each step. All random angles and
+    distances are drawn in a single call and the contributions are
+    accumulated with np.bincount.
+    
+    Args:
+        concentration: Pathogen concentration (..., H, W)
+        favorability: Environmental favorability (..., H, W)
+        wind_direction: Wind direction in radians (..., H, W)
+        wind_speed: Wind speed (..., H, W)
+        spread_rate: Spread rate, scalar or broadcastable to the grid shape
+        weather_influence: How strongly wind displaces the spread, scalar or
+            broadcastable to the grid shape
+        rng: Random generator for the random-direction contributions
+        threshold: Minimum concentration for a cell to spread
+        
+    Returns:
+        Concentration increments (..., H, W) to add to the next state
+    """
+    active, offsets, rows, cols = _active_cells(concentration, threshold)
+    if len(rows) == 0:
+        return np.zeros_like(concentration)
+    
+    fav = favorability[active]
+    rate = np.broadcast_to(spread_rate, concentration.shape)[active]
+    
+    # Random-direction draws: three per cell and distance, in a single call
+    draws = rng.random((2, len(rows), _directional_distance(rate, fav).max(), 3))
+    wind, random_spread = _directional_contributions(
+        rows, cols, concentration[active], fav, wind_speed[active], wind_direction[active],
+        rate, np.broadcast_to(weather_influence, concentration.shape)[active],
+        draws
+    )
+    
+    return (
+        _scatter_add(concentration.shape, offsets[wind[0]], *wind[1:])
+        + _scatter_add(concentration.shape, offsets[random_spread[0]], *random_spread[1:])
+    )
+
+
+def _directional_distance(rate: np.ndarray, fav: np.ndarray) -> np.ndarray:
+    """
+    Get how many cells downwind each active cell spreads.
+    
+    Args:
+        rate: Spread rate of each active cell
+        fav: Favorability of each active cell
+        
+    Returns:
+        Integer spread distance of each active cell
+    """
+    return (1 + 4 * rate * fav).astype(int)
+
+
+def _directional_contributions(
+    rows: np.ndarray,
+    cols: np.ndarray,
+    c: np.ndarray,
+    fav: np.ndarray,
+    speed: np.ndarray,
+    direction: np.ndarray,
+    rate: np.ndarray,
+    influence: np.ndarray,
+    draws: np.ndarray
+) -> Tuple[Tuple[np.ndarray, ...], Tuple[np.ndarray, ...]]:
+    """
+    List the directional spread contributions of a set of active cells.
+    
+    Args:
+        rows: Row of each active cell (K,)
+        cols: Column of each active cell (K,)
+        c: Concentration of each active cell
+        fav: Favorability of each active cell
+        speed: Wind speed of each active cell
+        direction: Wind direction of each active cell in radians
+        rate: Spread rate of each active cell
+        influence: Weather influence of each active cell
+        draws: Uniform draws of shape (2, K, D, 3) for the angle and distance
+            of the random-direction contributions, with D at least the
+            largest spread distance
+            
+    Returns:
+        Tuple of (wind, random) contributions, each a tuple of (source, rows,
+        cols, weights) where source indexes the active cell it came from
+    """
+    spread_distance = _directional_distance(rate, fav)
+    # (K, D) grid of distances 1..D, masked per cell
+    distance = np.arange(1, draws.shape[2] + 1)[None, :]
+    valid = distance <= spread_distance[:, None]
+    source = np.broadcast_to(np.arange(len(rows))[:, None], valid.shape)
+    
+    # Wind-driven spread
+    wind_factor = influence * speed
+    wind_rows = np.trunc(rows[:, None] + distance * (speed * np.cos(direction) * wind_factor)[:, None]).astype(int)
+    wind_cols = np.trunc(cols[:, None] + distance * (speed * np.sin(direction) * wind_factor)[:, None]).astype(int)
+    wind_weight = (c * rate * fav)[:, None] / (1 + 0.5 * distance)
+    
+    # Random-direction spread, three draws per cell and distance
+    random_angle = draws[0] * 2 * np.pi
+    random_dist = 1 + (2 * draws[1]).astype(int)
+    random_rows = np.trunc(rows[:, None, None] + random_dist * np.cos(random_angle)).astype(int)
+    random_cols = np.trunc(cols[:, None, None] + random_dist * np.sin(random_angle)).astype(int)
+    random_weight = (c * 0.3 * rate * fav)[:, None, None] / (1 + random_dist)
+    random_valid = np.broadcast_to(valid[:, :, None], random_dist.shape)
+    random_source = np.broadcast_to(source[:, :, None], random_dist.shape)
+    
+    return (
+        (source[valid], wind_rows[valid], wind_cols[valid], wind_weight[valid]),
+        (random_source[random_valid], random_rows[random_valid], random_cols[random_valid],
+         random_weight[random_valid])
+    )
+
+
+def jump_spread_vectorized(
+    concentration: np.ndarray,
+    favorability: np.ndarray,
+    wind_direction: np.ndarray,
+    spread_rate: Union[float, np.ndarray],
+    weather_influence: Union[float, np.ndarray],
+    rng: np.random.Generator,
+    threshold: float = 0.1
+) -> np.ndarray:
+    """
+    Compute jump spread contributions for the whole grid at once.
+    
+    Cells above the threshold spread radially over int(1 + 2 * spread_rate *
+    favorability) cells and, with probability 0.1 * concentration, seed a new
+    infection 5-15 cells away with a small diffusion halo around it. The
+    trigger, distance, angle and intensity of every jump are drawn in a
+    single call.
+    
+    Args:
+        concentration: Pathogen concentration (..., H, W)
+        favorability: Environmental favorability (..., H, W)
+        wind_direction: Wind direction in radians (..., H, W)
+        spread_rate: Spread rate, scalar or broadcastable to the grid shape
+        weather_influence: How strongly wind steers the jump direction, scalar
+            or broadcastable to the grid shape
+        rng: Random generator for the jumps
+        threshold: Minimum concentration for a cell to spread
+        
+    Returns:
+        Concentration increments (..., H, W) to add to the next state
+    """
+    contribution = radial_spread_vectorized(
+        concentration, favorability, spread_rate, radius_scale=2, threshold=threshold
+    )
+    
+    active, offsets, rows, cols = _active_cells(concentration, threshold)
+    if len(rows) == 0:
+        return contribution
+    
+    jumps, landing_rows, landing_cols, jump_intensity = _jump_landings(
+        rows, cols, concentration[active], wind_direction[active],
+        np.broadcast_to(weather_influence, concentration.shape)[active], rng.random((4, len(rows)))
+    )
+    
+    # New infection points plus the diffusion around them
+    landings = _scatter_add(concentration.shape, offsets[jumps], landing_rows, landing_cols, jump_intensity)
+    contribution += landings + 0.7 * _convolve_same(landings, _radial_kernel(JUMP_DIFFUSION_RADIUS))
+    
+    return contribution
+
+
+def _jump_landings(
+    rows: np.ndarray,
+    cols: np.ndarray,
+    c: np.ndarray,
+    direction: np.ndarray,
+    influence: np.ndarray,
+    draws: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Draw the long-distance jumps of a set of active cells.
+    
+    Args:
+        rows: Row of each active cell (K,)
+        cols: Column of each active cell (K,)
+        c: Concentration of each active cell
+        direction: Wind direction of each active cell in radians
+        influence: Weather influence of each active cell
+        draws: Uniform draws of shape (4, K) for the trigger, distance, angle
+            and intensity of each jump
+            
+    Returns:
+        Tuple of (jumps, landing_rows, landing_cols, intensity) where jumps
+        masks the active cells that jumped
+    """
+    trigger, distance_draw, angle_draw, intensity_draw = draws
+    jumps = trigger < 0.1 * c
+    
+    jump_distance = (5 + 10 * distance_draw[jumps]).astype(int)
+    jump_angle = angle_draw[jumps] * 2 * np.pi
+    jump_angle = (1 - influence[jumps]) * jump_angle + influence[jumps] * direction[jumps]
+    
+    landing_rows = np.trunc(rows[jumps] + jump_distance * np.cos(jump_angle)).astype(int)
+    landing_cols = np.trunc(cols[jumps] + jump_distance * np.sin(jump_angle)).astype(int)
+    jump_intensity = c[jumps] * 0.3 * (0.7 + 0.6 * intensity_draw[jumps])
+    
+    return jumps, landing_rows, landing_cols, jump_intensity
+
+
+class GaussianEnvironment:
+    """
+    Spatially and temporally correlated environmental fields.
+    
+    Fields are white noise filtered in the Fourier domain, giving a
+    squared-exponential spatial correlation exp(-r^2 / (2 * length^2)) at a
+    cost of O(HW log HW) however much structure they contain. Fields are
+    periodic at the grid edges. Weather drift is an AR(1) process of such
+    fields, so consecutive steps move in similar directions.
+    """
+    
+    def __init__(
+        self,
+        shape: Tuple[int, int],
+        correlation_length: float = DEFAULT_CORRELATION_LENGTH,
+        temporal_correlation: float = DEFAULT_TEMPORAL_CORRELATION
+    ):
+        """
+        Initialize the environment model.
+        
+        Args:
+            shape: Grid shape (H, W)
+            correlation_length: Spatial correlation length in cells
+            temporal_correlation: Correlation of the drift between consecutive steps (0-1)
+        """
+        height, width = shape
+        self.shape = (height, width)
+        self.correlation_length = correlation_length
+        self.temporal_correlation = temporal_correlation
+        
+        # Gaussian filter, normalised so filtered unit white noise keeps unit variance
+        ky, kx = np.fft.fftfreq(height)[:, None], np.fft.fftfreq(width)[None, :]
+        full_filter = np.exp(-(np.pi * correlation_length) ** 2 * (ky ** 2 + kx ** 2))
+        self.filter = full_filter[:, :width // 2 + 1] / np.sqrt(np.mean(full_filter ** 2))
+        
+        # Drift of the previous step, per channel (..., 4, H, W)
+        self.increments = None
+    
+    def field(self, rng: Any, batch_shape: Tuple[int, ...] = ()) -> np.ndarray:
+        """
+        Draw correlated standard normal fields.
+        
+        Args:
+            rng: Random generator (or np.random)
+            batch_shape: Leading dimensions of the fields
+            
+        Returns:
+            Fields of shape batch_shape + (H, W) with zero mean and unit variance
+        """
+        noise = rng.standard_normal(tuple(batch_shape) + self.shape)
+        return np.fft.irfft2(np.fft.rfft2(noise) * self.filter, s=self.shape)
+    
+    def initialize(self, state: np.ndarray, rng: Any) -> None:
+        """
+        Add correlated variation to the temperature, humidity and wind speed channels.
+        
+        Args:
+            state: States (..., H, W, F) holding the base values, modified in place
+            rng: Random generator (or np.random)
+        """
+        fields = self.field(rng, state.shape[:-3] + (3,))
+        for k, channel in enumerate((1, 2, 4)):
+            state[..., channel] += ENVIRONMENT_VARIATION[channel] * fields[..., k, :, :]
+    
+    def drift(self, state: np.ndarray, rng: Any) -> None:
+        """
+        Advance the weather channels by one step.
+        
+        Args:
+            state: States (..., H, W, F), modified in place
+            rng: Random generator (or np.random)
+        """
+        fields = self.field(rng, state.shape[:-3] + (4,))
+        if self.increments is None:
+            self.increments = fields
+        else:
+            rho = self.temporal_correlation
+            self.increments = rho * self.increments + np.sqrt(1 - rho ** 2) * fields
+        
+        # Same per-step spread as the white-noise drift of each channel
+        state[..., 1:5] += np.moveaxis(self.increments, -3, -1) * ENVIRONMENT_DRIFT / np.sqrt(3)
+
+
+def _disc_falloff(
+    coords: np.ndarray,
+    x: int,
+    y: int,
+    radius: int
+) -> Tuple[Tuple[slice, slice], np.ndarray, np.ndarray]:
+    """
+    Get the cells within a radius of a point and their linear distance falloff.
+    
+    Args:
+        coords: Coordinate vector of the grid (np.arange(spatial_dim))
+        x: Row of the center point
+        y: Column of the center point
+        radius: Radius of the disc in cells
+        
+    Returns:
+        Tuple of (window, mask, falloff) where window slices the bounding box
+        of the disc out of the grid, mask selects the cells inside the disc
+        and falloff holds 1 - dist/radius for the selected cells in row-major
+        order (the order the per-pixel loops visited them in)
+    """
+    rows = coords[max(0, x - radius):x + radius + 1]
+    cols = coords[max(0, y - radius):y + radius + 1]
+    window = (slice(rows[0], rows[-1] + 1), slice(cols[0], cols[-1] + 1))
+    
+    dist = np.sqrt((rows[:, None] - x) ** 2 + (cols[None, :] - y) ** 2)
+    mask = dist <= radius
+    
+    return window, mask, 1 - dist[mask] / radius
+
+
+def load_susceptibility_raster(
+    path: str,
+    window: Optional[Tuple[int, int, int, int]] = None,
+    shape: Optional[Tuple[int, int]] = None,
+    dtype: Union[str, np.dtype] = 'float32',
+    host_classes: Optional[Sequence[int]] = None
+) -> np.ndarray:
+    """
+    Open a window of a host susceptibility raster without reading the whole raster.
+    
+    The raster is memory-mapped read-only, so only the window's pages are
+    read from disk when it is used.
+    
+    Args:
+        path: .npy file, or raw row-major binary file when shape is given
+        window: (row_offset, col_offset, height, width) of the field (None for the whole raster)
+        shape: (rows, cols) of a raw binary raster
+        dtype: Element type of a raw binary raster
+        host_classes: Crop-type codes of host crops. When given the raster
+            holds crop types and a boolean host mask of the window is returned;
+            otherwise it holds host densities in [0, 1]
+            
+    Returns:
+        Read-only (height, width) view of the raster, or a host mask
+    """
+    if shape is None:
+        raster = np.load(path, mmap_mode='r')
+    else:
+        raster = np.memmap(path, dtype=dtype, mode='r', shape=tuple(shape))
+    
+    if window is not None:
+        row_offset, col_offset, height, width = window
+        raster = raster[row_offset:row_offset + height, col_offset:col_offset + width]
+    
+    if host_classes is not None:
+        return np.isin(raster, host_classes)
+    
+    return raster
+
+
+def _resolve_susceptibility(
+    susceptibility: Optional[np.ndarray],
+    shape: Tuple[int, int],
+    dtype: np.dtype
+) -> Optional[np.ndarray]:
+    """
+    Read a susceptibility raster (window) into memory and validate it.
+    
+    Args:
+        susceptibility: Host susceptibility (H, W) in [0, 1], boolean host mask or None
+        shape: Expected grid shape (H, W)
+        dtype: dtype to return the raster in
+        
+    Returns:
+        Susceptibility array, or None when every cell is a host
+    """
+    if susceptibility is None:
+        return None
+    
+    susceptibility = np.array(susceptibility, dtype=dtype)
+    if susceptibility.shape != tuple(shape):
+        raise ValueError(f"Susceptibility raster {susceptibility.shape} does not match the grid {tuple(shape)}")
+    if susceptibility.size and (susceptibility.min() < 0 or susceptibility.max() > 1):
+        raise ValueError("Susceptibility values must be within [0, 1]")
+    
+    return susceptibility
+
+
 def generate_initial_state(
     spatial_dim: int = 32, 
     features: int = 5, 
     concentration: float = 0.5,
     num_points: int = 1,
-    random_seed: Optional[int] = None
+    random_seed: Optional[int] = None,
+    rng: Optional[np.random.Generator] = None,
+    dtype: Union[str, np.dtype] = DEFAULT_DTYPE,
+    environment: str = 'discs',
+    correlation_length: float = DEFAULT_CORRELATION_LENGTH,
+    susceptibility: Optional[np.ndarray] = None
 ) -> np.ndarray:
     """
-    Generate an initial state for a pathogen spread simulation.
+    Generate an initial state for a pathogen spread simulation.
+    
+    Args:
+        spatial_dim: Dimension of the spatial grid (square)
+        features: Number of features per grid cell
+        concentration: Concentration of the initial infection (0-1)
+        num_points: Number of initial infection points
+        random_seed: Random seed for reproducibility
+        rng: Random generator to draw from instead of the global np.random state
+        dtype: dtype of the returned state (see SUPPORTED_DTYPES)
+        environment: How temperature, humidity and wind vary in space, one of
+            ENVIRONMENT_MODELS
+        correlation_length: Spatial correlation length of the 'gaussian' model in cells
+        susceptibility: Host susceptibility (spatial_dim, spatial_dim) in [0, 1]
+            (see load_susceptibility_raster). Infections start on host cells
+            and their concentration is scaled by the susceptibility
+            
+    Returns:
+        Initial state as numpy array of shape (spatial_dim, spatial_dim, features)
+    """
+    if environment not in ENVIRONMENT_MODELS:
+        raise ValueError(f"Unknown environment model '{environment}', expected one of {ENVIRONMENT_MODELS}")
+    
+    if rng is None:
+        if random_seed is not None:
+            np.random.seed(random_seed)
+        random, randint = np.random.random, np.random.randint
+    else:
+        random, randint = rng.random, rng.integers
+    
+    # Initialize an empty grid
+    state = np.zeros((spatial_dim, spatial_dim, features), dtype=_compute_dtype(dtype))
+    coords = np.arange(spatial_dim)
+    
+    susceptibility = _resolve_susceptibility(susceptibility, (spatial_dim, spatial_dim), state.dtype)
+    if susceptibility is not None:
+        host_cells = np.flatnonzero(susceptibility)
+        if num_points > 0 and len(host_cells) == 0:
+            raise ValueError("Cannot place initial infections on a landscape without host cells")
+    
+    # Feature 0 represents pathogen concentration
+    # Generate random points for initial infections
+    for _ in range(num_points):
+        if susceptibility is None:
+            x = randint(0, spatial_dim)
+            y = randint(0, spatial_dim)
+        else:
+            x, y = divmod(int(host_cells[randint(0, len(host_cells))]), spatial_dim)
+        
+        # Set initial concentration
+        intensity = concentration * (0.8 + 0.4 * random())  # Some randomness
+        state[x, y, 0] = intensity
+        
+        # Create some diffusion around the point
+        radius = int(3 + 3 * random())  # Random radius between 3-6
+        window, mask, falloff = _disc_falloff(coords, x, y, radius)
+        # Intensity decreases with distance
+        patch = state[window + (0,)]
+        patch[mask] = np.maximum(patch[mask], intensity * falloff)
+    
+    if environment == 'gaussian':
+        # Features 1-4 are base values plus correlated variation
+        state[:, :, 1] = 0.2 + 0.6 * random()  # Base temperature
+        state[:, :, 2] = 0.3 + 0.4 * random()  # Base humidity
+        state[:, :, 3] = random()  # Predominant wind direction
+        state[:, :, 4] = 0.1 + 0.4 * random()  # Base wind speed
+        GaussianEnvironment((spatial_dim, spatial_dim), correlation_length).initialize(
+            state, np.random if rng is None else rng
+        )
+    
+    else:
+        # Features 1-4 can represent environmental factors
+        # Feature 1: Temperature (normalized between 0-1)
+        state[:, :, 1] = 0.2 + 0.6 * random()  # Base temperature
+        # Add some spatial variation
+        for _ in range(5):
+            x = randint(0, spatial_dim)
+            y = randint(0, spatial_dim)
+            radius = int(spatial_dim * 0.3 * random())
+            if radius == 0:
+                continue  # Nothing to perturb (and dist/radius would be 0/0)
+            window, mask, falloff = _disc_falloff(coords, x, y, radius)
+            # Temperature variation
+            state[window + (1,)][mask] += 0.1 * falloff * (2 * random(falloff.size) - 1)
+        
+        # Feature 2: Humidity (normalized between 0-1)
+        state[:, :, 2] = 0.3 + 0.4 * random()  # Base humidity
+        # Add some spatial variation - humidity often correlates with topography
+        for _ in range(4):
+            x = randint(0, spatial_dim)
+            y = randint(0, spatial_dim)
+            radius = int(spatial_dim * 0.4 * random())
+            if radius == 0:
+                continue  # Nothing to perturb (and dist/radius would be 0/0)
+            window, mask, falloff = _disc_falloff(coords, x, y, radius)
+            state[window + (2,)][mask] += 0.15 * falloff * random(falloff.size)
+        
+        # Feature 3: Wind direction (0-1 normalized to 0-360 degrees)
+        wind_direction = random()  # Predominant wind direction
+        state[:, :, 3] = wind_direction
+        
+        # Feature 4: Wind speed (normalized between 0-1)
+        state[:, :, 4] = 0.1 + 0.4 * random()  # Base wind speed
+        # Add spatial variation to wind speed
+        for _ in range(3):
+            x = randint(0, spatial_dim)
+            y = randint(0, spatial_dim)
+            radius = int(spatial_dim * 0.25 * random())
+            if radius == 0:
+                continue  # Nothing to perturb (and dist/radius would be 0/0)
+            window, mask, falloff = _disc_falloff(coords, x, y, radius)
+            state[window + (4,)][mask] += 0.1 * falloff * random(falloff.size)
+    
+    # Only host cells carry the pathogen
+    if susceptibility is not None:
+        state[:, :, 0] *= susceptibility
+    
+    # Ensure all values are within [0, 1]
+    state = np.clip(state, 0, 1)
+    
+    return state.astype(resolve_dtype(dtype), copy=False)
+
+
+def calculate_favorability(
+    threat_type: str,
+    temperature: np.ndarray,
+    humidity: np.ndarray,
+    wind_speed: np.ndarray
+) -> np.ndarray:
+    """
+    Calculate how favorable the environment is for a threat to spread.
+    
+    Args:
+        threat_type: Type of biological threat
+        temperature: Normalized temperature grid
+        humidity: Normalized humidity grid
+        wind_speed: Normalized wind speed grid
+        
+    Returns:
+        Favorability grid clipped to [0, 1]
+    """
+    # Different pathogens prefer different conditions
+    if threat_type == 'FUNGAL':
+        favorability = 0.5 + 0.5 * humidity - 0.3 * np.abs(temperature - 0.6)
+    elif threat_type == 'BACTERIAL':
+        favorability = 0.3 + 0.4 * humidity + 0.3 * temperature
+    elif threat_type == 'VIRAL':
+        favorability = 0.4 + 0.3 * wind_speed + 0.2 * temperature
+    elif threat_type == 'PEST':
+        favorability = 0.2 + 0.4 * temperature - 0.2 * wind_speed + 0.2 * humidity
+    else:
+        favorability = 0.5 * np.ones_like(temperature)
+    
+    return np.clip(favorability, 0, 1)
+
+
+def _spread_step(
+    curr_state: np.ndarray,
+    threat_type: str,
+    engine: str,
+    rng: Any,
+    environment: Optional[GaussianEnvironment] = None,
+    susceptibility: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Advance a spread simulation by one time step.
+    
+    Args:
+        curr_state: Current state (spatial_dim, spatial_dim, features)
+        threat_type: Type of biological threat to simulate
+        engine: Dense simulation backend, 'loop' or 'vectorized'
+        rng: Random generator (or np.random) for all stochastic draws
+        environment: Correlated weather drift model (None for white noise)
+        susceptibility: Host susceptibility (spatial_dim, spatial_dim) scaling
+            the infection each cell receives (None if every cell is a host).
+            Every cell is still computed, so masking costs an extra pass
+            
+    Returns:
+        Newly allocated next state
+    """
+    spatial_dim = curr_state.shape[0]
+    
+    # Get spread behavior parameters for this threat type
+    behavior = SPREAD_BEHAVIORS.get(threat_type, SPREAD_BEHAVIORS['FUNGAL'])
+    
+    # Simulation constants
+    spread_rate = behavior['spread_rate']
+    weather_influence = behavior['weather_influence']
+    intensity_decay = behavior['intensity_decay']
+    pattern = behavior['pattern']
+    
+    next_state = curr_state.copy()
+    
+    # Extract environmental factors
+    temperature = curr_state[:, :, 1]
+    humidity = curr_state[:, :, 2]
+    wind_direction = curr_state[:, :, 3] * 2 * np.pi  # Convert to radians
+    wind_speed = curr_state[:, :, 4]
+    
+    # Calculate environmental favorability for spread (0-1)
+    favorability = calculate_favorability(threat_type, temperature, humidity, wind_speed)
+    
+    # Pathogen concentration in current state
+    concentration = curr_state[:, :, 0]
+    
+    # Calculate spread based on pattern
+    if pattern == 'radial' and engine == 'vectorized':
+        next_state[:, :, 0] += radial_spread_vectorized(
+            concentration, favorability, spread_rate, radius_scale=3, threshold=0.01
+        )
+    
+    elif pattern == 'directional' and engine == 'vectorized':
+        next_state[:, :, 0] += directional_spread_vectorized(
+            concentration, favorability, wind_direction, wind_speed,
+            spread_rate, weather_influence, rng, threshold=0.01
+        )
+    
+    elif pattern == 'jump' and engine == 'vectorized':
+        next_state[:, :, 0] += jump_spread_vectorized(
+            concentration, favorability, wind_direction,
+            spread_rate, weather_influence, rng, threshold=0.1
+        )
+    
+    elif pattern == 'radial':
+        # Radial spread (typical for fungi and bacteria)
+        for i in range(spatial_dim):
+            for j in range(spatial_dim):
+                if concentration[i, j] > 0.01:
+                    spread_radius = int(1 + 3 * spread_rate * favorability[i, j])
+                    for ni in range(max(0, i-spread_radius), min(spatial_dim, i+spread_radius+1)):
+                        for nj in range(max(0, j-spread_radius), min(spatial_dim, j+spread_radius+1)):
+                            dist = np.sqrt((ni-i)**2 + (nj-j)**2)
+                            if dist <= spread_radius:
+                                spread_factor = concentration[i, j] * (1 - dist/spread_radius) * spread_rate * favorability[i, j]
+                                next_state[ni, nj, 0] = max(next_state[ni, nj, 0], next_state[ni, nj, 0] + spread_factor)
+    
+    elif pattern == 'directional':
+        # Directional spread (following wind)
+        for i in range(spatial_dim):
+            for j in range(spatial_dim):
+                if concentration[i, j] > 0.01:
+                    # Get wind vector
+                    wind_dx = wind_speed[i, j] * np.cos(wind_direction[i, j])
+                    wind_dy = wind_speed[i, j] * np.sin(wind_direction[i, j])
+                    
+                    # Scale by spread rate and favorability
+                    spread_distance = int(1 + 4 * spread_rate * favorability[i, j])
+                    
+                    # Calculate spread direction and intensity
+                    for distance in range(1, spread_distance + 1):
+                        # Position affected by wind
+                        wind_factor = weather_influence * wind_speed[i, j]
+                        ni = int(i + distance * wind_dx * wind_factor)
+                        nj = int(j + distance * wind_dy * wind_factor)
+                        
+                        # Also spread a bit in random directions (less strongly)
+                        for _ in range(3):
+                            random_angle = rng.random() * 2 * np.pi
+                            random_dx = np.cos(random_angle)
+                            random_dy = np.sin(random_angle)
+                            random_dist = 1 + int(2 * rng.random())
+                            ri = int(i + random_dist * random_dx)
+                            rj = int(j + random_dist * random_dy)
+                            
+                            if 0 <= ri < spatial_dim and 0 <= rj < spatial_dim:
+                                random_factor = concentration[i, j] * 0.3 * spread_rate * favorability[i, j] / (1 + random_dist)
+                                next_state[ri, rj, 0] = max(next_state[ri, rj, 0], next_state[ri, rj, 0] + random_factor)
+                        
+                        # Apply wind-driven spread
+                        if 0 <= ni < spatial_dim and 0 <= nj < spatial_dim:
+                            spread_factor = concentration[i, j] * spread_rate * favorability[i, j] / (1 + 0.5 * distance)
+                            next_state[ni, nj, 0] = max(next_state[ni, nj, 0], next_state[ni, nj, 0] + spread_factor)
+    
+    elif pattern == 'jump':
+        # Jump spread (can spread to distant locations, typical for viruses or pests)
+        for i in range(spatial_dim):
+            for j in range(spatial_dim):
+                if concentration[i, j] > 0.1:  # Only significant concentrations can jump
+                    # Regular short-distance spread
+                    spread_radius = int(1 + 2 * spread_rate * favorability[i, j])
+                    for ni in range(max(0, i-spread_radius), min(spatial_dim, i+spread_radius+1)):
+                        for nj in range(max(0, j-spread_radius), min(spatial_dim, j+spread_radius+1)):
+                            dist = np.sqrt((ni-i)**2 + (nj-j)**2)
+                            if dist <= spread_radius:
+                                spread_factor = concentration[i, j] * (1 - dist/spread_radius) * spread_rate * favorability[i, j]
+                                next_state[ni, nj, 0] = max(next_state[ni, nj, 0], next_state[ni, nj, 0] + spread_factor)
+                    
+                    # Occasional long-distance jumps
+                    if rng.random() < 0.1 * concentration[i, j]:
+                        jump_distance = int(5 + 10 * rng.random())  # Long jump
+                        jump_angle = rng.random() * 2 * np.pi
+                        
+                        # Wind influence on jump direction
+                        jump_angle = (1 - weather_influence) * jump_angle + weather_influence * wind_direction[i, j]
+                        
+                        # Calculate jump landing point
+                        ni = int(i + jump_distance * np.cos(jump_angle))
+                        nj = int(j + jump_distance * np.sin(jump_angle))
+                        
+                        if 0 <= ni < spatial_dim and 0 <= nj < spatial_dim:
+                            # Create a new infection point
+                            jump_intensity = concentration[i, j] * 0.3 * (0.7 + 0.6 * rng.random())
+                            next_state[ni, nj, 0] += jump_intensity
+                            
+                            # Create some diffusion around the jump point
+                            small_radius = 2
+                            for li in range(max(0, ni-small_radius), min(spatial_dim, ni+small_radius+1)):
+                                for lj in range(max(0, nj-small_radius), min(spatial_dim, nj+small_radius+1)):
+                                    dist = np.sqrt((li-ni)**2 + (lj-nj)**2)
+                                    if dist <= small_radius:
+                                        spread_factor = jump_intensity * (1 - dist/small_radius) * 0.7
+                                        next_state[li, lj, 0] = max(next_state[li, lj, 0], next_state[li, lj, 0] + spread_factor)
+    
+    # Infection only lands on host cells, in proportion to their susceptibility
+    if susceptibility is not None:
+        next_state[:, :, 0] = concentration + susceptibility * (next_state[:, :, 0] - concentration)
+    
+    # Apply natural decay
+    next_state[:, :, 0] *= (1 - intensity_decay * (1 - favorability))
+    
+    # Update environmental factors slightly for the next time step
+    if environment is not None:
+        environment.drift(next_state, rng)
+    else:
+        # Temperature change
+        next_state[:, :, 1] += 0.02 * (2 * rng.random((spatial_dim, spatial_dim)) - 1)
+        # Humidity change
+        next_state[:, :, 2] += 0.03 * (2 * rng.random((spatial_dim, spatial_dim)) - 1)
+        # Wind direction change (slight)
+        next_state[:, :, 3] += 0.05 * (2 * rng.random((spatial_dim, spatial_dim)) - 1)
+        # Wind speed change
+        next_state[:, :, 4] += 0.04 * (2 * rng.random((spatial_dim, spatial_dim)) - 1)
+    
+    # Ensure all values are within [0, 1]
+    next_state = np.clip(next_state, 0, 1)
+    
+    return next_state
+
+
+def _radial_contributions(
+    rows: np.ndarray,
+    cols: np.ndarray,
+    weight: np.ndarray,
+    radius: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    List the radial fall-off contributions of a set of source cells.
+    
+    Args:
+        rows: Row of each source cell (K,)
+        cols: Column of each source cell (K,)
+        weight: Value spread by each source cell at distance 0
+        radius: Spread radius of each source cell
+        
+    Returns:
+        Tuple of (rows, cols, weights) of the contributions
+    """
+    parts = [(np.empty(0, dtype=int), np.empty(0, dtype=int), np.empty(0, dtype=weight.dtype))]
+    
+    for r in np.unique(radius):
+        group = radius == r
+        kernel = _radial_kernel(int(r))
+        tap_rows, tap_cols = np.nonzero(kernel)
+        parts.append((
+            (rows[group, None] + (tap_rows - r)).ravel(),
+            (cols[group, None] + (tap_cols - r)).ravel(),
+            (weight[group, None] * kernel[tap_rows, tap_cols]).ravel()
+        ))
+    
+    return tuple(np.concatenate(part) for part in zip(*parts))
+
+
+def _sparse_spread_step(
+    curr_state: np.ndarray,
+    support: np.ndarray,
+    threat_type: str,
+    rng: Any,
+    environment: Optional[GaussianEnvironment] = None,
+    susceptibility: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Advance a spread simulation by one time step, updating the pathogen at infected cells only.
+    
+    Computes the same update as the vectorized engine, but the pathogen
+    channel is only read and written at the support (every cell with a
+    concentration of at least SPARSE_SUPPORT_TOLERANCE) and the cells the
+    active part of it spreads to. Cells that decay below the tolerance are
+    cleared, so the support follows the outbreak rather than every cell it
+    ever reached. Contributions to non-host cells are dropped before they
+    are accumulated, so on fragmented landscapes the support never grows
+    beyond the host cells.
+    
+    A step is not O(support) overall. The next frame is a new full grid, and
+    the environmental drift changes every cell, drawing the same random
+    values as the vectorized engine so both engines stay comparable. Each
+    step therefore costs O(H*W) for the copy, the drift and the clipping,
+    plus O(support + frontier) for the pathogen. The sparse engine only
+    saves the pathogen work of the vectorized engine. That saving is large
+    for the radial and jump patterns, whose dense update convolves the
+    whole grid once per spread radius. It is marginal for the directional
+    pattern (FUNGAL, PEST), where the drift dominates either way.
+    
+    Args:
+        curr_state: Current state (spatial_dim, spatial_dim, features)
+        support: Sorted flat indices of the cells with a concentration
+        threat_type: Type of biological threat to simulate
+        rng: Random generator (or np.random) for all stochastic draws
+        environment: Correlated weather drift model (None for white noise)
+        susceptibility: Host susceptibility (spatial_dim, spatial_dim) scaling
+            the infection each cell receives (None if every cell is a host)
+            
+    Returns:
+        Tuple of (next_state, support) for the next time step
+    """
+    height, width, features = curr_state.shape
+    
+    # Get spread behavior parameters for this threat type
+    behavior = SPREAD_BEHAVIORS.get(threat_type, SPREAD_BEHAVIORS['FUNGAL'])
+    spread_rate = behavior['spread_rate']
+    weather_influence = behavior['weather_influence']
+    intensity_decay = behavior['intensity_decay']
+    pattern = behavior['pattern']
+    
+    # Per-cell views of the (contiguous) states, so cells can be gathered by flat index
+    curr_cells = curr_state.reshape(-1, features)
+    next_state = curr_state.copy()
+    next_cells = next_state.reshape(-1, features)
+    
+    def favorability_at(cells: np.ndarray) -> np.ndarray:
+        return calculate_favorability(
+            threat_type, curr_cells[cells, 1], curr_cells[cells, 2], curr_cells[cells, 4]
+        )
+    
+    # Active cells in row-major order, as the vectorized engine visits them
+    threshold = 0.1 if pattern == 'jump' else 0.01
+    active = support[curr_cells[support, 0] > threshold]
+    rows, cols = np.divmod(active, width)
+    c = curr_cells[active, 0]
+    fav = favorability_at(active)
+    
+    targets = [(np.empty(0, dtype=int), np.empty(0, dtype=int), np.empty(0, dtype=c.dtype))]
+    
+    if pattern in ('radial', 'jump'):
+        radius_scale = 3 if pattern == 'radial' else 2
+        radius = (1 + radius_scale * spread_rate * fav).astype(int)
+        targets.append(_radial_contributions(rows, cols, c * spread_rate * fav, radius))
+    
+    # Like the vectorized engine, draw nothing when no cell is active
+    if pattern == 'directional' and len(active):
+        rate = np.full(len(active), spread_rate)
+        draws = rng.random((2, len(active), _directional_distance(rate, fav).max(), 3))
+        wind, random_spread = _directional_contributions(
+            rows, cols, c, fav, curr_cells[active, 4], curr_cells[active, 3] * 2 * np.pi,
+            rate, np.full(len(active), weather_influence), draws
+        )
+        targets += [wind[1:], random_spread[1:]]
+    
+    if pattern == 'jump' and len(active):
+        jumps, landing_rows, landing_cols, jump_intensity = _jump_landings(
+            rows, cols, c, curr_cells[active, 3] * 2 * np.pi, np.full(len(active), weather_influence),
+            rng.random((4, len(active)))
+        )
+        # Landings outside the grid have no diffusion halo either
+        landed = (landing_rows >= 0) & (landing_rows < height) & (landing_cols >= 0) & (landing_cols < width)
+        targets.append((landing_rows[landed], landing_cols[landed], jump_intensity[landed]))
+        targets.append(_radial_contributions(
+            landing_rows[landed], landing_cols[landed], 0.7 * jump_intensity[landed],
+            np.full(np.count_nonzero(landed), JUMP_DIFFUSION_RADIUS)
+        ))
+    
+    # Accumulate the contributions that land on the grid
+    target_rows, target_cols, weights = (np.concatenate(part) for part in zip(*targets))
+    inside = (target_rows >= 0) & (target_rows < height) & (target_cols >= 0) & (target_cols < width)
+    target_cells, weights = target_rows[inside] * width + target_cols[inside], weights[inside]
+    if susceptibility is not None:
+        # Infection only lands on host cells, in proportion to their susceptibility
+        host_weights = susceptibility.reshape(-1)[target_cells]
+        hosts = host_weights > 0
+        target_cells, weights = target_cells[hosts], weights[hosts] * host_weights[hosts]
+    touched, inverse = np.unique(target_cells, return_inverse=True)
+    next_cells[touched, 0] += np.bincount(inverse, weights=weights, minlength=len(touched))
+    
+    # Decay only changes cells with a concentration, which are now the support
+    support = np.union1d(support, touched)
+    next_cells[support, 0] *= (1 - intensity_decay * (1 - favorability_at(support)))
+    next_cells[support, 0] = np.clip(next_cells[support, 0], 0, 1)
+    
+    # Clear burnt-out cells, so the pathogen work follows the active outbreak
+    burnt_out = next_cells[support, 0] < SPARSE_SUPPORT_TOLERANCE
+    next_cells[support[burnt_out], 0] = 0
+    support = support[~burnt_out]
+    
+    # Update environmental factors slightly for the next time step
+    if environment is not None:
+        environment.drift(next_state, rng)
+    else:
+        # Temperature change
+        next_state[:, :, 1] += 0.02 * (2 * rng.random((height, width)) - 1)
+        # Humidity change
+        next_state[:, :, 2] += 0.03 * (2 * rng.random((height, width)) - 1)
+        # Wind direction change (slight)
+        next_state[:, :, 3] += 0.05 * (2 * rng.random((height, width)) - 1)
+        # Wind speed change
+        next_state[:, :, 4] += 0.04 * (2 * rng.random((height, width)) - 1)
+    
+    # Ensure the environmental values are within [0, 1]
+    np.clip(next_state[:, :, 1:], 0, 1, out=next_state[:, :, 1:])
+    
+    return next_state, support
+
+
+class SpreadSimulation:
+    """
+    Step-by-step spread simulation that only keeps the current frame alive.
+    
+    Frames are produced on demand, so long horizons cost O(H*W*F) memory
+    instead of the O(T*H*W*F) of simulate_spread. The current frame, step
+    and random generator state can be checkpointed and resumed later with
+    identical results.
+    """
+    
+    def __init__(
+        self,
+        initial_state: np.ndarray,
+        threat_type: str = 'FUNGAL',
+        random_seed: Optional[int] = None,
+        engine: str = 'vectorized',
+        rng: Optional[np.random.Generator] = None,
+        dtype: Union[str, np.dtype] = DEFAULT_DTYPE,
+        step: int = 0,
+        environment: str = 'discs',
+        correlation_length: float = DEFAULT_CORRELATION_LENGTH,
+        susceptibility: Optional[np.ndarray] = None
+    ):
+        """
+        Initialize the simulation.
+        
+        Args:
+            initial_state: Initial state (spatial_dim, spatial_dim, features)
+            threat_type: Type of biological threat to simulate
+            random_seed: Random seed for reproducibility
+            engine: Simulation backend, one of SIMULATION_ENGINES
+            rng: Random generator for all stochastic draws (defaults as in simulate_spread)
+            dtype: dtype of the returned frames (float16 is simulated in float32)
+            step: Time step of initial_state
+            environment: Environment model, one of ENVIRONMENT_MODELS. 'discs' drifts
+                the weather with white noise, 'gaussian' with correlated fields
+            correlation_length: Correlation length in cells of the 'gaussian' drift
+            susceptibility: Host susceptibility (spatial_dim, spatial_dim) in [0, 1]
+                scaling the infection each cell receives; cells with 0 are never
+                infected (None if every cell is a host)
+        """
+        if engine not in SIMULATION_ENGINES:
+            raise ValueError(f"Unknown simulation engine '{engine}', expected one of {SIMULATION_ENGINES}")
+        if environment not in ENVIRONMENT_MODELS:
+            raise ValueError(f"Unknown environment model '{environment}', expected one of {ENVIRONMENT_MODELS}")
+        
+        if rng is None and engine != 'loop':
+            rng = np.random.default_rng(random_seed)
+        elif rng is None:
+            if random_seed is not None:
+                np.random.seed(random_seed)
+            rng = np.random
+        
+        self.threat_type = threat_type
+        self.engine = engine
+        self.rng = rng
+        self.dtype = resolve_dtype(dtype)
+        self.state = np.array(initial_state, dtype=_compute_dtype(dtype))
+        self.step = step
+        self.susceptibility = _resolve_susceptibility(susceptibility, self.state.shape[:2], self.state.dtype)
+        self.environment = (
+            GaussianEnvironment(self.state.shape[:2], correlation_length)
+            if environment == 'gaussian' else None
+        )
+        
+        # The sparse engine tracks the cells with a non-zero concentration
+        self.support = np.flatnonzero(self.state[:, :, 0]) if engine == 'sparse' else None
+    
+    def frame(self) -> np.ndarray:
+        """
+        Get the current frame in the requested dtype.
+        
+        Returns:
+            Current state (spatial_dim, spatial_dim, features)
+        """
+        return self.state.astype(self.dtype, copy=False)
+    
+    def advance(self) -> np.ndarray:
+        """
+        Simulate one time step.
+        
+        Returns:
+            The new current frame. It is not copied, so modifying it in place
+            changes the rest of the simulation.
+        """
+        if self.engine == 'sparse':
+            next_state, self.support = _sparse_spread_step(
+                self.state, self.support, self.threat_type, self.rng, self.environment, self.susceptibility
+            )
+        else:
+            next_state = _spread_step(
+                self.state, self.threat_type, self.engine, self.rng, self.environment, self.susceptibility
+            )
+        self.state = next_state.astype(self.state.dtype, copy=False)
+        self.step += 1
+        
+        return self.frame()
+    
+    def run(self, time_steps: int) -> Iterator[np.ndarray]:
+        """
+        Simulate a number of time steps, yielding each new frame.
+        
+        Args:
+            time_steps: Number of time steps to simulate
+            
+        Yields:
+            Frames for steps self.step + 1 to self.step + time_steps
+        """
+        for _ in range(time_steps):
+            yield self.advance()
+    
+    def checkpoint(self, path: str) -> None:
+        """
+        Save the current frame, step and random generator state.
+        
+        Args:
+            path: Path of the .npz checkpoint file
+        """
+        if isinstance(self.rng, np.random.Generator):
+            rng_kind, rng_state = 'generator', self.rng.bit_generator.state
+        else:
+            # The global np.random state or a RandomState
+            rng_kind, rng_state = 'random_state', self.rng.get_state(legacy=False)
+        
+        meta = {
+            'step': self.step,
+            'threat_type': self.threat_type,
+            'engine': self.engine,
+            'dtype': self.dtype.name,
+            'rng_kind': rng_kind,
+            'rng_state': _rng_state_to_json(rng_state)
+        }
+        arrays = {}
+        if self.susceptibility is not None:
+            arrays['susceptibility'] = self.susceptibility
+        if self.environment is not None:
+            meta['environment'] = 'gaussian'
+            meta['correlation_length'] = self.environment.correlation_length
+            meta['temporal_correlation'] = self.environment.temporal_correlation
+            if self.environment.increments is not None:
+                arrays['increments'] = self.environment.increments
+        
+        # Write to a temporary file first so an interrupted save keeps the previous checkpoint
+        tmp_path = path + '.tmp.npz'
+        np.savez(tmp_path, state=self.state, meta=json.dumps(meta), **arrays)
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def resume(cls, path: str) -> 'SpreadSimulation':
+        """
+        Restore a simulation from a checkpoint.
+        
+        Checkpoints of loop engine runs on the global np.random state are
+        resumed on a private RandomState with the same stream, leaving the
+        global state untouched.
+        
+        Args:
+            path: Path of a checkpoint written by checkpoint()
+            
+        Returns:
+            The restored simulation
+        """
+        with np.load(path) as checkpoint:
+            state = checkpoint['state']
+            meta = json.loads(str(checkpoint['meta']))
+            increments = checkpoint['increments'] if 'increments' in checkpoint else None
+            susceptibility = checkpoint['susceptibility'] if 'susceptibility' in checkpoint else None
+        
+        rng_state = _rng_state_from_json(meta['rng_state'])
+        if meta['rng_kind'] == 'generator':
+            bit_generator = getattr(np.random, rng_state['bit_generator'])()
+            bit_generator.state = rng_state
+            rng = np.random.Generator(bit_generator)
+        else:
+            rng = np.random.RandomState()
+            rng.set_state(rng_state)
+        
+        simulation = cls(
+            state,
+            threat_type=meta['threat_type'],
+            engine=meta['engine'],
+            rng=rng,
+            dtype=meta['dtype'],
+            step=meta['step'],
+            environment=meta.get('environment', 'discs'),
+            correlation_length=meta.get('correlation_length', DEFAULT_CORRELATION_LENGTH),
+            susceptibility=susceptibility
+        )
+        if simulation.environment is not None:
+            simulation.environment.temporal_correlation = meta['temporal_correlation']
+            simulation.environment.increments = increments
+        
+        return simulation
+
+
+def _rng_state_to_json(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert the arrays in a bit generator state to lists."""
+    return {
+        key: _rng_state_to_json(value) if isinstance(value, dict)
+        else value.tolist() if isinstance(value, np.ndarray)
+        else value
+        for key, value in state.items()
+    }
+
+
+def _rng_state_from_json(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Restore the arrays in a bit generator state converted by _rng_state_to_json."""
+    return {
+        key: _rng_state_from_json(value) if isinstance(value, dict)
+        else np.array(value, dtype=np.uint32) if isinstance(value, list)
+        else value
+        for key, value in state.items()
+    }
+
+
+def iter_spread(
+    initial_state: np.ndarray,
+    time_steps: int,
+    threat_type: str = 'FUNGAL',
+    random_seed: Optional[int] = None,
+    engine: str = 'vectorized',
+    rng: Optional[np.random.Generator] = None,
+    dtype: Union[str, np.dtype] = DEFAULT_DTYPE,
+    environment: str = 'discs',
+    correlation_length: float = DEFAULT_CORRELATION_LENGTH,
+    susceptibility: Optional[np.ndarray] = None
+) -> Iterator[np.ndarray]:
+    """
+    Simulate the spread of a pathogen, yielding states as they are produced.
+    
+    Yields the same states as simulate_spread with the same arguments while
+    only holding the current frame; use SpreadSimulation directly to
+    checkpoint and resume long simulations.
+    
+    Args:
+        initial_state: Initial state (spatial_dim, spatial_dim, features)
+        time_steps: Number of states to yield, including the initial state
+        threat_type: Type of biological threat to simulate
+        random_seed: Random seed for reproducibility
+        engine: Simulation backend, one of SIMULATION_ENGINES
+        rng: Random generator for all stochastic draws (defaults as in simulate_spread)
+        dtype: dtype of the yielded states (float16 is simulated in float32)
+        environment: Environment model of the weather drift, one of ENVIRONMENT_MODELS
+        correlation_length: Correlation length in cells of the 'gaussian' drift
+        susceptibility: Host susceptibility (spatial_dim, spatial_dim) in [0, 1]
+            (None if every cell is a host)
+            
+    Yields:
+        States (spatial_dim, spatial_dim, features) for time steps 0 to time_steps - 1
+    """
+    simulation = SpreadSimulation(
+        initial_state, threat_type=threat_type, random_seed=random_seed, engine=engine, rng=rng, dtype=dtype,
+        environment=environment, correlation_length=correlation_length, susceptibility=susceptibility
+    )
+    
+    if time_steps > 0:
+        yield simulation.frame()
+        yield from simulation.run(time_steps - 1)
+
+
+def simulate_spread(
+    initial_state: np.ndarray,
+    time_steps: int,
+    threat_type: str = 'FUNGAL',
+    random_seed: Optional[int] = None,
+    engine: str = 'vectorized',
+    rng: Optional[np.random.Generator] = None,
+    dtype: Union[str, np.dtype] = DEFAULT_DTYPE,
+    environment: str = 'discs',
+    correlation_length: float = DEFAULT_CORRELATION_LENGTH,
+    susceptibility: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Simulate the spread of a pathogen over time.
+    
+    Args:
+        initial_state: Initial state (spatial_dim, spatial_dim, features)
+        time_steps: Number of time steps to simulate
+        threat_type: Type of biological threat to simulate
+        random_seed: Random seed for reproducibility
+        engine: Simulation backend, one of SIMULATION_ENGINES. 'vectorized'
+            computes every pattern on the whole grid at once; its radial
+            pattern matches 'loop' within RADIAL_ENGINE_TOLERANCE. 'sparse'
+            follows the vectorized engine (same random draws) but only
+            updates the pathogen at infected cells. The weather drift
+            stays dense, so a step still costs O(H*W); see
+            _sparse_spread_step for when this pays off.
+        rng: Random generator for all stochastic draws. Defaults to
+            np.random.default_rng(random_seed) for the vectorized and sparse engines and
+            to the global np.random state (seeded with random_seed) for the
+            loop engine.
+        dtype: dtype of the returned sequence (float16 is simulated in float32)
+        environment: Environment model of the weather drift, one of ENVIRONMENT_MODELS
+        correlation_length: Correlation length in cells of the 'gaussian' drift
+        susceptibility: Host susceptibility (spatial_dim, spatial_dim) in [0, 1],
+            e.g. a load_susceptibility_raster window. Each cell receives
+            infection in proportion to it and non-host cells (0) are never
+            infected (None if every cell is a host). Masking adds no
+            speedup: 'loop' and 'vectorized' still compute every cell and
+            then scale the infection, which costs one more pass over the
+            grid. 'sparse' only skips the pathogen work on non-host cells,
+            while the weather drift stays dense
+            
+    Returns:
+        Sequence of states over time (time_steps, spatial_dim, spatial_dim, features)
+    """
+    spatial_dim, _, features = initial_state.shape
+    
+    # Initialize the sequence with the initial state
+    sequence = np.zeros((time_steps, spatial_dim, spatial_dim, features), dtype=resolve_dtype(dtype))
+    
+    # Fill it from the streaming simulation
+    states = iter_spread(
+        initial_state, time_steps, threat_type, random_seed, engine, rng, dtype, environment, correlation_length,
+        susceptibility
+    )
+    for t, state in enumerate(states):
+        sequence[t] = state
+    
+    return sequence
+
+
+def simulate_spread_batch(
+    initial_states: np.ndarray,
+    time_steps: int,
+    threat_types: Union[str, Sequence[str]] = 'FUNGAL',
+    random_seed: Optional[int] = None,
+    rng: Optional[np.random.Generator] = None,
+    dtype: Union[str, np.dtype] = DEFAULT_DTYPE,
+    environment: str = 'discs',
+    correlation_length: float = DEFAULT_CORRELATION_LENGTH,
+    behaviors: Optional[Sequence[Dict[str, Any]]] = None,
+    susceptibility: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Simulate the spread of N independent scenarios together.
+    
+    Uses the same dynamics as the vectorized engine of simulate_spread, but
+    advances all scenarios as one (N, spatial_dim, spatial_dim, features)
+    array so the per-step overhead is paid once per batch. Each scenario
+    uses the SPREAD_BEHAVIORS parameters of its own threat type unless
+    behaviors are given, e.g. to evaluate candidate parameters together.
+    
+    Args:
+        initial_states: Initial states (N, spatial_dim, spatial_dim, features)
+        time_steps: Number of time steps to simulate
+        threat_types: Threat type of each scenario, or one type for all of them
+        random_seed: Random seed for reproducibility
+        rng: Random generator for all stochastic draws (overrides random_seed)
+        dtype: dtype of the returned sequences (float16 is simulated in float32)
+        environment: Environment model of the weather drift, one of ENVIRONMENT_MODELS
+        correlation_length: Correlation length in cells of the 'gaussian' drift
+        behaviors: Spread behavior of each scenario, overriding SPREAD_BEHAVIORS
+            (favorability still follows the threat type)
+        susceptibility: Host susceptibility (spatial_dim, spatial_dim) shared by all
+            scenarios (None if every cell is a host)
+            
+    Returns:
+        Sequences of states (N, time_steps, spatial_dim, spatial_dim, features)
+    """
+    num_scenarios, spatial_dim, _, features = initial_states.shape
+    
+    if isinstance(threat_types, str):
+        threat_types = [threat_types] * num_scenarios
+    if len(threat_types) != num_scenarios:
+        raise ValueError(f"Expected {num_scenarios} threat types, got {len(threat_types)}")
+    if environment not in ENVIRONMENT_MODELS:
+        raise ValueError(f"Unknown environment model '{environment}', expected one of {ENVIRONMENT_MODELS}")
+    
+    if rng is None:
+        rng = np.random.default_rng(random_seed)
+    
+    compute_dtype = _compute_dtype(dtype)
+    susceptibility = _resolve_susceptibility(susceptibility, (spatial_dim, spatial_dim), compute_dtype)
+    
+    # Correlated weather drift, shared filter for all scenarios
+    weather = (
+        GaussianEnvironment((spatial_dim, spatial_dim), correlation_length)
+        if environment == 'gaussian' else None
+    )
+    
+    # Per-scenario behavior parameters, shaped to broadcast over the grid
+    if behaviors is None:
+        behaviors = [SPREAD_BEHAVIORS.get(threat_type, SPREAD_BEHAVIORS['FUNGAL']) for threat_type in threat_types]
+    elif len(behaviors) != num_scenarios:
+        raise ValueError(f"Expected {num_scenarios} behaviors, got {len(behaviors)}")
+    spread_rate = np.array([b['spread_rate'] for b in behaviors], dtype=compute_dtype)[:, None, None]
+    weather_influence = np.array([b['weather_influence'] for b in behaviors], dtype=compute_dtype)[:, None, None]
+    intensity_decay = np.array([b['intensity_decay'] for b in behaviors], dtype=compute_dtype)[:, None, None]
+    
+    # Scenario indices grouped by threat type and by spread pattern
+    type_groups = {t: np.flatnonzero(np.asarray(threat_types) == t) for t in set(threat_types)}
+    patterns = np.array([b['pattern'] for b in behaviors])
+    pattern_groups = {p: np.flatnonzero(patterns == p) for p in set(patterns)}
+    
+    # Initialize the sequences with the initial states
+    sequences = np.zeros((num_scenarios, time_steps, spatial_dim, spatial_dim, features), dtype=compute_dtype)
+    sequences[:, 0] = initial_states
+    
+    for t in range(1, time_steps):
+        curr_state = sequences[:, t-1]
+        next_state = curr_state.copy()
+        
+        # Extract environmental factors
+        temperature = curr_state[..., 1]
+        humidity = curr_state[..., 2]
+        wind_direction = curr_state[..., 3] * 2 * np.pi  # Convert to radians
+        wind_speed = curr_state[..., 4]
+        concentration = curr_state[..., 0]
+        
+        favorability = np.empty_like(concentration)
+        for threat_type, idx in type_groups.items():
+            favorability[idx] = calculate_favorability(
+                threat_type, temperature[idx], humidity[idx], wind_speed[idx]
+            )
+        
+        # Calculate spread for each pattern group
+        for pattern, idx in pattern_groups.items():
+            if pattern == 'directional':
+                next_state[idx, :, :, 0] += directional_spread_vectorized(
+                    concentration[idx], favorability[idx], wind_direction[idx], wind_speed[idx],
+                    spread_rate[idx], weather_influence[idx], rng, threshold=0.01
+                )
+            elif pattern == 'jump':
+                next_state[idx, :, :, 0] += jump_spread_vectorized(
+                    concentration[idx], favorability[idx], wind_direction[idx],
+                    spread_rate[idx], weather_influence[idx], rng, threshold=0.1
+                )
+            else:
+                next_state[idx, :, :, 0] += radial_spread_vectorized(
+                    concentration[idx], favorability[idx], spread_rate[idx], radius_scale=3, threshold=0.01
+                )
+        
+        # Infection only lands on host cells, in proportion to their susceptibility
+        if susceptibility is not None:
+            next_state[..., 0] = concentration + susceptibility * (next_state[..., 0] - concentration)
+        
+        # Apply natural decay
+        next_state[..., 0] *= (1 - intensity_decay * (1 - favorability))
+        
+        # Update environmental factors slightly for the next time step
+        if weather is not None:
+            weather.drift(next_state, rng)
+        else:
+            grid_shape = (num_scenarios, spatial_dim, spatial_dim)
+            next_state[..., 1] += 0.02 * (2 * rng.random(grid_shape) - 1)
+            next_state[..., 2] += 0.03 * (2 * rng.random(grid_shape) - 1)
+            next_state[..., 3] += 0.05 * (2 * rng.random(grid_shape) - 1)
+            next_state[..., 4] += 0.04 * (2 * rng.random(grid_shape) - 1)
+        
+        # Ensure all values are within [0, 1]
+        sequences[:, t] = np.clip(next_state, 0, 1)
+    
+    return sequences.astype(resolve_dtype(dtype), copy=False)
+
+
+def spread_halo_width(threat_type: Optional[str] = None) -> int:
+    """
+    Get the furthest distance a cell can spread to in one time step.
+    
+    Tiles of a domain-decomposed simulation need a halo this wide around
+    them to see every cell that can contribute to their interior.
+    
+    Args:
+        threat_type: Threat type to compute the reach of (None for the
+            maximum over all SPREAD_BEHAVIORS)
+            
+    Returns:
+        Halo width in cells
+    """
+    threat_types = list(SPREAD_BEHAVIORS.keys()) if threat_type is None else [threat_type]
+    reach = 0
+    
+    for name in threat_types:
+        behavior = SPREAD_BEHAVIORS.get(name, SPREAD_BEHAVIORS['FUNGAL'])
+        rate = behavior['spread_rate']
+        
+        # Favorability and wind speed are at most 1
+        if behavior['pattern'] == 'radial':
+            reach = max(reach, int(1 + 3 * rate))
+        elif behavior['pattern'] == 'directional':
+            wind_reach = int(np.ceil(int(1 + 4 * rate) * behavior['weather_influence']))
+            # Random-direction contributions land up to 2 cells away
+            reach = max(reach, wind_reach, 2)
+        elif behavior['pattern'] == 'jump':
+            # Jumps travel up to 14 cells and diffuse around the landing point
+            reach = max(reach, int(1 + 2 * rate), 14 + JUMP_DIFFUSION_RADIUS)
+    
+    return reach
+
+
+# Streams of the counter-based per-cell random numbers used by tiled simulations
+_KEYED_STREAMS = {'directional': 0, 'jump': 1, 'environment': 2, 'coarse_environment': 3}
+
+
+def _keyed_uniform(
+    random_seed: int,
+    step: int,
+    stream: str,
+    cells: np.ndarray,
+    count: int
+) -> np.ndarray:
+    """
+    Draw uniform random numbers keyed by time step and global cell index.
+    
+    Values come from a SplitMix64 sequence positioned at cell * count + k,
+    so the numbers a cell gets do not depend on which tile or process
+    computes them, or on which other cells are drawn alongside it.
+    
+    Args:
+        random_seed: Root seed of the simulation
+        step: Time step being computed
+        stream: Name of the random stream (see _KEYED_STREAMS)
+        cells: Global flat indices of the cells, any shape
+        count: Number of values per cell
+        
+    Returns:
+        Uniform values in [0, 1) of shape cells.shape + (count,)
+    """
+    key = np.random.SeedSequence([random_seed, step, _KEYED_STREAMS[stream]]).generate_state(1, np.uint64)[0]
+    
+    # SplitMix64: Weyl sequence positions, then the output mixing function,
+    # updated in place since these arrays cover whole tiles
+    x = np.asarray(cells, dtype=np.uint64)[..., None] * np.uint64(count) + np.arange(1, count + 1, dtype=np.uint64)
+    x *= np.uint64(0x9E3779B97F4A7C15)
+    x += key
+    shifted = x >> np.uint64(30)
+    x ^= shifted
+    x *= np.uint64(0xBF58476D1CE4E5B9)
+    np.right_shift(x, np.uint64(27), out=shifted)
+    x ^= shifted
+    x *= np.uint64(0x94D049BB133111EB)
+    np.right_shift(x, np.uint64(31), out=shifted)
+    x ^= shifted
+    
+    # Top 53 bits as a double in [0, 1)
+    x >>= np.uint64(11)
+    uniform = x.astype(np.float64)
+    uniform *= 2.0 ** -53
+    
+    return uniform
+
+
+def _advance_tile(
+    curr_state: np.ndarray,
+    next_state: np.ndarray,
+    tile: Tuple[int, int, int, int],
+    halo: int,
+    threat_type: str,
+    random_seed: int,
+    step: int
+) -> None:
+    """
+    Advance one tile of a domain-decomposed simulation by one time step.
+    
+    Reads the tile plus its halo from curr_state and writes the tile interior
+    of next_state. The update follows the vectorized engine, except that all
+    random numbers are keyed by cell (see _keyed_uniform).
+    
+    Args:
+        curr_state: Full domain at the current step (H, W, F)
+        next_state: Full domain at the next step, written in the tile only
+        tile: Tile bounds (row_start, row_stop, col_start, col_stop)
+        halo: Halo width, at least spread_halo_width(threat_type)
+        threat_type: Type of biological threat to simulate
+        random_seed: Root seed of the per-cell random streams
+        step: Time step being computed
+    """
+    height, width = curr_state.shape[:2]
+    row_start, row_stop, col_start, col_stop = tile
+    
+    # Tile plus halo, clipped to the domain
+    top, left = max(0, row_start - halo), max(0, col_start - halo)
+    window = curr_state[top:min(height, row_stop + halo), left:min(width, col_stop + halo)]
+    interior = (slice(row_start - top, row_stop - top), slice(col_start - left, col_stop - left))
+    
+    next_state[row_start:row_stop, col_start:col_stop] = _advance_window(
+        window, interior, (top, left), width, threat_type, random_seed, step
+    )
+
+
+def _advance_window(
+    window: np.ndarray,
+    interior: Tuple[slice, slice],
+    origin: Tuple[int, int],
+    domain_width: int,
+    threat_type: str,
+    random_seed: int,
+    step: int
+) -> np.ndarray:
+    """
+    Compute the next state of the interior of a window of a larger domain.
+    
+    The update follows the vectorized engine with random numbers keyed by
+    global cell index (see _keyed_uniform), so it does not depend on how the
+    domain is split into windows.
+    
+    Args:
+        window: Current state of the interior plus a halo (h, w, F)
+        interior: Slices of the interior within the window
+        origin: Global (row, col) of the window's first cell
+        domain_width: Width of the whole domain in cells
+        threat_type: Type of biological threat to simulate
+        random_seed: Root seed of the per-cell random streams
+        step: Time step being computed
+        
+    Returns:
+        Next state of the interior
+    """
+    top, left = origin
+    width = domain_width
+    row_start, row_stop = top + interior[0].start, top + interior[0].stop
+    col_start, col_stop = left + interior[1].start, left + interior[1].stop
+    
+    behavior = SPREAD_BEHAVIORS.get(threat_type, SPREAD_BEHAVIORS['FUNGAL'])
+    spread_rate = behavior['spread_rate']
+    weather_influence = behavior['weather_influence']
+    pattern = behavior['pattern']
+    
+    wind_direction = window[:, :, 3] * 2 * np.pi
+    favorability = calculate_favorability(threat_type, window[:, :, 1], window[:, :, 2], window[:, :, 4])
+    concentration = window[:, :, 0]
+    
+    def global_cells(rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        return (rows + top) * width + (cols + left)
+    
+    if pattern == 'radial':
+        contribution = radial_spread_vectorized(concentration, favorability, spread_rate, radius_scale=3)
+    
+    elif pattern == 'directional':
+        active, offsets, rows, cols = _active_cells(concentration, 0.01)
+        contribution = np.zeros_like(concentration)
+        if len(rows):
+            rate = np.full(len(rows), spread_rate)
+            # Draw for the longest possible distance so draws do not depend on the window
+            max_distance = int(1 + 4 * spread_rate)
+            draws = _keyed_uniform(random_seed, step, 'directional', global_cells(rows, cols), 2 * max_distance * 3)
+            draws = draws.reshape(len(rows), 2, max_distance, 3).transpose(1, 0, 2, 3)
+            wind, random_spread = _directional_contributions(
+                rows, cols, concentration[active], favorability[active], window[:, :, 4][active],
+                wind_direction[active], rate, np.full(len(rows), weather_influence), draws
+            )
+            contribution = (
+                _scatter_add(concentration.shape, offsets[wind[0]], *wind[1:])
+                + _scatter_add(concentration.shape, offsets[random_spread[0]], *random_spread[1:])
+            )
+    
+    else:
+        contribution = radial_spread_vectorized(
+            concentration, favorability, spread_rate, radius_scale=2, threshold=0.1
+        )
+        active, offsets, rows, cols = _active_cells(concentration, 0.1)
+        if len(rows):
+            draws = _keyed_uniform(random_seed, step, 'jump', global_cells(rows, cols), 4).T
+            jumps, landing_rows, landing_cols, jump_intensity = _jump_landings(
+                rows, cols, concentration[active], wind_direction[active],
+                np.full(len(rows), weather_influence), draws
+            )
+            landings = _scatter_add(concentration.shape, offsets[jumps], landing_rows, landing_cols, jump_intensity)
+            contribution += landings + 0.7 * _convolve_same(landings, _radial_kernel(JUMP_DIFFUSION_RADIUS))
+    
+    # Everything below is local to a cell, so only the interior is computed
+    tile_state = window[interior].copy()
+    tile_state[:, :, 0] += contribution[interior]
+    
+    # Apply natural decay
+    tile_state[:, :, 0] *= (1 - behavior['intensity_decay'] * (1 - favorability[interior]))
+    
+    # Update environmental factors slightly for the next time step
+    cells = np.arange(row_start, row_stop)[:, None] * width + np.arange(col_start, col_stop)[None, :]
+    drift = _keyed_uniform(random_seed, step, 'environment', cells, 4)
+    drift *= 2
+    drift -= 1
+    # Temperature, humidity, wind direction and wind speed changes
+    drift *= np.array([0.02, 0.03, 0.05, 0.04])
+    tile_state[:, :, 1:5] += drift
+    
+    # Ensure all values are within [0, 1]
+    return np.clip(tile_state, 0, 1)
+
+
+# Shared buffers and settings of a tile worker process
+_TILE_WORKER = {}
+
+
+def _init_tile_worker(
+    buffer_names: Tuple[str, str],
+    shape: Tuple[int, ...],
+    dtype: str,
+    halo: int,
+    threat_type: str,
+    random_seed: int
+) -> None:
+    """
+    Process pool initializer: attach to the shared double buffer.
+    
+    Args:
+        buffer_names: Names of the two shared memory blocks
+        shape: Shape of the domain (H, W, F)
+        dtype: dtype of the domain
+        halo: Halo width
+        threat_type: Type of biological threat to simulate
+        random_seed: Root seed of the per-cell random streams
+    """
+    blocks = [shared_memory.SharedMemory(name=name) for name in buffer_names]
+    _TILE_WORKER.update(
+        blocks=blocks,
+        buffers=[np.ndarray(shape, dtype=dtype, buffer=block.buf) for block in blocks],
+        halo=halo,
+        threat_type=threat_type,
+        random_seed=random_seed
+    )
+
+
+def _advance_shared_tile(task: Tuple[Tuple[int, int, int, int], int]) -> None:
+    """
+    Process pool entry point: advance one tile in the shared double buffer.
+    
+    Args:
+        task: Tuple of (tile bounds, step being computed)
+    """
+    tile, step = task
+    buffers = _TILE_WORKER['buffers']
+    _advance_tile(
+        buffers[(step - 1) % 2], buffers[step % 2], tile,
+        _TILE_WORKER['halo'], _TILE_WORKER['threat_type'], _TILE_WORKER['random_seed'], step
+    )
+
+
+class TiledSpreadSimulation:
+    """
+    Domain-decomposed spread simulation for grids too large for one process.
     
-    Args:
-        spatial_dim: Dimension of the spatial grid (square)
-        features: Number of features per grid cell
-        concentration: Concentration of the initial infection (0-1)
-        num_points: Number of initial infection points
-        random_seed: Random seed for reproducibility
-        
-    Returns:
-        Initial state as numpy array of shape (spatial_dim, spatial_dim, features)
+    The domain is split into tiles that worker processes advance in
+    parallel. The domain lives in a double buffer in shared memory: every
+    step each tile reads itself plus a halo of neighbouring cells from the
+    current buffer and writes its interior to the other one, so halos are
+    exchanged through the buffer between steps.
+    
+    Random numbers are keyed by (seed, step, cell) instead of being drawn
+    from one sequential generator, so every tile owns an independent,
+    deterministic slice of the random streams and the result is identical
+    for any tiling and number of workers, including a single tile computed
+    in-process. Spread, decay and clipping follow the vectorized engine.
     """
-    if random_seed is not None:
-        np.random.seed(random_seed)
     
-    # Initialize an empty grid
-    state = np.zeros((spatial_dim, spatial_dim, features))
+    def __init__(
+        self,
+        initial_state: np.ndarray,
+        threat_type: str = 'FUNGAL',
+        random_seed: int = 0,
+        tile_size: int = 1024,
+        workers: Optional[int] = None,
+        halo: Optional[int] = None,
+        dtype: Union[str, np.dtype] = DEFAULT_DTYPE
+    ):
+        """
+        Initialize the simulation.
+        
+        Args:
+            initial_state: Initial state (H, W, features)
+            threat_type: Type of biological threat to simulate
+            random_seed: Root seed of the per-cell random streams
+            tile_size: Side length of the tiles
+            workers: Number of worker processes (None or 1 to advance the
+                tiles in this process)
+            halo: Halo width (defaults to spread_halo_width(threat_type))
+            dtype: dtype of the returned frames (float16 is simulated in float32)
+        """
+        minimum_halo = spread_halo_width(threat_type)
+        if halo is None:
+            halo = minimum_halo
+        elif halo < minimum_halo:
+            raise ValueError(f"Halo of {halo} cells is narrower than the spread reach of {minimum_halo} cells")
+        
+        self.threat_type = threat_type
+        self.random_seed = random_seed
+        self.halo = halo
+        self.dtype = resolve_dtype(dtype)
+        self.step = 0
+        
+        height, width = initial_state.shape[:2]
+        self.tiles = [
+            (row, min(row + tile_size, height), col, min(col + tile_size, width))
+            for row in range(0, height, tile_size)
+            for col in range(0, width, tile_size)
+        ]
+        
+        compute_dtype = _compute_dtype(dtype)
+        shape = initial_state.shape
+        self._pool = None
+        
+        if workers is not None and workers > 1:
+            nbytes = int(np.prod(shape)) * compute_dtype.itemsize
+            self._blocks = [shared_memory.SharedMemory(create=True, size=nbytes) for _ in range(2)]
+            self._buffers = [np.ndarray(shape, dtype=compute_dtype, buffer=block.buf) for block in self._blocks]
+            self._pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_tile_worker,
+                initargs=(
+                    tuple(block.name for block in self._blocks), shape, compute_dtype.name,
+                    halo, threat_type, random_seed
+                )
+            )
+        else:
+            self._blocks = []
+            self._buffers = [np.empty(shape, dtype=compute_dtype) for _ in range(2)]
+        
+        self._buffers[0][...] = initial_state
+        logger.info(f"Tiled simulation of {height}x{width} cells: {len(self.tiles)} tile(s), "
+                    f"halo {halo}, {workers or 1} worker(s)")
     
-    # Feature 0 represents pathogen concentration
-    # Generate random points for initial infections
-    for _ in range(num_points):
-        x = np.random.randint(0, spatial_dim)
-        y = np.random.randint(0, spatial_dim)
+    @property
+    def state(self) -> np.ndarray:
+        """Current state of the whole domain (a view of the shared buffer)."""
+        return self._buffers[self.step % 2]
+    
+    def frame(self) -> np.ndarray:
+        """
+        Copy the current state of the whole domain.
         
-        # Set initial concentration
-        intensity = concentration * (0.8 + 0.4 * np.random.random())  # Some randomness
-        state[x, y, 0] = intensity
+        Returns:
+            Current state (H, W, features) in the requested dtype
+        """
+        return self.state.astype(self.dtype)
+    
+    def advance(self, time_steps: int = 1) -> None:
+        """
+        Simulate a number of time steps.
         
-        # Create some diffusion around the point
-        radius = int(3 + 3 * np.random.random())  # Random radius between 3-6
-        for i in range(max(0, x-radius), min(spatial_dim, x+radius+1)):
-            for j in range(max(0, y-radius), min(spatial_dim, y+radius+1)):
-                # Calculate distance from center
-                dist = np.sqrt((i-x)**2 + (j-y)**2)
-                if dist <= radius:
-                    # Intensity decreases with distance
-                    state[i, j, 0] = max(state[i, j, 0], intensity * (1 - dist/radius))
-    
-    # Features 1-4 can represent environmental factors
-    # Features 1-4 can represent environmental factors
-    # Feature 1: Temperature (normalized between 0-1)
-    state[:, :, 1] = 0.2 + 0.6 * np.random.random()  # Base temperature
-    # Add some spatial variation
-    for i in range(5):
-        x = np.random.randint(0, spatial_dim)
-        y = np.random.randint(0, spatial_dim)
-        radius = int(spatial_dim * 0.3 * np.random.random())
-        for i in range(max(0, x-radius), min(spatial_dim, x+radius+1)):
-            for j in range(max(0, y-radius), min(spatial_dim, y+radius+1)):
-                dist = np.sqrt((i-x)**2 + (j-y)**2)
-                if dist <= radius:
-                    # Temperature variation
-                    state[i, j, 1] += 0.1 * (1 - dist/radius) * (2 * np.random.random() - 1)
-    
-    # Feature 2: Humidity (normalized between 0-1)
-    state[:, :, 2] = 0.3 + 0.4 * np.random.random()  # Base humidity
-    # Add some spatial variation - humidity often correlates with topography
-    for i in range(4):
-        x = np.random.randint(0, spatial_dim)
-        y = np.random.randint(0, spatial_dim)
-        radius = int(spatial_dim * 0.4 * np.random.random())
-        for i in range(max(0, x-radius), min(spatial_dim, x+radius+1)):
-            for j in range(max(0, y-radius), min(spatial_dim, y+radius+1)):
-                dist = np.sqrt((i-x)**2 + (j-y)**2)
-                if dist <= radius:
-                    state[i, j, 2] += 0.15 * (1 - dist/radius) * np.random.random()
-    
-    # Feature 3: Wind direction (0-1 normalized to 0-360 degrees)
-    wind_direction = np.random.random()  # Predominant wind direction
-    state[:, :, 3] = wind_direction
-    
-    # Feature 4: Wind speed (normalized between 0-1)
-    state[:, :, 4] = 0.1 + 0.4 * np.random.random()  # Base wind speed
-    # Add spatial variation to wind speed
-    for i in range(3):
-        x = np.random.randint(0, spatial_dim)
-        y = np.random.randint(0, spatial_dim)
-        radius = int(spatial_dim * 0.25 * np.random.random())
-        for i in range(max(0, x-radius), min(spatial_dim, x+radius+1)):
-            for j in range(max(0, y-radius), min(spatial_dim, y+radius+1)):
-                dist = np.sqrt((i-x)**2 + (j-y)**2)
-                if dist <= radius:
-                    state[i, j, 4] += 0.1 * (1 - dist/radius) * np.random.random()
+        Args:
+            time_steps: Number of time steps to simulate
+        """
+        for _ in range(time_steps):
+            step = self.step + 1
+            if self._pool is not None:
+                # Every tile must finish before the buffers swap roles
+                list(self._pool.map(_advance_shared_tile, [(tile, step) for tile in self.tiles]))
+            else:
+                for tile in self.tiles:
+                    _advance_tile(self._buffers[self.step % 2], self._buffers[step % 2], tile,
+                                  self.halo, self.threat_type, self.random_seed, step)
+            self.step = step
     
-    # Ensure all values are within [0, 1]
-    state = np.clip(state, 0, 1)
+    def close(self) -> None:
+        """Shut down the worker processes and release the shared memory."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        
+        # Keep the current state readable after the shared memory is gone
+        if self._blocks:
+            self._buffers = [buffer.copy() for buffer in self._buffers]
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
     
-    return state
+    def __enter__(self) -> 'TiledSpreadSimulation':
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
 
-def simulate_spread(
+def simulate_spread_tiled(
     initial_state: np.ndarray,
     time_steps: int,
     threat_type: str = 'FUNGAL',
-    random_seed: Optional[int] = None
+    random_seed: int = 0,
+    tile_size: int = 1024,
+    workers: Optional[int] = None,
+    dtype: Union[str, np.dtype] = DEFAULT_DTYPE
 ) -> np.ndarray:
     """
-    Simulate the spread of a pathogen over time.
+    Simulate the spread of a pathogen over a large domain split into tiles.
+    
+    Only the final state is returned; a full sequence of a county-sized
+    domain would not fit in memory. See TiledSpreadSimulation.
     
     Args:
-        initial_state: Initial state (spatial_dim, spatial_dim, features)
-        time_steps: Number of time steps to simulate
+        initial_state: Initial state (H, W, features)
+        time_steps: Number of time steps, counting the initial state as in simulate_spread
         threat_type: Type of biological threat to simulate
-        random_seed: Random seed for reproducibility
+        random_seed: Root seed of the per-cell random streams
+        tile_size: Side length of the tiles
+        workers: Number of worker processes
+        dtype: dtype of the returned state (float16 is simulated in float32)
         
     Returns:
-        Sequence of states over time (time_steps, spatial_dim, spatial_dim, features)
+        State after time_steps - 1 steps (H, W, features)
+    """
+    with TiledSpreadSimulation(
+        initial_state, threat_type, random_seed, tile_size=tile_size, workers=workers, dtype=dtype
+    ) as simulation:
+        simulation.advance(time_steps - 1)
+        return simulation.frame()
+
+
+def _uniform_spread_gain(
+    threat_type: str,
+    concentration: np.ndarray,
+    favorability: np.ndarray
+) -> np.ndarray:
     """
-    if random_seed is not None:
-        np.random.seed(random_seed)
+    Expected concentration a cell gains from spread inside a uniform region.
     
-    spatial_dim, _, features = initial_state.shape
+    Used for the coarse cells of an adaptive simulation, which only know the
+    mean state of a block: if every cell of the neighbourhood had this
+    concentration and favorability, each cell would receive the spread of
+    every pattern summed over its kernel, and random jumps and directions
+    average out to their expectations.
     
-    # Get spread behavior parameters for this threat type
+    Args:
+        threat_type: Type of biological threat to simulate
+        concentration: Mean pathogen concentration of each coarse cell
+        favorability: Favorability of each coarse cell
+        
+    Returns:
+        Expected concentration increments of each coarse cell
+    """
     behavior = SPREAD_BEHAVIORS.get(threat_type, SPREAD_BEHAVIORS['FUNGAL'])
-    
-    # Initialize the sequence with the initial state
-    sequence = np.zeros((time_steps, spatial_dim, spatial_dim, features))
-    sequence[0] = initial_state.copy()
-    
-    # Simulation constants
     spread_rate = behavior['spread_rate']
-    weather_influence = behavior['weather_influence']
-    intensity_decay = behavior['intensity_decay']
     pattern = behavior['pattern']
+    source = concentration * spread_rate * favorability
     
-    # Simulate for each time step
-    for t in range(1, time_steps):
-        curr_state = sequence[t-1].copy()
-        next_state = curr_state.copy()
+    def radial_gain(radius_scale: int) -> np.ndarray:
+        radius = (1 + radius_scale * spread_rate * favorability).astype(int)
+        kernel_sums = np.array([_radial_kernel(r).sum() if r else 0.0 for r in range(radius.max(initial=1) + 1)])
+        return source * kernel_sums[radius]
+    
+    if pattern == 'radial':
+        gain, threshold = radial_gain(3), 0.01
+    elif pattern == 'directional':
+        distance = _directional_distance(spread_rate, favorability)
+        # Wind weights sum to sum(1 / (1 + 0.5 d)) over d = 1..D; the three
+        # random contributions per distance average 0.3 * (1/2 + 1/3) / 2 each
+        wind_sums = np.concatenate([[0.0], np.cumsum(1 / (1 + 0.5 * np.arange(1, distance.max(initial=1) + 1)))])
+        gain, threshold = source * (wind_sums[distance] + 0.375 * distance), 0.01
+    else:
+        # A jump fires with probability 0.1 c and lands 0.3 c on average,
+        # plus 0.7 of that over the diffusion kernel
+        landing = 0.1 * concentration * 0.3 * concentration
+        gain = radial_gain(2) + landing * (1 + 0.7 * _radial_kernel(JUMP_DIFFUSION_RADIUS).sum())
+        threshold = 0.1
+    
+    return np.where(concentration > threshold, gain, 0.0)
+
+
+class AdaptiveSpreadSimulation:
+    """
+    Spread simulation on an adaptive two-level grid of blocks.
+    
+    The domain is split into square blocks. Blocks near concentration
+    gradients - the outbreak front and anything within one block of it - are
+    refined and simulated cell by cell; all other blocks are coarse cells
+    holding only the mean state of the block. The refinement is updated after
+    every regrid_interval steps, so fine blocks follow the outbreak as it
+    moves and blocks it has left, or that it has saturated, are coarsened
+    back to their mean.
+    
+    Fine blocks are advanced like the tiles of TiledSpreadSimulation, with
+    random numbers keyed by cell and a halo in which neighbouring coarse
+    blocks appear as constant. Coarse blocks get the expected spread of a
+    uniform region (see _uniform_spread_gain), then the same decay and
+    weather drift. With a negative gradient_threshold every block stays fine
+    and the result equals TiledSpreadSimulation with tile_size=block_size.
+    """
+    
+    def __init__(
+        self,
+        initial_state: np.ndarray,
+        threat_type: str = 'FUNGAL',
+        block_size: int = 32,
+        gradient_threshold: float = 0.01,
+        random_seed: int = 0,
+        regrid_interval: int = 1,
+        dtype: Union[str, np.dtype] = DEFAULT_DTYPE
+    ):
+        """
+        Initialize the simulation.
         
-        # Extract environmental factors
-        temperature = curr_state[:, :, 1]
-        humidity = curr_state[:, :, 2]
-        wind_direction = curr_state[:, :, 3] * 2 * np.pi  # Convert to radians
-        wind_speed = curr_state[:, :, 4]
-        
-        # Calculate environmental favorability for spread (0-1)
-        # Different pathogens prefer different conditions
-        if threat_type == 'FUNGAL':
-            favorability = 0.5 + 0.5 * humidity - 0.3 * np.abs(temperature - 0.6)
-        elif threat_type == 'BACTERIAL':
-            favorability = 0.3 + 0.4 * humidity + 0.3 * temperature
-        elif threat_type == 'VIRAL':
-            favorability = 0.4 + 0.3 * wind_speed + 0.2 * temperature
-        elif threat_type == 'PEST':
-            favorability = 0.2 + 0.4 * temperature - 0.2 * wind_speed + 0.2 * humidity
-        else:
-            favorability = 0.5 * np.ones_like(temperature)
-        
-        favorability = np.clip(favorability, 0, 1)
-        
-        # Pathogen concentration in current state
-        concentration = curr_state[:, :, 0]
-        
-        # Calculate spread based on pattern
-        if pattern == 'radial':
-            # Radial spread (typical for fungi and bacteria)
-            for i in range(spatial_dim):
-                for j in range(spatial_dim):
-                    if concentration[i, j] > 0.01:
-                        spread_radius = int(1 + 3 * spread_rate * favorability[i, j])
-                        for ni in range(max(0, i-spread_radius), min(spatial_dim, i+spread_radius+1)):
-                            for nj in range(max(0, j-spread_radius), min(spatial_dim, j+spread_radius+1)):
-                                dist = np.sqrt((ni-i)**2 + (nj-j)**2)
-                                if dist <= spread_radius:
-                                    spread_factor = concentration[i, j] * (1 - dist/spread_radius) * spread_rate * favorability[i, j]
-                                    next_state[ni, nj, 0] = max(next_state[ni, nj, 0], next_state[ni, nj, 0] + spread_factor)
-        
-        elif pattern == 'directional':
-            # Directional spread (following wind)
-            for i in range(spatial_dim):
-                for j in range(spatial_dim):
-                    if concentration[i, j] > 0.01:
-                        # Get wind vector
-                        wind_dx = wind_speed[i, j] * np.cos(wind_direction[i, j])
-                        wind_dy = wind_speed[i, j] * np.sin(wind_direction[i, j])
-                        
-                        # Scale by spread rate and favorability
-                        spread_distance = int(1 + 4 * spread_rate * favorability[i, j])
-                        
-                        # Calculate spread direction and intensity
-                        for distance in range(1, spread_distance + 1):
-                            # Position affected by wind
-                            wind_factor = weather_influence * wind_speed[i, j]
-                            ni = int(i + distance * wind_dx * wind_factor)
-                            nj = int(j + distance * wind_dy * wind_factor)
-                            
-                            # Also spread a bit in random directions (less strongly)
-                            for _ in range(3):
-                                random_angle = np.random.random() * 2 * np.pi
-                                random_dx = np.cos(random_angle)
-                                random_dy = np.sin(random_angle)
-                                random_dist = 1 + int(2 * np.random.random())
-                                ri = int(i + random_dist * random_dx)
-                                rj = int(j + random_dist * random_dy)
-                                
-                                if 0 <= ri < spatial_dim and 0 <= rj < spatial_dim:
-                                    random_factor = concentration[i, j] * 0.3 * spread_rate * favorability[i, j] / (1 + random_dist)
-                                    next_state[ri, rj, 0] = max(next_state[ri, rj, 0], next_state[ri, rj, 0] + random_factor)
-                            
-                            # Apply wind-driven spread
-                            if 0 <= ni < spatial_dim and 0 <= nj < spatial_dim:
-                                spread_factor = concentration[i, j] * spread_rate * favorability[i, j] / (1 + 0.5 * distance)
-                                next_state[ni, nj, 0] = max(next_state[ni, nj, 0], next_state[ni, nj, 0] + spread_factor)
+        Args:
+            initial_state: Initial state (H, W, features) with H and W multiples of block_size
+            threat_type: Type of biological threat to simulate
+            block_size: Side length of the blocks, at least spread_halo_width(threat_type)
+            gradient_threshold: Concentration difference within a block, or
+                between neighbouring blocks, above which a block is refined
+            random_seed: Root seed of the per-cell random streams
+            regrid_interval: Time steps between updates of the refinement
+            dtype: dtype of the returned frames (float16 is simulated in float32)
+        """
+        height, width, features = initial_state.shape
+        if height % block_size or width % block_size:
+            raise ValueError(f"Domain of {height}x{width} cells is not a multiple of the block size {block_size}")
         
-        elif pattern == 'jump':
-            # Jump spread (can spread to distant locations, typical for viruses or pests)
-            for i in range(spatial_dim):
-                for j in range(spatial_dim):
-                    if concentration[i, j] > 0.1:  # Only significant concentrations can jump
-                        # Regular short-distance spread
-                        spread_radius = int(1 + 2 * spread_rate * favorability[i, j])
-                        for ni in range(max(0, i-spread_radius), min(spatial_dim, i+spread_radius+1)):
-                            for nj in range(max(0, j-spread_radius), min(spatial_dim, j+spread_radius+1)):
-                                dist = np.sqrt((ni-i)**2 + (nj-j)**2)
-                                if dist <= spread_radius:
-                                    spread_factor = concentration[i, j] * (1 - dist/spread_radius) * spread_rate * favorability[i, j]
-                                    next_state[ni, nj, 0] = max(next_state[ni, nj, 0], next_state[ni, nj, 0] + spread_factor)
-                        
-                        # Occasional long-distance jumps
-                        if np.random.random() < 0.1 * concentration[i, j]:
-                            jump_distance = int(5 + 10 * np.random.random())  # Long jump
-                            jump_angle = np.random.random() * 2 * np.pi
-                            
-                            # Wind influence on jump direction
-                            jump_angle = (1 - weather_influence) * jump_angle + weather_influence * wind_direction[i, j]
-                            
-                            # Calculate jump landing point
-                            ni = int(i + jump_distance * np.cos(jump_angle))
-                            nj = int(j + jump_distance * np.sin(jump_angle))
-                            
-                            if 0 <= ni < spatial_dim and 0 <= nj < spatial_dim:
-                                # Create a new infection point
-                                jump_intensity = concentration[i, j] * 0.3 * (0.7 + 0.6 * np.random.random())
-                                next_state[ni, nj, 0] += jump_intensity
-                                
-                                # Create some diffusion around the jump point
-                                small_radius = 2
-                                for li in range(max(0, ni-small_radius), min(spatial_dim, ni+small_radius+1)):
-                                    for lj in range(max(0, nj-small_radius), min(spatial_dim, nj+small_radius+1)):
-                                        dist = np.sqrt((li-ni)**2 + (lj-nj)**2)
-                                        if dist <= small_radius:
-                                            spread_factor = jump_intensity * (1 - dist/small_radius) * 0.7
-                                            next_state[li, lj, 0] = max(next_state[li, lj, 0], next_state[li, lj, 0] + spread_factor)
+        halo = spread_halo_width(threat_type)
+        if block_size < halo:
+            raise ValueError(f"Block size {block_size} is smaller than the spread reach of {halo} cells")
         
-        # Apply natural decay
-        next_state[:, :, 0] *= (1 - intensity_decay * (1 - favorability))
+        self.threat_type = threat_type
+        self.block_size = block_size
+        self.gradient_threshold = gradient_threshold
+        self.random_seed = random_seed
+        self.regrid_interval = regrid_interval
+        self.halo = halo
+        self.dtype = resolve_dtype(dtype)
+        self.shape = (height, width)
+        self.features = features
+        self.step = 0
         
-        # Update environmental factors slightly for the next time step
-        # Temperature change
-        next_state[:, :, 1] += 0.02 * (2 * np.random.random((spatial_dim, spatial_dim)) - 1)
-        # Humidity change
-        next_state[:, :, 2] += 0.03 * (2 * np.random.random((spatial_dim, spatial_dim)) - 1)
-        # Wind direction change (slight)
-        next_state[:, :, 3] += 0.05 * (2 * np.random.random((spatial_dim, spatial_dim)) - 1)
-        # Wind speed change
-        next_state[:, :, 4] += 0.04 * (2 * np.random.random((spatial_dim, spatial_dim)) - 1)
+        compute_dtype = _compute_dtype(dtype)
+        blocks = np.asarray(initial_state, dtype=compute_dtype).reshape(
+            height // block_size, block_size, width // block_size, block_size, features
+        )
+        # Mean state of every block; kept up to date for fine blocks too
+        self.coarse = blocks.mean(axis=(1, 3))
+        # Fine state of the refined blocks, keyed by block index
+        self.blocks = {}
         
-        # Ensure all values are within [0, 1]
-        next_state = np.clip(next_state, 0, 1)
+        self._regrid(np.ptp(blocks[..., 0], axis=(1, 3)), blocks)
+        logger.info(f"Adaptive simulation of {height}x{width} cells in {block_size}x{block_size} blocks: "
+                    f"{len(self.blocks)} of {self.coarse.shape[0] * self.coarse.shape[1]} block(s) refined")
+    
+    @property
+    def refined_fraction(self) -> float:
+        """Fraction of the blocks currently simulated cell by cell."""
+        return len(self.blocks) / (self.coarse.shape[0] * self.coarse.shape[1])
+    
+    def _regrid(self, variation: np.ndarray, source: Optional[np.ndarray] = None) -> None:
+        """
+        Refine the blocks near concentration gradients and coarsen the rest.
+        
+        Args:
+            variation: Concentration range within each block (Hc, Wc)
+            source: Fine state (Hc, B, Wc, B, F) to copy newly refined blocks
+                from (by default they start from their mean state)
+        """
+        concentration = self.coarse[:, :, 0]
+        needs_refinement = variation > self.gradient_threshold
         
-        # Store the next state
-        sequence[t] = next_state
+        # Steps between neighbouring blocks are gradients too
+        row_steps = np.abs(np.diff(concentration, axis=0)) > self.gradient_threshold
+        col_steps = np.abs(np.diff(concentration, axis=1)) > self.gradient_threshold
+        needs_refinement[:-1] |= row_steps
+        needs_refinement[1:] |= row_steps
+        needs_refinement[:, :-1] |= col_steps
+        needs_refinement[:, 1:] |= col_steps
+        
+        # Refine one block beyond, so the front cannot outrun the fine blocks
+        padded = np.pad(needs_refinement, 1)
+        refined = np.zeros_like(needs_refinement)
+        for di in range(3):
+            for dj in range(3):
+                refined |= padded[di:di + refined.shape[0], dj:dj + refined.shape[1]]
+        
+        # Coarsened blocks keep their mean, which is already in self.coarse
+        for key in [key for key in self.blocks if not refined[key]]:
+            del self.blocks[key]
+        
+        block_shape = (self.block_size, self.block_size, self.features)
+        for key in zip(*np.nonzero(refined)):
+            key = (int(key[0]), int(key[1]))
+            if key not in self.blocks:
+                if source is not None:
+                    self.blocks[key] = source[key[0], :, key[1]].copy()
+                else:
+                    self.blocks[key] = np.broadcast_to(self.coarse[key], block_shape).copy()
     
-    return sequence
+    def _assemble(self, row_start: int, row_stop: int, col_start: int, col_stop: int) -> np.ndarray:
+        """
+        Resample a window of the domain onto the fine grid.
+        
+        Coarse blocks are constant at their mean state.
+        
+        Args:
+            row_start: First row of the window
+            row_stop: Row after the last row of the window
+            col_start: First column of the window
+            col_stop: Column after the last column of the window
+            
+        Returns:
+            Fine state of the window (rows, cols, F)
+        """
+        size = self.block_size
+        first_row, first_col = row_start // size, col_start // size
+        last_row, last_col = -(-row_stop // size), -(-col_stop // size)
+        
+        window = np.repeat(np.repeat(self.coarse[first_row:last_row, first_col:last_col], size, axis=0), size, axis=1)
+        for bi in range(first_row, last_row):
+            for bj in range(first_col, last_col):
+                block = self.blocks.get((bi, bj))
+                if block is not None:
+                    window[(bi - first_row) * size:(bi - first_row + 1) * size,
+                           (bj - first_col) * size:(bj - first_col + 1) * size] = block
+        
+        row_offset, col_offset = first_row * size, first_col * size
+        return window[row_start - row_offset:row_stop - row_offset, col_start - col_offset:col_stop - col_offset]
+    
+    def _advance_coarse(self, step: int) -> np.ndarray:
+        """
+        Compute the next mean state of every block from the mean-field dynamics.
+        
+        Args:
+            step: Time step being computed
+            
+        Returns:
+            Next coarse state (Hc, Wc, F)
+        """
+        behavior = SPREAD_BEHAVIORS.get(self.threat_type, SPREAD_BEHAVIORS['FUNGAL'])
+        favorability = calculate_favorability(
+            self.threat_type, self.coarse[:, :, 1], self.coarse[:, :, 2], self.coarse[:, :, 4]
+        )
+        
+        next_coarse = self.coarse.copy()
+        next_coarse[:, :, 0] += _uniform_spread_gain(self.threat_type, self.coarse[:, :, 0], favorability)
+        next_coarse[:, :, 0] *= (1 - behavior['intensity_decay'] * (1 - favorability))
+        
+        cells = np.arange(self.coarse.shape[0] * self.coarse.shape[1]).reshape(self.coarse.shape[:2])
+        drift = _keyed_uniform(self.random_seed, step, 'coarse_environment', cells, 4)
+        next_coarse[:, :, 1:5] += (2 * drift - 1) * ENVIRONMENT_DRIFT
+        
+        return np.clip(next_coarse, 0, 1)
+    
+    def advance(self, time_steps: int = 1) -> None:
+        """
+        Simulate a number of time steps.
+        
+        Args:
+            time_steps: Number of time steps to simulate
+        """
+        height, width = self.shape
+        size, halo = self.block_size, self.halo
+        
+        for _ in range(time_steps):
+            step = self.step + 1
+            
+            # Every block reads the current state before any block is replaced
+            next_blocks = {}
+            for bi, bj in self.blocks:
+                row_start, col_start = bi * size, bj * size
+                top, left = max(0, row_start - halo), max(0, col_start - halo)
+                window = self._assemble(top, min(height, row_start + size + halo),
+                                        left, min(width, col_start + size + halo))
+                interior = (slice(row_start - top, row_start - top + size), slice(col_start - left, col_start - left + size))
+                next_blocks[(bi, bj)] = _advance_window(
+                    window, interior, (top, left), width, self.threat_type, self.random_seed, step
+                )
+            
+            self.coarse = self._advance_coarse(step)
+            variation = np.zeros(self.coarse.shape[:2])
+            for key, block in next_blocks.items():
+                self.blocks[key] = block
+                self.coarse[key] = block.mean(axis=(0, 1))
+                variation[key] = np.ptp(block[:, :, 0])
+            
+            self.step = step
+            if step % self.regrid_interval == 0:
+                self._regrid(variation)
+    
+    def resample(
+        self,
+        window: Optional[Tuple[int, int, int, int]] = None,
+        cell_size: int = 1
+    ) -> np.ndarray:
+        """
+        Resample the current state onto a regular grid.
+        
+        Args:
+            window: Bounds (row_start, row_stop, col_start, col_stop) of the
+                region to resample (defaults to the whole domain)
+            cell_size: Side length in fine cells of the output cells, which
+                hold the mean state of the cells they cover
+                
+        Returns:
+            State of the window (rows // cell_size, cols // cell_size, F) in the requested dtype
+        """
+        row_start, row_stop, col_start, col_stop = window or (0, self.shape[0], 0, self.shape[1])
+        rows, cols = row_stop - row_start, col_stop - col_start
+        if rows % cell_size or cols % cell_size:
+            raise ValueError(f"Window of {rows}x{cols} cells is not a multiple of the cell size {cell_size}")
+        
+        state = self._assemble(row_start, row_stop, col_start, col_stop)
+        if cell_size > 1:
+            state = state.reshape(rows // cell_size, cell_size, cols // cell_size, cell_size, -1).mean(axis=(1, 3))
+        
+        return state.astype(self.dtype)
+    
+    def frame(self) -> np.ndarray:
+        """
+        Resample the whole domain onto the fine grid.
+        
+        Returns:
+            Current state (H, W, features) in the requested dtype
+        """
+        return self.resample()
+
+
+def simulate_spread_adaptive(
+    initial_state: np.ndarray,
+    time_steps: int,
+    threat_type: str = 'FUNGAL',
+    random_seed: int = 0,
+    block_size: int = 32,
+    gradient_threshold: float = 0.01,
+    cell_size: int = 1,
+    dtype: Union[str, np.dtype] = DEFAULT_DTYPE
+) -> np.ndarray:
+    """
+    Simulate the spread of a pathogen on an adaptive grid.
+    
+    See AdaptiveSpreadSimulation.
+    
+    Args:
+        initial_state: Initial state (H, W, features)
+        time_steps: Number of time steps, counting the initial state as in simulate_spread
+        threat_type: Type of biological threat to simulate
+        random_seed: Root seed of the per-cell random streams
+        block_size: Side length of the blocks
+        gradient_threshold: Concentration difference above which blocks are refined
+        cell_size: Side length of the cells of the returned grid
+        dtype: dtype of the returned state (float16 is simulated in float32)
+        
+    Returns:
+        State after time_steps - 1 steps (H // cell_size, W // cell_size, features)
+    """
+    simulation = AdaptiveSpreadSimulation(
+        initial_state, threat_type, block_size, gradient_threshold, random_seed, dtype=dtype
+    )
+    simulation.advance(time_steps - 1)
+    return simulation.resample(cell_size=cell_size)
+
+
+def sequence_windows(sequences: np.ndarray, time_steps: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Split simulated sequences into every (input window, next frame) pair.
+    
+    A sequence of L frames holds L - time_steps training samples: each run of
+    time_steps consecutive frames with the frame that follows it as target.
+    Both results are strided views of sequences, so no frame is copied until
+    the samples are written out.
+    
+    Args:
+        sequences: Simulated sequences (N, L, H, W, F) with L > time_steps
+        time_steps: Number of time steps in each input window
+        
+    Returns:
+        Tuple of (X, y) views of shapes (N, L - time_steps, time_steps, H, W, F)
+        and (N, L - time_steps, H, W, F)
+    """
+    if sequences.shape[1] <= time_steps:
+        raise ValueError(f"Sequences of {sequences.shape[1]} frames hold no windows of {time_steps} time steps")
+    
+    # sliding_window_view appends the window axis; move it next to the window index
+    X = np.moveaxis(sliding_window_view(sequences[:, :-1], time_steps, axis=1), -1, 2)
+    y = sequences[:, time_steps:]
+    
+    return X, y
+
+
+def _generate_sequences(
+    num_sequences: int,
+    spatial_dim: int,
+    sequence_length: int,
+    features: int,
+    threat_types: List[str],
+    batched: bool,
+    dtype: np.dtype,
+    environment: str = 'discs',
+    correlation_length: float = DEFAULT_CORRELATION_LENGTH,
+    rng: Optional[np.random.Generator] = None
+) -> np.ndarray:
+    """
+    Simulate a group of random scenarios for training samples.
+    
+    Args:
+        num_sequences: Number of scenarios to simulate
+        spatial_dim: Spatial dimension for the grid
+        sequence_length: Number of frames in each sequence, including the initial state
+        features: Number of features per grid cell
+        threat_types: Threat types to sample from
+        batched: Simulate all scenarios together with simulate_spread_batch
+        dtype: dtype of the returned sequences
+        environment: Environment model, one of ENVIRONMENT_MODELS
+        correlation_length: Correlation length in cells of the 'gaussian' model
+        rng: Random generator for every draw; the global np.random state is
+            used when omitted
+            
+    Returns:
+        Sequences (num_sequences, sequence_length, spatial_dim, spatial_dim, features)
+    """
+    if rng is None:
+        random, randint, choice = np.random.random, np.random.randint, np.random.choice
+    else:
+        random, randint, choice = rng.random, rng.integers, rng.choice
+    
+    sample_types = []
+    initial_states = np.zeros((num_sequences, spatial_dim, spatial_dim, features), dtype=_compute_dtype(dtype))
+    for k in range(num_sequences):
+        # Pick a random threat type
+        sample_types.append(str(choice(threat_types)))
+        
+        # Generate initial state
+        concentration = 0.3 + 0.6 * random()  # Random initial concentration
+        num_points = randint(1, 4)  # Random number of initial infection points
+        initial_states[k] = generate_initial_state(
+            spatial_dim=spatial_dim,
+            features=features,
+            concentration=concentration,
+            num_points=num_points,
+            random_seed=None,  # Use different seeds for diversity
+            rng=rng,
+            dtype=initial_states.dtype,
+            environment=environment,
+            correlation_length=correlation_length
+        )
+    
+    if rng is None:
+        # Derive the simulation generator from the global stream so that
+        # np.random.seed still makes the whole dataset reproducible
+        rng = np.random.default_rng(np.random.randint(2**31 - 1))
+    
+    # Simulate spread
+    if batched:
+        return simulate_spread_batch(
+            initial_states=initial_states,
+            time_steps=sequence_length,
+            threat_types=sample_types,
+            rng=rng,
+            dtype=dtype,
+            environment=environment,
+            correlation_length=correlation_length
+        )
+    
+    return np.stack([
+        simulate_spread(
+            initial_state=initial_state,
+            time_steps=sequence_length,
+            threat_type=threat_type,
+            rng=rng,
+            dtype=dtype,
+            environment=environment,
+            correlation_length=correlation_length
+        )
+        for initial_state, threat_type in zip(initial_states, sample_types)
+    ])
+
+
+def _generate_seeded_sequences(task: Tuple) -> np.ndarray:
+    """
+    Process pool entry point: simulate sequences from a spawned SeedSequence.
+    
+    Args:
+        task: Tuple of _generate_sequences arguments followed by a SeedSequence
+        
+    Returns:
+        Sequences for the task's scenarios
+    """
+    *sequence_args, seed_sequence = task
+    return _generate_sequences(*sequence_args, rng=np.random.default_rng(seed_sequence))
+
+
+def _iter_sample_chunks(
+    dataset_size: int,
+    spatial_dim: int,
+    time_steps: int,
+    features: int,
+    threat_types: List[str],
+    batch_size: Optional[int],
+    workers: Optional[int],
+    random_seed: Optional[int],
+    dtype: np.dtype,
+    environment: str = 'discs',
+    correlation_length: float = DEFAULT_CORRELATION_LENGTH,
+    windows_per_sequence: int = 1
+) -> Iterator[Tuple[int, int, np.ndarray, np.ndarray]]:
+    """
+    Generate dataset samples chunk by chunk, in order.
+    
+    Chunks are strided views into the simulated sequences (see
+    sequence_windows), so samples are only copied when the caller writes
+    them out. With several windows per sequence a view cannot span two
+    sequences, so every sequence is yielded as its own chunk.
+    
+    Args:
+        dataset_size: Number of samples to generate
+        spatial_dim: Spatial dimension for the grid
+        time_steps: Number of time steps in each sequence
+        features: Number of features per grid cell
+        threat_types: List of threat types to include
+        batch_size: Simulation batch size (None for one simulation per sample)
+        workers: Number of worker processes used to generate samples
+        random_seed: Root seed for the per-sample random streams
+        dtype: dtype of the generated samples
+        environment: Environment model, one of ENVIRONMENT_MODELS
+        correlation_length: Correlation length in cells of the 'gaussian' model
+        windows_per_sequence: Samples taken from each simulated sequence
+        
+    Yields:
+        Tuples of (start, stop, X_chunk, y_chunk) covering samples [start, stop)
+    """
+    if windows_per_sequence < 1:
+        raise ValueError(f"windows_per_sequence must be at least 1, got {windows_per_sequence}")
+    
+    # Samples are generated in chunks of one simulation batch
+    chunk_size = (batch_size or 1) * windows_per_sequence
+    chunks = [(start, min(start + chunk_size, dataset_size)) for start in range(0, dataset_size, chunk_size)]
+    sequence_args = (
+        spatial_dim, time_steps + windows_per_sequence, features, threat_types, batch_size is not None, dtype,
+        environment, correlation_length
+    )
+    
+    def num_sequences(start: int, stop: int) -> int:
+        return -(-(stop - start) // windows_per_sequence)
+    
+    with ExitStack() as stack:
+        if workers is None and random_seed is None:
+            results = (_generate_sequences(num_sequences(start, stop), *sequence_args) for start, stop in chunks)
+        else:
+            root_seed = np.random.SeedSequence(random_seed)
+            logger.info(f"Using root seed entropy {root_seed.entropy} with {workers or 1} worker(s)")
+            tasks = [
+                (num_sequences(start, stop), *sequence_args, seed_sequence)
+                for (start, stop), seed_sequence in zip(chunks, root_seed.spawn(len(chunks)))
+            ]
+            
+            if workers is None or workers <= 1:
+                results = map(_generate_seeded_sequences, tasks)
+            else:
+                # Spawned workers avoid forking a parent that may hold TensorFlow threads
+                executor = stack.enter_context(
+                    ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+                )
+                # Workers return whole sequences, which pickle smaller than their windows
+                results = executor.map(_generate_seeded_sequences, tasks,
+                                       chunksize=max(1, len(tasks) // (workers * 4)))
+        
+        for (start, stop), sequences in zip(chunks, results):
+            X_windows, y_windows = sequence_windows(sequences, time_steps)
+            if windows_per_sequence == 1:
+                # One window per sequence: a single view covers the whole chunk
+                samples = [(X_windows[:, 0], y_windows[:, 0])]
+            else:
+                samples = zip(X_windows, y_windows)
+            
+            position = start
+            for X_chunk, y_chunk in samples:
+                count = min(len(X_chunk), stop - position)
+                yield position, position + count, X_chunk[:count], y_chunk[:count]
+                position += count
+            
+            # Log progress
+            if stop // 100 > start // 100 or stop == dataset_size:
+                logger.info(f"Generated {stop}/{dataset_size} samples")
 
 
 def generate_synthetic_dataset(
@@ -319,17 +2738,44 @@ def generate_synthetic_dataset(
     spatial_dim: int = 32,
     time_steps: int = 7,
     features: int = 5,
-    threat_types: Optional[List[str]] = None
+    threat_types: Optional[List[str]] = None,
+    batch_size: Optional[int] = None,
+    workers: Optional[int] = None,
+    random_seed: Optional[int] = None,
+    dtype: Union[str, np.dtype] = DEFAULT_DTYPE,
+    environment: str = 'discs',
+    correlation_length: float = DEFAULT_CORRELATION_LENGTH,
+    windows_per_sequence: int = 1
 ) -> Tuple[np.ndarray, np.ndarray]:
     """
     Generate a synthetic dataset for training the spread prediction model.
     
+    When workers or random_seed is given, every sample (or every simulation
+    batch) draws from its own generator spawned from
+    np.random.SeedSequence(random_seed), so the same seed produces a
+    bit-identical dataset regardless of the number of workers. Otherwise
+    samples are drawn from the global np.random state.
+    
+    By default every simulation yields one sample. With windows_per_sequence
+    set to k, each simulation runs k - 1 steps longer and yields k samples,
+    one per input window (consecutive samples then share a scenario and most
+    of their frames).
+    
     Args:
         dataset_size: Number of samples to generate
         spatial_dim: Spatial dimension for the grid
         time_steps: Number of time steps in each sequence
         features: Number of features per grid cell
         threat_types: List of threat types to include
+        batch_size: If set, simulate this many samples at once with
+            simulate_spread_batch instead of one simulate_spread call per sample
+        workers: Number of worker processes used to generate samples
+        random_seed: Root seed for the per-sample random streams
+        dtype: Storage dtype of X and y (float16 is simulated in float32)
+        environment: Environment model, one of ENVIRONMENT_MODELS. 'gaussian'
+            draws spatially correlated weather that drifts smoothly over time
+        correlation_length: Correlation length in cells of the 'gaussian' model
+        windows_per_sequence: Samples taken from each simulated sequence
         
     Returns:
         Tuple of (X, y) where:
@@ -343,44 +2789,204 @@ def generate_synthetic_dataset(
         threat_types = ['FUNGAL', 'BACTERIAL', 'VIRAL', 'PEST']
     
     # Initialize arrays for input sequences and targets
-    X = np.zeros((dataset_size, time_steps, spatial_dim, spatial_dim, features))
-    y = np.zeros((dataset_size, spatial_dim, spatial_dim, features))
+    dtype = resolve_dtype(dtype)
+    X = np.zeros((dataset_size, time_steps, spatial_dim, spatial_dim, features), dtype=dtype)
+    y = np.zeros((dataset_size, spatial_dim, spatial_dim, features), dtype=dtype)
     
-    for i in range(dataset_size):
-        # Pick a random threat type
-        threat_type = np.random.choice(threat_types)
-        
-        # Generate initial state
-        concentration = 0.3 + 0.6 * np.random.random()  # Random initial concentration
-        num_points = np.random.randint(1, 4)  # Random number of initial infection points
-        initial_state = generate_initial_state(
-            spatial_dim=spatial_dim,
-            features=features,
-            concentration=concentration,
-            num_points=num_points,
-            random_seed=None  # Use different seeds for diversity
-        )
+    for start, stop, X_chunk, y_chunk in _iter_sample_chunks(
+        dataset_size, spatial_dim, time_steps, features, threat_types, batch_size, workers, random_seed,
+        _compute_dtype(dtype), environment, correlation_length, windows_per_sequence
+    ):
+        X[start:stop] = X_chunk
+        y[start:stop] = y_chunk
+    
+    return X, y
+
+
+def write_synthetic_dataset(
+    output_dir: str,
+    dataset_size: int,
+    spatial_dim: int = 32,
+    time_steps: int = 7,
+    features: int = 5,
+    threat_types: Optional[List[str]] = None,
+    shard_size: int = 1000,
+    batch_size: Optional[int] = None,
+    workers: Optional[int] = None,
+    random_seed: Optional[int] = None,
+    dtype: Union[str, np.dtype] = DEFAULT_DTYPE,
+    environment: str = 'discs',
+    correlation_length: float = DEFAULT_CORRELATION_LENGTH,
+    windows_per_sequence: int = 1
+) -> Dict[str, Any]:
+    """
+    Generate a synthetic dataset straight to disk as fixed-size .npy shards.
+    
+    Samples are written into memory-mapped shard files as they are produced,
+    so memory use is bounded by one simulation chunk rather than the whole
+    dataset. A manifest describing the shards is written last; a directory
+    without a manifest is an incomplete dataset. Generation options behave
+    as in generate_synthetic_dataset.
+    
+    Args:
+        output_dir: Directory to write the shards and manifest to
+        dataset_size: Number of samples to generate
+        spatial_dim: Spatial dimension for the grid
+        time_steps: Number of time steps in each sequence
+        features: Number of features per grid cell
+        threat_types: List of threat types to include
+        shard_size: Maximum number of samples per shard
+        batch_size: Simulation batch size (None for one simulation per sample)
+        workers: Number of worker processes used to generate samples
+        random_seed: Root seed for the per-sample random streams
+        dtype: Storage dtype of the shards (float16 is simulated in float32)
+        environment: Environment model, one of ENVIRONMENT_MODELS
+        correlation_length: Correlation length in cells of the 'gaussian' model
+        windows_per_sequence: Samples taken from each simulated sequence
         
-        # Simulate spread
-        total_steps = time_steps + 1  # We need time_steps for input and 1 for target
-        sequence = simulate_spread(
-            initial_state=initial_state,
-            time_steps=total_steps,
-            threat_type=threat_type,
-            random_seed=None
-        )
+    Returns:
+        The dataset manifest
+    """
+    logger.info(f"Writing synthetic dataset with {dataset_size} samples to {output_dir}")
+    os.makedirs(output_dir, exist_ok=True)
+    
+    # Set default threat types if not provided
+    if threat_types is None:
+        threat_types = ['FUNGAL', 'BACTERIAL', 'VIRAL', 'PEST']
+    
+    shards = []
+    for shard_start in range(0, dataset_size, shard_size):
+        shard_index = len(shards)
+        shards.append({
+            'X': f"X_{shard_index:05d}.npy",
+            'y': f"y_{shard_index:05d}.npy",
+            'start': shard_start,
+            'num_samples': min(shard_size, dataset_size - shard_start)
+        })
+    
+    dtype = resolve_dtype(dtype)
+    X_shard = y_shard = None
+    shard_index = -1
+    
+    for start, stop, X_chunk, y_chunk in _iter_sample_chunks(
+        dataset_size, spatial_dim, time_steps, features, threat_types, batch_size, workers, random_seed,
+        _compute_dtype(dtype), environment, correlation_length, windows_per_sequence
+    ):
+        # A chunk may straddle a shard boundary
+        while start < stop:
+            if shard_index < 0 or start >= shards[shard_index]['start'] + shards[shard_index]['num_samples']:
+                shard_index += 1
+                shard = shards[shard_index]
+                X_shard = np.lib.format.open_memmap(
+                    os.path.join(output_dir, shard['X']), mode='w+', dtype=dtype,
+                    shape=(shard['num_samples'], time_steps, spatial_dim, spatial_dim, features)
+                )
+                y_shard = np.lib.format.open_memmap(
+                    os.path.join(output_dir, shard['y']), mode='w+', dtype=dtype,
+                    shape=(shard['num_samples'], spatial_dim, spatial_dim, features)
+                )
+            
+            shard_start = shards[shard_index]['start']
+            shard_stop = min(stop, shard_start + shards[shard_index]['num_samples'])
+            X_shard[start - shard_start:shard_stop - shard_start] = X_chunk[:shard_stop - start]
+            y_shard[start - shard_start:shard_stop - shard_start] = y_chunk[:shard_stop - start]
+            
+            X_chunk, y_chunk = X_chunk[shard_stop - start:], y_chunk[shard_stop - start:]
+            start = shard_stop
+    
+    # Make sure the last shard reaches the disk before the manifest does
+    if X_shard is not None:
+        X_shard.flush()
+        y_shard.flush()
+    del X_shard, y_shard
+    
+    manifest = {
+        'format_version': 1,
+        'dataset_size': dataset_size,
+        'spatial_dim': spatial_dim,
+        'time_steps': time_steps,
+        'features': features,
+        'threat_types': list(threat_types),
+        'random_seed': random_seed,
+        'batch_size': batch_size,
+        'generator_version': GENERATOR_VERSION,
+        'spread_behaviors_version': spread_behaviors_version(),
+        'environment': environment,
+        'correlation_length': correlation_length,
+        'windows_per_sequence': windows_per_sequence,
+        'dtype': dtype.name,
+        'shards': shards
+    }
+    
+    manifest_path = os.path.join(output_dir, DATASET_MANIFEST)
+    with open(manifest_path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=4)
+    os.replace(manifest_path + '.tmp', manifest_path)
+    
+    logger.info(f"Wrote {len(shards)} shard(s) and manifest to {output_dir}")
+    
+    return manifest
+
+
+class ShardedDataset:
+    """
+    Lazily memory-mapped view of a dataset written by write_synthetic_dataset.
+    """
+    
+    def __init__(self, dataset_dir: str, mmap_mode: str = 'r'):
+        """
+        Open a sharded dataset.
         
-        # Input sequence is all but the last step
-        X[i] = sequence[:time_steps]
+        Args:
+            dataset_dir: Directory containing the shards and manifest
+            mmap_mode: Memory-map mode passed to np.load
+        """
+        manifest_path = os.path.join(dataset_dir, DATASET_MANIFEST)
+        if not os.path.exists(manifest_path):
+            raise FileNotFoundError(f"No dataset manifest found at {manifest_path}")
         
-        # Target is the last step
-        y[i] = sequence[-1]
+        with open(manifest_path, 'r') as f:
+            self.manifest = json.load(f)
         
-        # Log progress
-        if (i + 1) % 100 == 0 or i == dataset_size - 1:
-            logger.info(f"Generated {i + 1}/{dataset_size} samples")
+        self.dataset_dir = dataset_dir
+        self.shards = [
+            (
+                np.load(os.path.join(dataset_dir, shard['X']), mmap_mode=mmap_mode),
+                np.load(os.path.join(dataset_dir, shard['y']), mmap_mode=mmap_mode)
+            )
+            for shard in self.manifest['shards']
+        ]
+        self.shard_starts = np.array([shard['start'] for shard in self.manifest['shards']])
     
-    return X, y
+    def __len__(self) -> int:
+        return self.manifest['dataset_size']
+    
+    def get_batch(self, indices: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Read the samples at the given indices into memory.
+        
+        Args:
+            indices: Sample indices, in any order
+            
+        Returns:
+            Tuple of (X, y) arrays with the samples in the order requested
+        """
+        indices = np.asarray(indices)
+        shard_ids = np.searchsorted(self.shard_starts, indices, side='right') - 1
+        
+        X = np.empty((len(indices),) + self.shards[0][0].shape[1:], dtype=self.shards[0][0].dtype)
+        y = np.empty((len(indices),) + self.shards[0][1].shape[1:], dtype=self.shards[0][1].dtype)
+        
+        # Read each shard once, in sorted order for sequential disk access
+        for shard_id in np.unique(shard_ids):
+            positions = np.flatnonzero(shard_ids == shard_id)
+            local = indices[positions] - self.shard_starts[shard_id]
+            order = np.argsort(local)
+            X_shard, y_shard = self.shards[shard_id]
+            X[positions[order]] = X_shard[local[order]]
+            y[positions[order]] = y_shard[local[order]]
+        
+        return X, y
 
 
 def visualize_spread_sequence(
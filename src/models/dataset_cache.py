@@ -0,0 +1,262 @@
+"""
+Content-addressed on-disk cache of synthetic training datasets.
+
+Datasets are written with write_synthetic_dataset into a directory named by a
+hash of the generation parameters, and opened as memory-mapped ShardedDatasets
+on later requests instead of being simulated again.
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+from src.models.data_generator import (
+    DATASET_MANIFEST,
+    DEFAULT_CORRELATION_LENGTH,
+    DEFAULT_DTYPE,
+    DEFAULT_SPREAD_BEHAVIORS,
+    GENERATOR_VERSION,
+    SPREAD_BEHAVIORS,
+    ShardedDataset,
+    resolve_dtype,
+    spread_behaviors_version,
+    write_synthetic_dataset
+)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Default cache location and size budget
+DATASET_CACHE_DIR = os.getenv(
+    'DATASET_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'agridefender', 'datasets')
+)
+DEFAULT_CACHE_BUDGET_BYTES = 10 * 1024 ** 3
+
+
+def dataset_cache_key(
+    dataset_size: int,
+    spatial_dim: int,
+    time_steps: int,
+    features: int,
+    threat_types: Optional[List[str]],
+    random_seed: int,
+    batch_size: Optional[int] = None,
+    dtype: Union[str, np.dtype] = DEFAULT_DTYPE,
+    environment: str = 'discs',
+    correlation_length: float = DEFAULT_CORRELATION_LENGTH,
+    windows_per_sequence: int = 1
+) -> str:
+    """
+    Hash the parameters that determine the contents of a synthetic dataset.
+    
+    The number of workers and the shard size only change how a dataset is
+    produced and laid out on disk, not its samples, so they are not part of
+    the key. The current SPREAD_BEHAVIORS are part of it once they differ
+    from the built-in defaults.
+    
+    Args:
+        dataset_size: Number of samples
+        spatial_dim: Spatial dimension of the grid
+        time_steps: Number of time steps in each sequence
+        features: Number of features per grid cell
+        threat_types: Threat types included (None for all)
+        random_seed: Root seed for the per-sample random streams
+        batch_size: Simulation batch size (None for one simulation per sample)
+        dtype: Storage dtype of the samples
+        environment: Environment model of the samples
+        correlation_length: Correlation length of the 'gaussian' environment model
+        windows_per_sequence: Samples taken from each simulated sequence
+        
+    Returns:
+        Hex digest identifying the dataset
+    """
+    params = {
+        'dataset_size': dataset_size,
+        'spatial_dim': spatial_dim,
+        'time_steps': time_steps,
+        'features': features,
+        # Threat types are sampled by position, so their order matters
+        'threat_types': list(threat_types) if threat_types is not None else list(SPREAD_BEHAVIORS.keys()),
+        'random_seed': int(random_seed),
+        'batch_size': batch_size,
+        'dtype': resolve_dtype(dtype).name,
+        'generator_version': GENERATOR_VERSION
+    }
+    # Only added for non-default models so existing cache entries keep their keys
+    if environment != 'discs':
+        params['environment'] = environment
+        params['correlation_length'] = float(correlation_length)
+    if windows_per_sequence != 1:
+        params['windows_per_sequence'] = windows_per_sequence
+    # Datasets simulated with calibrated behaviors are cached separately
+    if SPREAD_BEHAVIORS != DEFAULT_SPREAD_BEHAVIORS:
+        params['spread_behaviors'] = spread_behaviors_version()
+    
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()[:24]
+
+
+class DatasetCache:
+    """
+    Directory of cached sharded datasets with least-recently-used eviction.
+    """
+    
+    def __init__(
+        self,
+        cache_dir: str = DATASET_CACHE_DIR,
+        max_bytes: int = DEFAULT_CACHE_BUDGET_BYTES
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            cache_dir: Directory holding one subdirectory per cached dataset
+            max_bytes: Size budget; least recently used datasets beyond it are evicted
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    def get_or_create(
+        self,
+        dataset_size: int,
+        spatial_dim: int = 32,
+        time_steps: int = 7,
+        features: int = 5,
+        threat_types: Optional[List[str]] = None,
+        random_seed: int = 0,
+        batch_size: Optional[int] = None,
+        dtype: Union[str, np.dtype] = DEFAULT_DTYPE,
+        shard_size: int = 1000,
+        workers: Optional[int] = None,
+        environment: str = 'discs',
+        correlation_length: float = DEFAULT_CORRELATION_LENGTH,
+        windows_per_sequence: int = 1
+    ) -> ShardedDataset:
+        """
+        Open a cached dataset, generating and caching it first on a miss.
+        
+        Args:
+            dataset_size: Number of samples
+            spatial_dim: Spatial dimension of the grid
+            time_steps: Number of time steps in each sequence
+            features: Number of features per grid cell
+            threat_types: Threat types to include (None for all)
+            random_seed: Root seed for the per-sample random streams (required,
+                since unseeded datasets cannot be reproduced)
+            batch_size: Simulation batch size (None for one simulation per sample)
+            dtype: Storage dtype of the samples
+            shard_size: Samples per shard when generating
+            workers: Number of worker processes used when generating
+            environment: Environment model of the samples
+            correlation_length: Correlation length of the 'gaussian' environment model
+            windows_per_sequence: Samples taken from each simulated sequence
+            
+        Returns:
+            Memory-mapped dataset
+        """
+        if random_seed is None:
+            raise ValueError("Cached datasets need a random_seed to be reproducible")
+        
+        key = dataset_cache_key(
+            dataset_size, spatial_dim, time_steps, features, threat_types, random_seed, batch_size, dtype,
+            environment, correlation_length, windows_per_sequence
+        )
+        entry_dir = os.path.join(self.cache_dir, key)
+        
+        if os.path.exists(os.path.join(entry_dir, DATASET_MANIFEST)):
+            logger.info(f"Dataset cache hit: {entry_dir}")
+        else:
+            logger.info(f"Dataset cache miss, generating {entry_dir}")
+            
+            # Generate into a private directory and move it into place whole,
+            # so readers never see a partially written entry
+            tmp_dir = f"{entry_dir}.tmp-{os.getpid()}"
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            write_synthetic_dataset(
+                output_dir=tmp_dir,
+                dataset_size=dataset_size,
+                spatial_dim=spatial_dim,
+                time_steps=time_steps,
+                features=features,
+                threat_types=threat_types,
+                shard_size=shard_size,
+                batch_size=batch_size,
+                workers=workers,
+                random_seed=random_seed,
+                dtype=dtype,
+                environment=environment,
+                correlation_length=correlation_length,
+                windows_per_sequence=windows_per_sequence
+            )
+            try:
+                os.rename(tmp_dir, entry_dir)
+            except OSError:
+                # Another process cached the same dataset first
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        
+        # The manifest's modification time records when the entry was last used
+        os.utime(os.path.join(entry_dir, DATASET_MANIFEST))
+        self.evict(keep=key)
+        
+        return ShardedDataset(entry_dir)
+    
+    def entries(self) -> List[Dict[str, Any]]:
+        """
+        List the complete datasets in the cache.
+        
+        Returns:
+            List of dicts with the key, path, size in bytes and last use time,
+            least recently used first
+        """
+        entries = []
+        for key in os.listdir(self.cache_dir):
+            entry_dir = os.path.join(self.cache_dir, key)
+            manifest_path = os.path.join(entry_dir, DATASET_MANIFEST)
+            if not os.path.exists(manifest_path):
+                continue  # In-progress generation
+            
+            entries.append({
+                'key': key,
+                'path': entry_dir,
+                'bytes': sum(entry.stat().st_size for entry in os.scandir(entry_dir) if entry.is_file()),
+                'last_used': os.path.getmtime(manifest_path)
+            })
+        
+        return sorted(entries, key=lambda entry: entry['last_used'])
+    
+    def evict(self, keep: Optional[str] = None) -> List[str]:
+        """
+        Remove least recently used datasets until the cache fits its budget.
+        
+        Args:
+            keep: Key of a dataset that must not be evicted
+            
+        Returns:
+            Keys of the evicted datasets
+        """
+        entries = self.entries()
+        total_bytes = sum(entry['bytes'] for entry in entries)
+        evicted = []
+        
+        for entry in entries:
+            if total_bytes <= self.max_bytes:
+                break
+            if entry['key'] == keep:
+                continue
+            
+            shutil.rmtree(entry['path'], ignore_errors=True)
+            total_bytes -= entry['bytes']
+            evicted.append(entry['key'])
+            logger.info(f"Evicted cached dataset {entry['key']} ({entry['bytes'] / 1024 ** 2:.1f} MB)")
+        
+        return evicted
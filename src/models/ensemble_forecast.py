@@ -0,0 +1,261 @@
+"""
+Monte Carlo ensemble forecasts of pathogen spread.
+
+Runs many stochastic realizations of the spread simulation from one initial
+state and summarizes them as per-cell probability maps, without keeping the
+realizations themselves.
+"""
+
+import logging
+from typing import Any, Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.models.data_generator import (
+    DEFAULT_CORRELATION_LENGTH,
+    DEFAULT_DTYPE,
+    simulate_spread_batch
+)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Default summary statistics of an ensemble
+DEFAULT_THRESHOLDS = (0.1, 0.5)
+DEFAULT_QUANTILES = (0.05, 0.5, 0.95)
+DEFAULT_QUANTILE_BINS = 100
+
+
+class EnsembleAccumulator:
+    """
+    Streaming per-cell statistics of an ensemble of peak concentration maps.
+    
+    Exceedance probabilities and means are exact. Quantiles come from a
+    fixed-width histogram of every cell, so they are accurate to 1 / num_bins
+    and memory does not grow with the number of realizations. Cells that stay
+    exactly 0 are counted separately, so never-infected cells get quantiles
+    of exactly 0.
+    """
+    
+    def __init__(
+        self,
+        shape: Tuple[int, int],
+        thresholds: Sequence[float] = DEFAULT_THRESHOLDS,
+        num_bins: int = DEFAULT_QUANTILE_BINS
+    ):
+        """
+        Initialize the accumulator.
+        
+        Args:
+            shape: Grid shape (H, W)
+            thresholds: Concentrations whose exceedance probabilities are tracked
+            num_bins: Histogram bins over (0, 1] used for the quantiles
+        """
+        self.shape = tuple(shape)
+        self.thresholds = np.asarray(thresholds, dtype=np.float64)
+        self.num_bins = num_bins
+        self.count = 0
+        
+        self.exceedances = np.zeros((len(self.thresholds),) + self.shape, dtype=np.int64)
+        self.total = np.zeros(self.shape, dtype=np.float64)
+        # Bin 0 holds exact zeros, bin k > 0 holds values in ((k - 1) / num_bins, k / num_bins]
+        self.histogram = np.zeros(self.shape + (num_bins + 1,), dtype=np.uint32)
+        self._cells = np.arange(self.shape[0] * self.shape[1])
+    
+    def update(self, peaks: np.ndarray) -> None:
+        """
+        Add a batch of realizations.
+        
+        Args:
+            peaks: Peak concentration maps (batch, H, W) with values in [0, 1]
+        """
+        peaks = np.asarray(peaks, dtype=np.float64)
+        self.count += len(peaks)
+        
+        self.exceedances += np.sum(peaks[None] > self.thresholds[:, None, None, None], axis=1)
+        self.total += peaks.sum(axis=0)
+        
+        bins = np.minimum(np.ceil(peaks * self.num_bins).astype(np.int64), self.num_bins)
+        
+        # Each realization puts every cell in exactly one bin, so the indexed
+        # increments never collide and add into the histogram in place,
+        # without a temporary of the histogram's size
+        histogram = self.histogram.reshape(-1, self.num_bins + 1)
+        for realization_bins in bins.reshape(len(bins), -1):
+            histogram[self._cells, realization_bins] += 1
+    
+    def exceedance_probabilities(self) -> np.ndarray:
+        """
+        Get the probability of each cell exceeding each threshold.
+        
+        Returns:
+            Probabilities (num_thresholds, H, W)
+        """
+        return self.exceedances / max(self.count, 1)
+    
+    def standard_errors(self) -> np.ndarray:
+        """
+        Get the Monte Carlo standard errors of the exceedance probabilities.
+        
+        Returns:
+            Standard errors (num_thresholds, H, W)
+        """
+        probabilities = self.exceedance_probabilities()
+        return np.sqrt(probabilities * (1 - probabilities) / max(self.count, 1))
+    
+    def mean(self) -> np.ndarray:
+        """
+        Get the mean peak concentration of each cell.
+        
+        Returns:
+            Mean map (H, W)
+        """
+        return self.total / max(self.count, 1)
+    
+    def quantiles(self, quantiles: Sequence[float]) -> np.ndarray:
+        """
+        Estimate quantiles of the peak concentration of each cell.
+        
+        Args:
+            quantiles: Quantile levels in [0, 1]
+            
+        Returns:
+            Quantile maps (num_quantiles, H, W)
+        """
+        cumulative = np.cumsum(self.histogram, axis=-1, dtype=np.int64)
+        results = np.zeros((len(quantiles),) + self.shape)
+        
+        for k, q in enumerate(quantiles):
+            target = q * self.count
+            # First bin whose cumulative count reaches the target rank
+            bins = np.minimum(np.sum(cumulative < target, axis=-1), self.num_bins)
+            below = np.take_along_axis(cumulative, np.maximum(bins - 1, 0)[..., None], -1)[..., 0]
+            below = np.where(bins > 0, below, 0)
+            in_bin = np.take_along_axis(self.histogram, bins[..., None], -1)[..., 0]
+            
+            # Interpolate linearly within the bin; the zero bin has no width
+            fraction = np.clip((target - below) / np.maximum(in_bin, 1), 0, 1)
+            results[k] = np.where(bins > 0, (bins - 1 + fraction) / self.num_bins, 0)
+        
+        return results
+
+
+def ensemble_forecast(
+    initial_state: np.ndarray,
+    time_steps: int,
+    threat_type: str = 'FUNGAL',
+    max_realizations: int = 1000,
+    batch_size: int = 50,
+    min_realizations: int = 100,
+    tolerance: float = 0.01,
+    thresholds: Sequence[float] = DEFAULT_THRESHOLDS,
+    quantiles: Sequence[float] = DEFAULT_QUANTILES,
+    num_bins: int = DEFAULT_QUANTILE_BINS,
+    feature_idx: int = 0,
+    random_seed: Optional[int] = None,
+    dtype: Union[str, np.dtype] = DEFAULT_DTYPE,
+    environment: str = 'discs',
+    correlation_length: float = DEFAULT_CORRELATION_LENGTH
+) -> Dict[str, Any]:
+    """
+    Forecast per-cell infection probabilities from an ensemble of simulations.
+    
+    Realizations are simulated batch_size at a time with simulate_spread_batch
+    and reduced to the peak concentration of each cell over the forecast
+    steps, as PathogenSpreadModel.generate_probability_heatmap reduces the
+    predicted steps, before they are added to the running statistics. The
+    initial state is left out, so seeded cells do not read as certain. Only
+    one batch of sequences is held in memory.
+    
+    The forecast stops early, after at least min_realizations, once the
+    standard error of every exceedance probability and the change of every
+    quantile over the last batch are within tolerance.
+    
+    Args:
+        initial_state: Initial state (spatial_dim, spatial_dim, features)
+        time_steps: Number of time steps to simulate, including the initial
+            state, which is not part of the forecast (at least 2)
+        threat_type: Type of biological threat to simulate
+        max_realizations: Maximum number of realizations
+        batch_size: Realizations simulated together
+        min_realizations: Realizations to run before checking convergence
+        tolerance: Convergence tolerance of the probabilities and quantiles
+        thresholds: Concentrations whose exceedance probabilities are estimated
+        quantiles: Quantile levels of the peak concentration to estimate
+        num_bins: Histogram resolution of the quantile estimates
+        feature_idx: Index of the feature to forecast
+        random_seed: Root seed; batch k uses the k-th spawned SeedSequence
+        dtype: dtype to simulate in (float16 is simulated in float32)
+        environment: Environment model of the weather drift
+        correlation_length: Correlation length in cells of the 'gaussian' drift
+        
+    Returns:
+        Dictionary with:
+            probability: Heatmap (spatial_dim, spatial_dim) of the probability
+                of exceeding the first threshold, ready for convert_to_geojson
+            exceedance: Dict mapping each threshold to its probability heatmap
+            standard_error: Dict mapping each threshold to the standard errors
+            quantiles: Dict mapping each quantile level to its heatmap
+            mean: Heatmap of the mean peak concentration
+            num_realizations: Number of realizations run
+            converged: Whether the tolerance was reached before max_realizations
+    """
+    if time_steps < 2:
+        raise ValueError(f"time_steps must be at least 2 to forecast past the initial state, got {time_steps}")
+    if max_realizations <= 0:
+        raise ValueError(f"max_realizations must be positive, got {max_realizations}")
+    if batch_size <= 0:
+        raise ValueError(f"batch_size must be positive, got {batch_size}")
+    
+    spatial_dim = initial_state.shape[0]
+    accumulator = EnsembleAccumulator((spatial_dim, initial_state.shape[1]), thresholds, num_bins)
+    
+    num_batches = -(-max_realizations // batch_size)
+    seed_sequences = np.random.SeedSequence(random_seed).spawn(num_batches)
+    
+    previous_quantiles = None
+    converged = False
+    
+    for seed_sequence in seed_sequences:
+        size = min(batch_size, max_realizations - accumulator.count)
+        sequences = simulate_spread_batch(
+            np.broadcast_to(initial_state, (size,) + initial_state.shape),
+            time_steps=time_steps,
+            threat_types=threat_type,
+            rng=np.random.default_rng(seed_sequence),
+            dtype=dtype,
+            environment=environment,
+            correlation_length=correlation_length
+        )
+        # Peak over the forecast steps, leaving out the initial state
+        accumulator.update(np.clip(sequences[:, 1:, :, :, feature_idx].max(axis=1), 0, 1))
+        del sequences
+        
+        current_quantiles = accumulator.quantiles(quantiles)
+        if accumulator.count >= min_realizations and previous_quantiles is not None:
+            max_error = accumulator.standard_errors().max(initial=0)
+            max_change = np.abs(current_quantiles - previous_quantiles).max(initial=0)
+            if max_error <= tolerance and max_change <= tolerance:
+                converged = True
+                break
+        previous_quantiles = current_quantiles
+    
+    logger.info(f"Ensemble forecast used {accumulator.count} realizations "
+                f"({'converged' if converged else 'not converged'} at tolerance {tolerance})")
+    
+    probabilities = accumulator.exceedance_probabilities()
+    standard_errors = accumulator.standard_errors()
+    
+    return {
+        'probability': probabilities[0],
+        'exceedance': {float(t): probabilities[k] for k, t in enumerate(thresholds)},
+        'standard_error': {float(t): standard_errors[k] for k, t in enumerate(thresholds)},
+        'quantiles': {float(q): current_quantiles[k] for k, q in enumerate(quantiles)},
+        'mean': accumulator.mean(),
+        'num_realizations': accumulator.count,
+        'converged': converged
+    }
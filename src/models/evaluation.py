@@ -49,8 +49,8 @@ def evaluate_model(
     y_pred_feature = y_pred[:, :, :, feature_idx]
     
     # Flatten arrays for easier metric calculation
-    y_val_flat = y_val_feature.flatten()
-    y_pred_flat = y_pred_feature.flatten()
+    y_val_flat = y_val_feature.ravel()
+    y_pred_flat = y_pred_feature.ravel()
     
     # Calculate regression metrics
     mae = mean_absolute_error(y_val_flat, y_pred_flat)
@@ -91,7 +91,7 @@ def evaluate_model(
         sample_fn = np.sum((sample_val_binary == 1) & (sample_pred_binary == 0))
         
         sample_iou = sample_tp / (sample_tp + sample_fp + sample_fn) if (sample_tp + sample_fp + sample_fn) > 0 else 0
-        sample_mae = mean_absolute_error(sample_val.flatten(), sample_pred.flatten())
+        sample_mae = mean_absolute_error(sample_val.ravel(), sample_pred.ravel())
         
         sample_metrics.append({
             'iou': float(sample_iou),
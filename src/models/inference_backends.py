@@ -0,0 +1,513 @@
+#!/usr/bin/env python3
+"""
+CPU inference backends for PathogenSpreadModel.
+
+A trained model can be exported to TFLite (float32, float16 or int8
+calibrated on synthetic samples) and ONNX files, and run through an
+InferenceRunner: the compiled Keras model, a TFLite interpreter or an ONNX
+Runtime session. Runners import only their own runtime, so a prediction node
+with ai-edge-litert, tflite-runtime or onnxruntime installed can run an
+exported model without TensorFlow.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import logging
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+# Add project root to path to allow imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.models.data_generator import generate_synthetic_dataset
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# File of each exportable backend within an export directory
+EXPORT_FILES = {
+    'tflite': 'model_float32.tflite',
+    'tflite_float16': 'model_float16.tflite',
+    'tflite_int8': 'model_int8.tflite',
+    'onnx': 'model.onnx'
+}
+BACKENDS = ('keras',) + tuple(EXPORT_FILES)
+EXPORT_MANIFEST = 'backends.json'
+
+# Synthetic samples the int8 quantization ranges are calibrated on
+DEFAULT_CALIBRATION_SAMPLES = 100
+
+
+class InferenceRunner:
+    """
+    Backend-agnostic forward pass of a spread prediction model.
+    
+    Subclasses implement __call__, one forward pass over a batch of input
+    windows (batch, time_steps, spatial_dim, spatial_dim, features).
+    """
+    
+    name = 'base'
+    
+    def __init__(self, batch_size: int = 32):
+        """
+        Initialize the runner.
+        
+        Args:
+            batch_size: Largest batch predict passes to a single forward pass
+        """
+        self.batch_size = batch_size
+    
+    def __call__(self, X: np.ndarray) -> np.ndarray:
+        """
+        Run one forward pass over a whole batch.
+        
+        Args:
+            X: Input windows (batch, time_steps, spatial_dim, spatial_dim, features)
+            
+        Returns:
+            Predictions (batch, spatial_dim, spatial_dim, features)
+        """
+        raise NotImplementedError
+    
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """
+        Predict any number of samples in batches of at most batch_size.
+        
+        Args:
+            X: Input windows (num_samples, time_steps, spatial_dim, spatial_dim, features)
+            
+        Returns:
+            Predictions (num_samples, spatial_dim, spatial_dim, features) as float32
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if len(X) == 0:
+            # Nothing to run, but keep the prediction shape like model.predict did
+            return np.empty((0,) + X.shape[2:], dtype=np.float32)
+        
+        predictions = None
+        
+        for start in range(0, len(X), self.batch_size):
+            batch = self(X[start:start + self.batch_size])
+            if predictions is None:
+                predictions = np.empty((len(X),) + batch.shape[1:], dtype=np.float32)
+            predictions[start:start + len(batch)] = batch
+        
+        return predictions
+
+
+class FunctionRunner(InferenceRunner):
+    """
+    Runner around a Python callable, such as the compiled Keras forward pass.
+    """
+    
+    def __init__(self, function: Callable, batch_size: int = 32, name: str = 'keras'):
+        """
+        Initialize the runner.
+        
+        Args:
+            function: Callable mapping an input batch to predictions
+            batch_size: Largest batch predict passes to a single call
+            name: Backend name used in reports
+        """
+        super().__init__(batch_size)
+        self.function = function
+        self.name = name
+    
+    def __call__(self, X: np.ndarray) -> np.ndarray:
+        return np.asarray(self.function(X))
+
+
+def _load_tflite_interpreter(model_path: str, num_threads: Optional[int] = None) -> Any:
+    """
+    Create a TFLite interpreter from the lightest runtime available.
+    
+    Args:
+        model_path: Path of the .tflite file
+        num_threads: Number of CPU threads of the interpreter
+        
+    Returns:
+        Interpreter for the model
+    """
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+    
+    return Interpreter(model_path=model_path, num_threads=num_threads)
+
+
+class TFLiteRunner(InferenceRunner):
+    """
+    Runner executing a TFLite model with the TFLite interpreter.
+    """
+    
+    def __init__(
+        self,
+        model_path: str,
+        num_threads: Optional[int] = None,
+        batch_size: int = 32,
+        name: str = 'tflite'
+    ):
+        """
+        Initialize the runner.
+        
+        Args:
+            model_path: Path of the .tflite file
+            num_threads: Number of CPU threads of the interpreter
+            batch_size: Largest batch predict passes to a single invocation
+            name: Backend name used in reports
+        """
+        super().__init__(batch_size)
+        self.name = name
+        self.interpreter = _load_tflite_interpreter(model_path, num_threads)
+        self._input_index = self.interpreter.get_input_details()[0]['index']
+        self._output_index = self.interpreter.get_output_details()[0]['index']
+        self._input_shape = None
+    
+    def __call__(self, X: np.ndarray) -> np.ndarray:
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.shape != self._input_shape:
+            # The batch (and convlstm grid) dimensions are dynamic; a new shape reallocates the tensors
+            self.interpreter.resize_tensor_input(self._input_index, X.shape)
+            self.interpreter.allocate_tensors()
+            self._input_shape = X.shape
+        
+        self.interpreter.set_tensor(self._input_index, X)
+        self.interpreter.invoke()
+        return self.interpreter.get_tensor(self._output_index)
+
+
+class ONNXRunner(InferenceRunner):
+    """
+    Runner executing an ONNX model with ONNX Runtime on the CPU.
+    """
+    
+    def __init__(
+        self,
+        model_path: str,
+        num_threads: Optional[int] = None,
+        batch_size: int = 32,
+        name: str = 'onnx'
+    ):
+        """
+        Initialize the runner.
+        
+        Args:
+            model_path: Path of the .onnx file
+            num_threads: Number of intra-op CPU threads
+            batch_size: Largest batch predict passes to a single run
+            name: Backend name used in reports
+        """
+        import onnxruntime
+        
+        super().__init__(batch_size)
+        self.name = name
+        
+        options = onnxruntime.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = onnxruntime.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+        self._input_name = self.session.get_inputs()[0].name
+    
+    def __call__(self, X: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self._input_name: np.ascontiguousarray(X, dtype=np.float32)})[0]
+
+
+def _frozen_forward(model) -> Any:
+    """
+    Get the model's forward pass as a concrete function with its weights as constants.
+    
+    Args:
+        model: PathogenSpreadModel to export
+        
+    Returns:
+        Frozen concrete function with a dynamic batch dimension
+    """
+    from tensorflow.python.framework.convert_to_constants import convert_variables_to_constants_v2
+    
+    # The converters leave captured Keras variables as uninitialized resources,
+    # so they are folded into the graph first
+    return convert_variables_to_constants_v2(model._build_export_function().get_concrete_function())
+
+
+def export_tflite(
+    model,
+    output_path: str,
+    quantization: Optional[str] = None,
+    calibration_samples: int = DEFAULT_CALIBRATION_SAMPLES,
+    random_seed: int = 0
+) -> str:
+    """
+    Convert a model to a TFLite file.
+    
+    Inputs and outputs stay float32 for every quantization, so all TFLite
+    files are drop-in replacements for each other.
+    
+    Args:
+        model: PathogenSpreadModel to export
+        output_path: Path of the .tflite file to write
+        quantization: None for float32, 'float16' for float16 weights, or
+            'int8' for int8 weights and activations calibrated on synthetic samples
+        calibration_samples: Number of generate_synthetic_dataset samples
+            the int8 activation ranges are calibrated on
+        random_seed: Seed of the calibration samples
+        
+    Returns:
+        The output path
+    """
+    import tensorflow as tf
+    
+    converter = tf.lite.TFLiteConverter.from_concrete_functions([_frozen_forward(model)])
+    
+    if quantization == 'float16':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif quantization == 'int8':
+        X_calibration, _ = generate_synthetic_dataset(
+            dataset_size=calibration_samples,
+            spatial_dim=model.spatial_dim,
+            time_steps=model.time_steps,
+            features=model.features,
+            random_seed=random_seed,
+            dtype='float32'
+        )
+        
+        def representative_dataset():
+            for sample in X_calibration:
+                yield [sample[None]]
+        
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+    elif quantization is not None:
+        raise ValueError(f"Unknown TFLite quantization '{quantization}', expected None, 'float16' or 'int8'")
+    
+    with open(output_path, 'wb') as f:
+        f.write(converter.convert())
+    
+    logger.info(f"Exported {quantization or 'float32'} TFLite model to {output_path}")
+    return output_path
+
+
+def export_onnx(model, output_path: str, opset: int = 17) -> str:
+    """
+    Convert a model to an ONNX file with tf2onnx.
+    
+    Args:
+        model: PathogenSpreadModel to export
+        output_path: Path of the .onnx file to write
+        opset: ONNX opset version
+        
+    Returns:
+        The output path
+    """
+    import tensorflow as tf
+    import tf2onnx
+    
+    input_signature = [tf.TensorSpec((None,) + model._input_shape(), tf.float32, name='inputs')]
+    tf2onnx.convert.from_function(
+        model._build_export_function(), input_signature=input_signature, opset=opset, output_path=output_path
+    )
+    
+    logger.info(f"Exported ONNX model to {output_path}")
+    return output_path
+
+
+def export_model(
+    model,
+    output_dir: str,
+    backends: Sequence[str] = tuple(EXPORT_FILES),
+    calibration_samples: int = DEFAULT_CALIBRATION_SAMPLES,
+    random_seed: int = 0
+) -> Dict[str, Any]:
+    """
+    Export a model for several backends into one directory.
+    
+    A manifest with the model dimensions and the file of each backend is
+    written last, so load_runner can open the exports without the Keras model.
+    
+    Args:
+        model: PathogenSpreadModel to export
+        output_dir: Directory to write the exported files to
+        backends: Backends to export, keys of EXPORT_FILES
+        calibration_samples: Number of synthetic samples int8 quantization is calibrated on
+        random_seed: Seed of the calibration samples
+        
+    Returns:
+        The export manifest
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    
+    for backend in backends:
+        if backend not in EXPORT_FILES:
+            raise ValueError(f"Unknown backend '{backend}'. Expected one of {list(EXPORT_FILES)}")
+        
+        output_path = os.path.join(output_dir, EXPORT_FILES[backend])
+        if backend == 'onnx':
+            export_onnx(model, output_path)
+        else:
+            quantization = backend.split('_')[1] if '_' in backend else None
+            export_tflite(model, output_path, quantization, calibration_samples, random_seed)
+    
+    manifest = {
+        'spatial_dim': model.spatial_dim,
+        'time_steps': model.time_steps,
+        'features': model.features,
+        'architecture': model.architecture,
+        'backends': {backend: EXPORT_FILES[backend] for backend in backends},
+        'calibration_samples': calibration_samples
+    }
+    
+    with open(os.path.join(output_dir, EXPORT_MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=4)
+    
+    return manifest
+
+
+def load_runner(
+    export_dir: str,
+    backend: str,
+    num_threads: Optional[int] = None,
+    batch_size: int = 32
+) -> InferenceRunner:
+    """
+    Open an exported model as an inference runner.
+    
+    Args:
+        export_dir: Directory written by export_model
+        backend: Exported backend to run, a key of EXPORT_FILES
+        num_threads: Number of CPU threads of the runtime
+        batch_size: Largest batch predict passes to a single forward pass
+        
+    Returns:
+        Runner for the backend
+    """
+    with open(os.path.join(export_dir, EXPORT_MANIFEST), 'r') as f:
+        manifest = json.load(f)
+    
+    if backend not in manifest['backends']:
+        raise ValueError(f"Backend '{backend}' was not exported to {export_dir}")
+    
+    model_path = os.path.join(export_dir, manifest['backends'][backend])
+    runner_class = ONNXRunner if backend == 'onnx' else TFLiteRunner
+    return runner_class(model_path, num_threads=num_threads, batch_size=batch_size, name=backend)
+
+
+def backend_report(
+    model,
+    runners: Sequence[InferenceRunner],
+    X_val: np.ndarray,
+    y_val: np.ndarray,
+    latency_samples: int = 50
+) -> List[Dict[str, Any]]:
+    """
+    Compare the accuracy and latency of inference backends.
+    
+    Each runner is installed on the model in turn, evaluated with
+    evaluate_model and timed on single-sample forward passes, the batch
+    size of a one-outbreak rollout step. The compiled Keras model is always
+    included first as the reference.
+    
+    Args:
+        model: PathogenSpreadModel the backends were exported from
+        runners: Runners of the backends to compare
+        X_val: Validation inputs
+        y_val: Validation targets
+        latency_samples: Number of timed single-sample forward passes
+        
+    Returns:
+        List of result rows with the backend name, evaluation metrics, p50
+        and p99 latency in milliseconds and the largest prediction difference
+        from the Keras model
+    """
+    from src.models.evaluation import evaluate_model
+    
+    model.set_runner(None)
+    reference = model.predict(X_val)
+    results = []
+    
+    try:
+        for runner in [model.runner] + list(runners):
+            model.set_runner(runner)
+            metrics = evaluate_model(model, X_val, y_val)
+            
+            # Warm up, then time one sample at a time
+            runner(X_val[:1])
+            timings = []
+            for k in range(latency_samples):
+                sample = X_val[k % len(X_val)][None]
+                start = time.perf_counter()
+                runner(sample)
+                timings.append(time.perf_counter() - start)
+            p50, p99 = np.percentile(np.array(timings) * 1000, [50, 99])
+            
+            results.append({
+                'backend': runner.name,
+                **{key: metrics[key] for key in ('mae', 'rmse', 'r2', 'f1', 'iou')},
+                'p50_ms': float(p50),
+                'p99_ms': float(p99),
+                'max_diff': float(np.max(np.abs(model.predict(X_val) - reference)))
+            })
+            logger.info(f"{runner.name}: MAE {metrics['mae']:.5f}, p50 {p50:.2f}ms, p99 {p99:.2f}ms")
+    finally:
+        model.set_runner(None)
+    
+    return results
+
+
+def main():
+    """Command line interface for exporting a model and reporting on its backends."""
+    parser = argparse.ArgumentParser(description="Export a spread prediction model for CPU inference backends")
+    parser.add_argument("--model", type=str, required=True, help="Path of the trained Keras model")
+    parser.add_argument("--output-dir", type=str, required=True, help="Directory to export the backends to")
+    parser.add_argument("--backends", type=str, default="tflite,tflite_float16,tflite_int8,onnx",
+                        help=f"Comma-separated backends to export, from {list(EXPORT_FILES)}")
+    parser.add_argument("--calibration-samples", type=int, default=DEFAULT_CALIBRATION_SAMPLES,
+                        help="Synthetic samples the int8 quantization is calibrated on")
+    parser.add_argument("--val-size", type=int, default=100, help="Synthetic validation samples of the report")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the calibration and validation samples")
+    parser.add_argument("--report", type=str, default=None, help="Path to write the backend report JSON to")
+    
+    args = parser.parse_args()
+    
+    from src.models.spread_prediction import PathogenSpreadModel
+    
+    model = PathogenSpreadModel.load_model(args.model)
+    backends = args.backends.split(",")
+    export_model(model, args.output_dir, backends, args.calibration_samples, args.seed)
+    
+    # Validate on samples the int8 calibration has not seen
+    X_val, y_val = generate_synthetic_dataset(
+        dataset_size=args.val_size,
+        spatial_dim=model.spatial_dim,
+        time_steps=model.time_steps,
+        features=model.features,
+        random_seed=args.seed + 1
+    )
+    runners = [load_runner(args.output_dir, backend) for backend in backends]
+    report = backend_report(model, runners, X_val, y_val)
+    
+    print(f"{'backend':>15} {'MAE':>9} {'RMSE':>9} {'IoU':>7} {'p50 ms':>8} {'p99 ms':>8} {'max diff':>9}")
+    for row in report:
+        print(f"{row['backend']:>15} {row['mae']:>9.5f} {row['rmse']:>9.5f} {row['iou']:>7.3f} "
+              f"{row['p50_ms']:>8.2f} {row['p99_ms']:>8.2f} {row['max_diff']:>9.2e}")
+    
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=4)
+        logger.info(f"Backend report saved to {args.report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,13 +13,24 @@ import matplotlib.pyplot as plt
 import json
 import logging
 from datetime import datetime
-from typing import Dict, Any, Optional, Tuple
+from typing import Dict, Any, Optional, Sequence, Tuple
 
 # Add project root to path to allow imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from src.models.spread_prediction import PathogenSpreadModel
-from src.models.data_generator import generate_synthetic_dataset, generate_showcase_dataset
+from src.models.spread_prediction import ARCHITECTURES, PathogenSpreadModel
+from src.models.augmentation import augment_batch
+from src.models.data_generator import (
+    DEFAULT_CORRELATION_LENGTH,
+    DEFAULT_DTYPE,
+    ENVIRONMENT_MODELS,
+    ShardedDataset,
+    generate_showcase_dataset,
+    generate_synthetic_dataset,
+    load_spread_behaviors,
+    write_synthetic_dataset
+)
+from src.models.dataset_cache import DATASET_CACHE_DIR, DatasetCache
 from src.models.evaluation import evaluate_model, plot_evaluation_metrics, visualize_predictions
 
 # Configure logging
@@ -61,6 +72,42 @@ def setup_training_dirs(output_dir: str) -> Dict[str, str]:
     return dirs
 
 
+def split_sequence_groups(
+    num_samples: int,
+    val_split: float,
+    windows_per_sequence: int = 1,
+    rng: Optional[Any] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Split sample indices into training and validation sets by simulation.
+    
+    With windows_per_sequence set to k, samples come in consecutive groups
+    of k overlapping windows of one simulation (the last group may be
+    shorter). Splitting individual samples would put near-duplicates of
+    training samples into the validation set, so whole groups are assigned
+    to one side of the split.
+    
+    Args:
+        num_samples: Number of samples in the dataset
+        val_split: Fraction of the simulations used for validation
+        windows_per_sequence: Samples taken from each simulated sequence
+        rng: Random generator shuffling the groups; None keeps their order
+            and uses the last groups for validation
+        
+    Returns:
+        Tuple of (train_indices, val_indices)
+    """
+    num_groups = -(-num_samples // windows_per_sequence)
+    val_groups = int(num_groups * val_split)
+    groups = np.arange(num_groups) if rng is None else rng.permutation(num_groups)
+    
+    def group_indices(group_ids: np.ndarray) -> np.ndarray:
+        indices = (group_ids[:, None] * windows_per_sequence + np.arange(windows_per_sequence)).ravel()
+        return indices[indices < num_samples]
+    
+    return group_indices(groups[:num_groups - val_groups]), group_indices(groups[num_groups - val_groups:])
+
+
 def generate_training_data(
     args: argparse.Namespace,
     data_dir: Optional[str] = None
@@ -85,20 +132,23 @@ def generate_training_data(
         spatial_dim=args.spatial_dim,
         time_steps=args.time_steps,
         features=args.features,
-        threat_types=threat_types
+        threat_types=threat_types,
+        workers=args.workers,
+        random_seed=args.seed,
+        dtype=args.dtype,
+        environment=args.environment,
+        correlation_length=args.correlation_length,
+        windows_per_sequence=args.windows_per_sequence
     )
     
-    # Split into training and validation sets
-    val_size = int(len(X) * args.val_split)
-    train_size = len(X) - val_size
-    
-    # Shuffle the data
-    indices = np.random.permutation(len(X))
-    X = X[indices]
-    y = y[indices]
+    # Shuffle and split into training and validation sets, keeping the
+    # windows of each simulation on one side of the split
+    train_indices, val_indices = split_sequence_groups(
+        len(X), args.val_split, args.windows_per_sequence, rng=np.random.default_rng(args.seed)
+    )
     
-    X_train, X_val = X[:train_size], X[train_size:]
-    y_train, y_val = y[:train_size], y[train_size:]
+    X_train, X_val = X[train_indices], X[val_indices]
+    y_train, y_val = y[train_indices], y[val_indices]
     
     logger.info(f"Training set: {X_train.shape}, Validation set: {X_val.shape}")
     
@@ -113,7 +163,202 @@ def generate_training_data(
     return X_train, y_train, X_val, y_val
 
 
-def train_model(args: argparse.Namespace, dirs: Dict[str, str]) -> PathogenSpreadModel:
+class ArrayDataset:
+    """
+    In-memory (X, y) arrays with the get_batch interface of ShardedDataset.
+    """
+    
+    def __init__(self, X: np.ndarray, y: np.ndarray):
+        """
+        Initialize the dataset.
+        
+        Args:
+            X: Input sequences (num_samples, time_steps, spatial_dim, spatial_dim, features)
+            y: Targets (num_samples, spatial_dim, spatial_dim, features)
+        """
+        self.X = X
+        self.y = y
+    
+    def __len__(self) -> int:
+        return len(self.X)
+    
+    def get_batch(self, indices: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+        return self.X[indices], self.y[indices]
+
+
+class ShardedBatchSequence(tf.keras.utils.Sequence):
+    """
+    Keras Sequence that reads batches lazily from a sharded on-disk dataset.
+    """
+    
+    def __init__(
+        self,
+        dataset: ShardedDataset,
+        indices: Sequence[int],
+        batch_size: int,
+        shuffle: bool = True,
+        augment: bool = False,
+        random_seed: Optional[int] = None
+    ):
+        """
+        Initialize the sequence.
+        
+        Args:
+            dataset: Sharded dataset (or ArrayDataset) to read from
+            indices: Sample indices that make up this split
+            batch_size: Number of samples per batch
+            shuffle: Reshuffle the samples after every epoch
+            augment: Apply a random dihedral transform to every sample as its
+                batch is read (see augmentation.augment_batch)
+            random_seed: Seed of the batch order and the augmentation transforms
+        """
+        super().__init__()
+        self.dataset = dataset
+        self.indices = np.array(indices)
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.augment = augment
+        self.rng = np.random.default_rng(random_seed)
+        
+        if self.shuffle:
+            self.rng.shuffle(self.indices)
+    
+    def __len__(self) -> int:
+        return int(np.ceil(len(self.indices) / self.batch_size))
+    
+    def __getitem__(self, idx: int) -> Tuple[np.ndarray, np.ndarray]:
+        X, y = self.dataset.get_batch(self.indices[idx * self.batch_size:(idx + 1) * self.batch_size])
+        if self.augment:
+            X, y = augment_batch(X, y, self.rng)
+        return X, y
+    
+    def on_epoch_end(self) -> None:
+        if self.shuffle:
+            self.rng.shuffle(self.indices)
+
+
+def split_sharded_dataset(
+    dataset: ShardedDataset,
+    val_split: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Split a sharded dataset into training and validation indices.
+    
+    The last val_split fraction of the simulations is used for validation
+    without shuffling, which keeps the split identical between training and
+    evaluation. The split falls on a simulation boundary, using the
+    windows_per_sequence recorded in the manifest, so the overlapping windows
+    of one simulation never end up on both sides (see split_sequence_groups).
+    
+    Args:
+        dataset: Sharded dataset to split
+        val_split: Validation set split ratio
+        
+    Returns:
+        Tuple of (train_indices, val_indices)
+    """
+    return split_sequence_groups(len(dataset), val_split, dataset.manifest.get('windows_per_sequence', 1))
+
+
+def uses_disk_dataset(args: argparse.Namespace) -> bool:
+    """
+    Check whether training data is read from disk rather than held in memory.
+    
+    Args:
+        args: Command-line arguments
+        
+    Returns:
+        True when training from --shard-dir or the dataset cache
+    """
+    return bool(args.shard_dir) or not args.no_cache
+
+
+def load_training_dataset(
+    args: argparse.Namespace,
+    generate: bool = True
+) -> ShardedDataset:
+    """
+    Open the on-disk training dataset, generating it if needed.
+    
+    With --shard-dir the dataset is written to that directory; otherwise it
+    is taken from the dataset cache, so the evaluator and later runs with the
+    same parameters reuse the samples instead of simulating them again.
+    
+    Args:
+        args: Command-line arguments
+        generate: Write the --shard-dir dataset before opening it
+        
+    Returns:
+        Memory-mapped training dataset
+    """
+    threat_types = args.threat_types.split(",") if args.threat_types else None
+    
+    if not args.shard_dir:
+        cache = DatasetCache(args.cache_dir, max_bytes=int(args.cache_budget_gb * 1024 ** 3))
+        return cache.get_or_create(
+            dataset_size=args.dataset_size,
+            spatial_dim=args.spatial_dim,
+            time_steps=args.time_steps,
+            features=args.features,
+            threat_types=threat_types,
+            random_seed=args.seed,
+            dtype=args.dtype,
+            shard_size=args.shard_size,
+            workers=args.workers,
+            environment=args.environment,
+            correlation_length=args.correlation_length,
+            windows_per_sequence=args.windows_per_sequence
+        )
+    
+    if generate:
+        logger.info(f"Generating sharded training data in {args.shard_dir}...")
+        write_synthetic_dataset(
+            output_dir=args.shard_dir,
+            dataset_size=args.dataset_size,
+            spatial_dim=args.spatial_dim,
+            time_steps=args.time_steps,
+            features=args.features,
+            threat_types=threat_types,
+            shard_size=args.shard_size,
+            workers=args.workers,
+            random_seed=args.seed,
+            dtype=args.dtype,
+            environment=args.environment,
+            correlation_length=args.correlation_length,
+            windows_per_sequence=args.windows_per_sequence
+        )
+    
+    return ShardedDataset(args.shard_dir)
+
+
+def generate_training_sequences(
+    args: argparse.Namespace
+) -> Tuple[ShardedBatchSequence, ShardedBatchSequence]:
+    """
+    Generate training data to disk and return lazily loaded batch sequences.
+    
+    Args:
+        args: Command-line arguments
+        
+    Returns:
+        Tuple of (train_sequence, val_sequence)
+    """
+    dataset = load_training_dataset(args)
+    train_indices, val_indices = split_sharded_dataset(dataset, args.val_split)
+    
+    logger.info(f"Training samples: {len(train_indices)}, Validation samples: {len(val_indices)}")
+    
+    return (
+        ShardedBatchSequence(dataset, train_indices, args.batch_size, shuffle=True,
+                             augment=args.augment, random_seed=args.seed),
+        ShardedBatchSequence(dataset, val_indices, args.batch_size, shuffle=False)
+    )
+
+
+def train_model(
+    args: argparse.Namespace,
+    dirs: Dict[str, str]
+) -> Tuple[PathogenSpreadModel, Optional[Tuple[np.ndarray, np.ndarray]]]:
     """
     Train the pathogen spread prediction model.
     
@@ -122,13 +367,30 @@ def train_model(args: argparse.Namespace, dirs: Dict[str, str]) -> PathogenSprea
         dirs: Directory paths for outputs
         
     Returns:
-        Trained PathogenSpreadModel
+        Tuple of (trained PathogenSpreadModel, (X_val, y_val)), where the
+        validation data is None when it was streamed from disk
     """
     # Generate or load training data
-    X_train, y_train, X_val, y_val = generate_training_data(
-        args,
-        data_dir=os.path.join(dirs["run"], "data") if args.save_data else None
-    )
+    if uses_disk_dataset(args):
+        # Stream batches from disk instead of holding the dataset in memory
+        X_train, X_val = generate_training_sequences(args)
+        y_train = y_val = None
+        validation_data = None
+    else:
+        X_train, y_train, X_val, y_val = generate_training_data(
+            args,
+            data_dir=os.path.join(dirs["run"], "data") if args.save_data else None
+        )
+        # Handed to the evaluation, so it scores exactly the held-out samples
+        validation_data = (X_val, y_val)
+        
+        if args.augment:
+            # Augment lazily per batch instead of storing transformed copies
+            X_train = ShardedBatchSequence(ArrayDataset(X_train, y_train), np.arange(len(X_train)),
+                                           args.batch_size, shuffle=True, augment=True, random_seed=args.seed)
+            X_val = ShardedBatchSequence(ArrayDataset(X_val, y_val), np.arange(len(X_val)),
+                                         args.batch_size, shuffle=False)
+            y_train = y_val = None
     
     # Configure TensorFlow for performance
     if args.mixed_precision:
@@ -155,7 +417,8 @@ def train_model(args: argparse.Namespace, dirs: Dict[str, str]) -> PathogenSprea
         features=args.features,
         lstm_units=args.lstm_units,
         learning_rate=args.learning_rate,
-        dropout_rate=args.dropout_rate
+        dropout_rate=args.dropout_rate,
+        architecture=args.architecture
     )
     
     # Create model save path
@@ -205,13 +468,14 @@ def train_model(args: argparse.Namespace, dirs: Dict[str, str]) -> PathogenSprea
     logger.info(f"Saved training history to {history_json_path}")
     logger.info(f"Model trained and saved to {model_save_path}")
     
-    return model
+    return model, validation_data
 
 
 def evaluate_trained_model(
     model: PathogenSpreadModel,
     args: argparse.Namespace,
-    dirs: Dict[str, str]
+    dirs: Dict[str, str],
+    validation_data: Optional[Tuple[np.ndarray, np.ndarray]] = None
 ) -> Dict[str, Any]:
     """
     Evaluate the trained model.
@@ -220,6 +484,8 @@ def evaluate_trained_model(
         model: Trained PathogenSpreadModel
         args: Command-line arguments
         dirs: Directory paths for outputs
+        validation_data: Validation split (X_val, y_val) returned by
+            train_model; regenerated from args when not given
         
     Returns:
         Evaluation metrics
@@ -236,10 +502,24 @@ def evaluate_trained_model(
             spatial_dim=args.spatial_dim,
             time_steps=args.time_steps,
             features=args.features,
-            threat_types=threat_types
+            threat_types=threat_types,
+            workers=args.workers,
+            # Offset the seed so the evaluation set does not repeat the training samples
+            random_seed=None if args.seed is None else args.seed + 1,
+            dtype=args.dtype,
+            environment=args.environment,
+            correlation_length=args.correlation_length
         )
+    elif uses_disk_dataset(args):
+        # Read the validation split back from the training data on disk
+        dataset = load_training_dataset(args, generate=False)
+        _, val_indices = split_sharded_dataset(dataset, args.val_split)
+        X_val, y_val = dataset.get_batch(val_indices)
+    elif validation_data is not None:
+        # Use the larger validation set held out from the training data
+        X_val, y_val = validation_data
     else:
-        # Use the larger validation set from the training data
+        # Regenerate the training data; the seeded split reproduces the validation set
         _, _, X_val, y_val = generate_training_data(args)
     
     # Evaluate the model
@@ -323,14 +603,40 @@ def main():
     
     # Data parameters
     parser.add_argument("--dataset-size", type=int, default=1000, help="Number of samples to generate")
-    parser.add_argument("--spatial-dim", type=int, default=32, help="Spatial dimension of the grid")
+    parser.add_argument("--spatial-dim", type=int, default=32,
+                        help="Spatial dimension of the grid (the training patch size of the convlstm architecture)")
     parser.add_argument("--time-steps", type=int, default=7, help="Number of time steps in the input sequence")
     parser.add_argument("--features", type=int, default=5, help="Number of features per grid cell")
     parser.add_argument("--threat-types", type=str, default=None, help="Comma-separated list of threat types")
     parser.add_argument("--val-split", type=float, default=0.2, help="Validation set split ratio")
-    parser.add_argument("--save-data", action="store_true", help="Save generated training data")
+    parser.add_argument("--save-data", action="store_true",
+                        help="Save generated training data (only needed with --no-cache)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes for data generation")
+    parser.add_argument("--seed", type=int, default=None, help="Root seed for reproducible data generation")
+    parser.add_argument("--shard-dir", type=str, default=None,
+                        help="Write training data to .npy shards in this directory and stream batches from disk")
+    parser.add_argument("--shard-size", type=int, default=1000, help="Samples per shard of on-disk datasets")
+    parser.add_argument("--dtype", type=str, default=DEFAULT_DTYPE, choices=["float32", "float16"],
+                        help="Storage dtype of the generated data (float16 halves memory and shard size)")
+    parser.add_argument("--environment", type=str, default="discs", choices=list(ENVIRONMENT_MODELS),
+                        help="Environment model: random discs, or correlated Gaussian fields that drift smoothly")
+    parser.add_argument("--correlation-length", type=float, default=DEFAULT_CORRELATION_LENGTH,
+                        help="Correlation length in cells of the gaussian environment model")
+    parser.add_argument("--windows-per-sequence", type=int, default=1,
+                        help="Training samples taken from each simulation, one per sliding input window")
+    parser.add_argument("--augment", action="store_true",
+                        help="Randomly rotate and reflect training samples (with matching wind directions)")
+    parser.add_argument("--spread-behaviors", type=str, default=None,
+                        help="Calibrated spread behavior parameter file to simulate the data with")
+    parser.add_argument("--cache-dir", type=str, default=DATASET_CACHE_DIR, help="Dataset cache directory")
+    parser.add_argument("--cache-budget-gb", type=float, default=10.0,
+                        help="Size budget of the dataset cache before old datasets are evicted")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Generate the dataset in memory instead of using the dataset cache")
     
     # Model parameters
+    parser.add_argument("--architecture", type=str, default="cnn_lstm", choices=list(ARCHITECTURES),
+                        help="Model architecture: fixed-grid CNN-LSTM, or fully convolutional ConvLSTM for any grid size")
     parser.add_argument("--lstm-units", type=int, default=64, help="Number of LSTM units")
     parser.add_argument("--dropout-rate", type=float, default=0.2, help="Dropout rate")
     
@@ -351,6 +657,15 @@ def main():
     # Parse arguments
     args = parser.parse_args()
     
+    if args.spread_behaviors:
+        load_spread_behaviors(args.spread_behaviors)
+    
+    # Cached datasets are keyed by their seed, so pick one for unseeded runs
+    # (it is saved with the training configuration)
+    if uses_disk_dataset(args) and args.seed is None:
+        args.seed = np.random.SeedSequence().entropy
+        logger.info(f"No --seed given, generating data with seed {args.seed}")
+    
     # Set up directories
     dirs = setup_training_dirs(args.output_dir)
     
@@ -359,280 +674,19 @@ def main():
     
     try:
         # Train the model
-        model = train_model(args, dirs)
+        model, validation_data = train_model(args, dirs)
         
         # Evaluate the model
-        metrics = evaluate_trained_model(model, args, dirs)
+        metrics = evaluate_trained_model(model, args, dirs, validation_data)
         
         logger.info(f"Training and evaluation completed successfully!")
         logger.info(f"Model saved to {os.path.join(dirs['models'], 'spread_model.h5')}")
-        logger.info(f"All outputs saved to {dirs['run']
-
-import os
-import argparse
-import numpy as np
-import tensorflow as tf
-import matplotlib.pyplot as plt
-import json
-import logging
-from datetime import datetime
-from typing import Tuple, Dict, Any, Optional
-
-from src.models.spread_prediction import PathogenSpreadModel
-from src.models.data_generator import generate_synthetic_dataset
-from src.models.evaluation import evaluate_model, plot_evaluation_metrics
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-)
-logger = logging.getLogger(__name__)
-
-def train_model(
-    spatial_dim: int = 32,
-    time_steps: int = 7,
-    features: int = 5,
-    lstm_units: int = 64,
-    learning_rate: float = 0.001,
-    batch_size: int = 16,
-    epochs: int = 50,
-    patience: int = 5,
-    dataset_size: int = 1000,
-    val_split: float = 0.2,
-    model_dir: str = './models',
-    plot_dir: str = './plots',
-    threat_types: Optional[list] = None
-) -> Tuple[PathogenSpreadModel, Dict[str, Any]]:
-    """
-    Train a pathogen spread prediction model.
-    
-    Args:
-        spatial_dim: Spatial dimension for the grid (square)
-        time_steps: Number of time steps to consider for prediction
-        features: Number of features per grid cell
-        lstm_units: Number of LSTM units
-        learning_rate: Learning rate for Adam optimizer
-        batch_size: Batch size for training
-        epochs: Number of training epochs
-        patience: Patience for early stopping
-        dataset_size: Number of samples to generate
-        val_split: Validation split ratio
-        model_dir: Directory to save the model
-        plot_dir: Directory to save the plots
-        threat_types: List of threat types to generate data for
-        
-    Returns:
-        Tuple of (trained model, evaluation metrics)
-    """
-    # Create directories if they don't exist
-    os.makedirs(model_dir, exist_ok=True)
-    os.makedirs(plot_dir, exist_ok=True)
-    
-    logger.info(f"Generating synthetic dataset with {dataset_size} samples")
-    
-    # Generate synthetic dataset
-    if threat_types is None:
-        threat_types = ['FUNGAL', 'BACTERIAL', 'VIRAL', 'PEST']
+        logger.info(f"All outputs saved to {dirs['run']}")
         
-    X, y = generate_synthetic_dataset(
-        dataset_size=dataset_size,
-        spatial_dim=spatial_dim,
-        time_steps=time_steps,
-        features=features,
-        threat_types=threat_types
-    )
-    
-    # Split into training and validation sets
-    split_idx = int(len(X) * (1 - val_split))
-    X_train, X_val = X[:split_idx], X[split_idx:]
-    y_train, y_val = y[:split_idx], y[split_idx:]
-    
-    logger.info(f"Training set: {X_train.shape}, Validation set: {X_val.shape}")
-    
-    # Initialize the model
-    model = PathogenSpreadModel(
-        spatial_dim=spatial_dim,
-        time_steps=time_steps,
-        features=features,
-        lstm_units=lstm_units,
-        learning_rate=learning_rate
-    )
-    
-    # Generate a timestamp for model versioning
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    model_name = f"spread_model_{timestamp}"
-    
-    # Train the model
-    model_path = os.path.join(model_dir, f"{model_name}.h5")
-    
-    logger.info(f"Starting model training for {epochs} epochs")
-    history = model.train(
-        X_train=X_train,
-        y_train=y_train,
-        X_val=X_val,
-        y_val=y_val,
-        epochs=epochs,
-        batch_size=batch_size,
-        patience=patience,
-        save_path=model_path
-    )
-    
-    # Plot training history
-    plt.figure(figsize=(12, 4))
-    
-    plt.subplot(1, 2, 1)
-    plt.plot(history['loss'], label='Train Loss')
-    plt.plot(history['val_loss'], label='Val Loss')
-    plt.title('Loss During Training')
-    plt.xlabel('Epoch')
-    plt.ylabel('Loss')
-    plt.legend()
-    
-    plt.subplot(1, 2, 2)
-    plt.plot(history['mae'], label='Train MAE')
-    plt.plot(history['val_mae'], label='Val MAE')
-    plt.title('Mean Absolute Error During Training')
-    plt.xlabel('Epoch')
-    plt.ylabel('MAE')
-    plt.legend()
-    
-    history_plot_path = os.path.join(plot_dir, f"{model_name}_history.png")
-    plt.tight_layout()
-    plt.savefig(history_plot_path)
-    plt.close()
-    
-    logger.info(f"Training history plot saved to {history_plot_path}")
-    
-    # Evaluate the model
-    logger.info("Evaluating model performance")
-    eval_metrics = evaluate_model(model, X_val, y_val)
-    
-    # Plot evaluation metrics
-    eval_plot_path = os.path.join(plot_dir, f"{model_name}_evaluation.png")
-    plot_evaluation_metrics(eval_metrics, eval_plot_path)
-    
-    # Save evaluation metrics
-    metrics_path = os.path.join(model_dir, f"{model_name}_metrics.json")
-    with open(metrics_path, 'w') as f:
-        json.dump(eval_metrics, f, indent=4)
-    
-    logger.info(f"Model trained and saved to {model_path}")
-    logger.info(f"Evaluation metrics saved to {metrics_path}")
-    
-    return model, eval_metrics
-
-
-def generate_example_prediction(
-    model: PathogenSpreadModel,
-    initial_state: Optional[np.ndarray] = None,
-    time_steps: int = 7,
-    plot_dir: str = './plots'
-) -> None:
-    """
-    Generate an example prediction and visualize it.
-    
-    Args:
-        model: Trained PathogenSpreadModel
-        initial_state: Initial state (if None, a random state will be generated)
-        time_steps: Number of time steps to predict forward
-        plot_dir: Directory to save the plots
-    """
-    # Generate a random initial state if none provided
-    if initial_state is None:
-        from src.models.data_generator import generate_initial_state
-        initial_state = generate_initial_state(
-            spatial_dim=model.spatial_dim,
-            features=model.features,
-            concentration=0.8,
-            random_seed=42
-        )
-    
-    # Make predictions
-    predictions = model.predict_spread(
-        initial_state=initial_state,
-        time_steps=time_steps
-    )
-    
-    # Generate a timestamp for file naming
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    
-    # Generate and save heatmap
-    heatmap = model.generate_probability_heatmap(predictions)
-    heatmap_path = os.path.join(plot_dir, f"heatmap_{timestamp}.png")
-    model.plot_heatmap(heatmap, save_path=heatmap_path)
-    
-    # Plot the sequence of predictions
-    plt.figure(figsize=(15, 8))
-    
-    # Plot the initial state
-    plt.subplot(2, 4, 1)
-    plt.imshow(initial_state[:, :, 0], cmap='viridis')
-    plt.title("Initial State")
-    plt.colorbar()
-    
-    # Plot predictions at different time steps
-    for i in range(min(6, time_steps)):
-        plt.subplot(2, 4, i + 2)
-        plt.imshow(predictions[i, :, :, 0], cmap='viridis')
-        plt.title(f"t+{i+1}")
-        plt.colorbar()
-    
-    # Save the sequence plot
-    sequence_path = os.path.join(plot_dir, f"sequence_{timestamp}.png")
-    plt.tight_layout()
-    plt.savefig(sequence_path)
-    plt.close()
-    
-    logger.info(f"Example prediction sequence saved to {sequence_path}")
-    logger.info(f"Probability heatmap saved to {heatmap_path}")
-
-
-def main():
-    """Command line interface for training a model."""
-    parser = argparse.ArgumentParser(description='Train a pathogen spread prediction model')
-    
-    parser.add_argument('--spatial-dim', type=int, default=32, help='Spatial dimension for the grid')
-    parser.add_argument('--time-steps', type=int, default=7, help='Number of time steps to consider')
-    parser.add_argument('--features', type=int, default=5, help='Number of features per grid cell')
-    parser.add_argument('--lstm-units', type=int, default=64, help='Number of LSTM units')
-    parser.add_argument('--learning-rate', type=float, default=0.001, help='Learning rate')
-    parser.add_argument('--batch-size', type=int, default=16, help='Batch size for training')
-    parser.add_argument('--epochs', type=int, default=50, help='Number of training epochs')
-    parser.add_argument('--patience', type=int, default=5, help='Patience for early stopping')
-    parser.add_argument('--dataset-size', type=int, default=1000, help='Number of samples to generate')
-    parser.add_argument('--val-split', type=float, default=0.2, help='Validation split ratio')
-    parser.add_argument('--model-dir', type=str, default='./models', help='Directory to save the model')
-    parser.add_argument('--plot-dir', type=str, default='./plots', help='Directory to save the plots')
-    
-    args = parser.parse_args()
-    
-    # Train the model
-    model, metrics = train_model(
-        spatial_dim=args.spatial_dim,
-        time_steps=args.time_steps,
-        features=args.features,
-        lstm_units=args.lstm_units,
-        learning_rate=args.learning_rate,
-        batch_size=args.batch_size,
-        epochs=args.epochs,
-        patience=args.patience,
-        dataset_size=args.dataset_size,
-        val_split=args.val_split,
-        model_dir=args.model_dir,
-        plot_dir=args.plot_dir
-    )
-    
-    # Generate example prediction
-    generate_example_prediction(
-        model=model,
-        time_steps=10,
-        plot_dir=args.plot_dir
-    )
-    
-    logger.info("Training and evaluation complete!")
+    except Exception as e:
+        logger.error(f"Error during training: {str(e)}")
+        raise
 
 
 if __name__ == "__main__":
     main()
-
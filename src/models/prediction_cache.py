@@ -0,0 +1,299 @@
+"""
+Cache of spread predictions keyed by input state and model version.
+
+Dashboards, the predictions endpoint and worker re-runs often ask for the
+rollout of a threat state that has not changed. The cache keeps recent
+rollouts in an in-process LRU bounded by size, optionally backed by a shared
+Redis tier, so repeated requests skip the autoregressive rollout.
+"""
+
+import hashlib
+import io
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Default size bound of the in-process tier
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+
+# Default lifetime in seconds of entries in the Redis tier
+DEFAULT_REDIS_TTL = 24 * 60 * 60
+
+# Prefix of the cache keys, which namespaces them in a shared Redis
+DEFAULT_KEY_PREFIX = 'spread_prediction'
+
+
+def hash_array(array: np.ndarray) -> str:
+    """
+    Fingerprint an array by its dtype, shape and bytes.
+    
+    BLAKE2b is one of the fastest hashes in the standard library, and the
+    dtype and shape are included so reshaped or reinterpreted buffers with
+    the same bytes get different keys.
+    
+    Args:
+        array: Array to fingerprint
+    
+    Returns:
+        Hex digest of the array
+    """
+    array = np.ascontiguousarray(array)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{array.dtype.str}{array.shape}".encode())
+    digest.update(memoryview(array).cast('B'))
+    return digest.hexdigest()
+
+
+class PredictionCache:
+    """
+    Two-tier cache of spread rollouts.
+    
+    The in-process tier is an LRU evicting the least recently used entries
+    once their total size exceeds max_bytes. The optional Redis tier is shared
+    between processes; its entries expire after redis_ttl seconds and Redis'
+    own maxmemory policy bounds its size. Redis hits are copied into the
+    in-process tier.
+    
+    Keys include the model version, so predictions of a swapped model are
+    never served. A cache serves one model at a time: the first lookup with a
+    new model version drops the in-process entries of the old one, while its
+    Redis entries are left to expire.
+    """
+    
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_CACHE_BYTES,
+        redis_client: Optional[Any] = None,
+        redis_ttl: Optional[int] = DEFAULT_REDIS_TTL,
+        key_prefix: str = DEFAULT_KEY_PREFIX
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            max_bytes: Size bound of the in-process tier in bytes
+            redis_client: Optional redis.Redis client of the shared tier,
+                created without decode_responses as entries are binary
+            redis_ttl: Lifetime of Redis entries in seconds, None to keep them
+            key_prefix: Prefix of the cache keys
+        """
+        self.max_bytes = max_bytes
+        self.redis_client = redis_client
+        self.redis_ttl = redis_ttl
+        self.key_prefix = key_prefix
+        
+        self._entries: 'OrderedDict[str, np.ndarray]' = OrderedDict()
+        self._bytes = 0
+        self._model_version = None
+        # The API and worker threads may share a cache
+        self._lock = threading.Lock()
+        
+        self.hits = 0
+        self.misses = 0
+        self.redis_hits = 0
+        self.evictions = 0
+        self.invalidations = 0
+    
+    def make_key(
+        self,
+        model_version: str,
+        initial_state: np.ndarray,
+        time_steps: int,
+        weather_sequence: Optional[np.ndarray] = None
+    ) -> str:
+        """
+        Build the cache key of a rollout.
+        
+        Args:
+            model_version: Version of the model predicting the rollout
+            initial_state: Initial state (H, W, features), in the dtype the
+                model is fed so equal inputs of other dtypes share a key
+            time_steps: Prediction horizon
+            weather_sequence: Optional weather sequence of the rollout
+        
+        Returns:
+            Cache key
+        """
+        weather_hash = 'none' if weather_sequence is None else hash_array(weather_sequence)
+        return f"{self.key_prefix}:{model_version}:{time_steps}:{hash_array(initial_state)}:{weather_hash}"
+    
+    def get(self, key: str, model_version: str) -> Optional[np.ndarray]:
+        """
+        Look up a rollout.
+        
+        Args:
+            key: Cache key from make_key
+            model_version: Version of the model the caller predicts with
+        
+        Returns:
+            The cached read-only rollout, or None on a miss
+        """
+        with self._lock:
+            self._check_version(model_version)
+            
+            predictions = self._entries.get(key)
+            if predictions is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return predictions
+        
+        predictions = self._redis_get(key)
+        
+        with self._lock:
+            if predictions is None:
+                self.misses += 1
+                return None
+            
+            self.hits += 1
+            self.redis_hits += 1
+            self._store(key, predictions)
+            return predictions
+    
+    def put(self, key: str, model_version: str, predictions: np.ndarray) -> None:
+        """
+        Store a rollout in both tiers.
+        
+        Args:
+            key: Cache key from make_key
+            model_version: Version of the model that predicted the rollout
+            predictions: Rollout (time_steps, H, W, features)
+        """
+        predictions = np.array(predictions)
+        predictions.flags.writeable = False
+        
+        with self._lock:
+            self._check_version(model_version)
+            self._store(key, predictions)
+        
+        self._redis_set(key, predictions)
+    
+    def clear(self) -> None:
+        """
+        Drop every in-process entry; Redis entries are left to expire.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the cache counters.
+        
+        Returns:
+            Dictionary with hits, misses, redis_hits, hit_rate, evictions,
+            invalidations, the current entries and bytes of the in-process
+            tier, and the model version it holds
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'redis_hits': self.redis_hits,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'model_version': self._model_version
+            }
+    
+    def _check_version(self, model_version: str) -> None:
+        """
+        Drop the in-process entries of a previous model version; call with the lock held.
+        
+        Args:
+            model_version: Version of the model the caller predicts with
+        """
+        if model_version == self._model_version:
+            return
+        
+        if self._model_version is not None:
+            logger.info(f"Model changed from {self._model_version} to {model_version}, "
+                        f"dropping {len(self._entries)} cached predictions")
+            self.invalidations += 1
+        
+        self._entries.clear()
+        self._bytes = 0
+        self._model_version = model_version
+    
+    def _store(self, key: str, predictions: np.ndarray) -> None:
+        """
+        Add an entry to the in-process tier and evict down to max_bytes; call with the lock held.
+        
+        Args:
+            key: Cache key
+            predictions: Read-only rollout
+        """
+        if predictions.nbytes > self.max_bytes:
+            return
+        
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous.nbytes
+        
+        self._entries[key] = predictions
+        self._bytes += predictions.nbytes
+        
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.nbytes
+            self.evictions += 1
+    
+    def _redis_get(self, key: str) -> Optional[np.ndarray]:
+        """
+        Look up a rollout in the Redis tier.
+        
+        Redis errors are logged and treated as misses, so an unavailable
+        Redis only costs the rollout.
+        
+        Args:
+            key: Cache key
+        
+        Returns:
+            The read-only rollout, or None if Redis is not used or has no entry
+        """
+        if self.redis_client is None:
+            return None
+        
+        try:
+            data = self.redis_client.get(key)
+        except Exception as e:
+            logger.warning(f"Redis prediction cache lookup failed: {str(e)}")
+            return None
+        
+        if data is None:
+            return None
+        
+        predictions = np.load(io.BytesIO(data), allow_pickle=False)
+        predictions.flags.writeable = False
+        return predictions
+    
+    def _redis_set(self, key: str, predictions: np.ndarray) -> None:
+        """
+        Store a rollout in the Redis tier.
+        
+        Args:
+            key: Cache key
+            predictions: Rollout
+        """
+        if self.redis_client is None:
+            return
+        
+        buffer = io.BytesIO()
+        np.save(buffer, predictions, allow_pickle=False)
+        
+        try:
+            self.redis_client.set(key, buffer.getvalue(), ex=self.redis_ttl)
+        except Exception as e:
+            logger.warning(f"Redis prediction cache store failed: {str(e)}")
@@ -1,7 +1,7 @@
 import numpy as np
 import tensorflow as tf
 from tensorflow.keras.models import Sequential, load_model, Model
-from tensorflow.keras.layers import LSTM, Dense, Input, Dropout, Conv2D, MaxPooling2D, Flatten, Reshape, TimeDistributed
+from tensorflow.keras.layers import LSTM, ConvLSTM2D, Dense, Input, Dropout, Conv2D, MaxPooling2D, Flatten, Reshape, TimeDistributed
 from tensorflow.keras.callbacks import EarlyStopping, ModelCheckpoint
 from tensorflow.keras.optimizers import Adam
 import matplotlib.pyplot as plt
@@ -9,8 +9,12 @@ import h5py
 import os
 import pickle
 import json
+import hashlib
 import logging
-from typing import Tuple, List, Dict, Any, Optional
+from typing import Tuple, List, Dict, Any, Optional, Union
+
+from src.models.inference_backends import FunctionRunner, InferenceRunner
+from src.models.prediction_cache import PredictionCache
 
 # Configure logging
 logging.basicConfig(
@@ -19,71 +23,84 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-class PathogenSpreadModel:
-    """
-    LSTM-based model for predicting pathogen spread patterns over time and space.
+# dtype the model is fed at inference time; float16 or float64 inputs are cast
+# once here instead of inside every Keras call
+INPUT_DTYPE = np.float32
+
+# Largest batch passed to the compiled inference function at once
+INFERENCE_BATCH_SIZE = 32
+
+# Model architectures: a CNN encoder, LSTMs and a dense head predicting a
+# fixed grid, or a fully convolutional ConvLSTM network that runs on any grid
+ARCHITECTURES = ('cnn_lstm', 'convlstm')
+
+# Recurrent layers the unrolled inference paths support
+RECURRENT_LAYERS = (LSTM, ConvLSTM2D)
+
+def _input_projection(layer: Union[LSTM, ConvLSTM2D], inputs: tf.Tensor) -> tf.Tensor:
     """
+    Apply the input kernel and bias of a recurrent layer to one time step.
     
-    def __init__(
-        self,
-        spatial_dim: int = 32,
-        time_steps: int = 7,
-        features: int = 5,
-        lstm_units: int = 64,
-        learning_rate: float = 0.001,
-        dropout_rate: float = 0.2,
-        model_path: Optional[str] = None
-    ):
-        """
-        Initialize the model.
-        
-        Args:
-            spatial_dim: Spatial dimension for the grid (square)
-            time_steps: Number of time steps to consider for prediction
-            features: Number of features per grid cell
-            lstm_units: Number of LSTM units
-            learning_rate: Learning rate for Adam optimizer
-            dropout_rate: Dropout rate for regularization
-            model_path: Path to a saved model to load
-        """
-        self.spatial_dim = spatial_dim
-        self.time_steps = time_steps
-        self.features = features
-        self.lstm_units = lstm_units
-        self.learning_rate = learning_rate
-        self.dropout_rate = dropout_rate
+    Args:
+        layer: LSTM or ConvLSTM2D layer
+        inputs: Inputs (batch, input_dim), or (batch, H, W, channels) for ConvLSTM2D
         
-        # Initialize model
-        if model_path and os.path.exists(model_path):
-            logger.info(f"Loading model from {model_path}")
-            self.model = load_model(model_path)
-        else:
-            logger.info("Creating new pathogen
+    Returns:
+        Gate pre-activations (batch, 4 * units), or (batch, H, W, 4 * filters)
+    """
+    cell = layer.cell
+    if isinstance(layer, ConvLSTM2D):
+        z = tf.nn.convolution(inputs, cell.kernel, strides=cell.strides, padding=cell.padding.upper(),
+                              dilations=cell.dilation_rate)
+    else:
+        z = tf.matmul(inputs, cell.kernel)
+    return z + cell.bias if cell.use_bias else z
 
-import numpy as np
-import tensorflow as tf
-from tensorflow.keras.models import Sequential, load_model, Model
-from tensorflow.keras.layers import LSTM, Dense, Input, Dropout, Conv2D, MaxPooling2D, Flatten, Reshape, TimeDistributed
-from tensorflow.keras.callbacks import EarlyStopping, ModelCheckpoint
-from tensorflow.keras.optimizers import Adam
-import matplotlib.pyplot as plt
-import h5py
-import os
-import pickle
-import json
-import logging
-from typing import Tuple, List, Dict, Any, Optional
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
-logger = logging.getLogger(__name__)
+def _unrolled_lstm(layer: Union[LSTM, ConvLSTM2D], inputs: tf.Tensor, projected: bool = False) -> tf.Tensor:
+    """
+    Run a Keras LSTM or ConvLSTM2D layer from a zero state with its time loop unrolled.
+    
+    Args:
+        layer: LSTM or ConvLSTM2D layer whose weights and activations are used
+        inputs: Input sequence (batch, time, ...), or its input projections
+            (see _input_projection) when projected is set
+        projected: Whether inputs already include the kernel and bias
+        
+    Returns:
+        Output sequence (batch, time, ...) if the layer returns sequences,
+        otherwise the last output
+    """
+    cell = layer.cell
+    h = c = None
+    outputs = []
+    
+    for t in range(inputs.shape[1]):
+        z = inputs[:, t] if projected else _input_projection(layer, inputs[:, t])
+        if h is not None:
+            if isinstance(layer, ConvLSTM2D):
+                z += tf.nn.convolution(h, cell.recurrent_kernel, padding='SAME')
+            else:
+                z += tf.matmul(h, cell.recurrent_kernel)
+        
+        # Keras' (input, forget, cell, output) gate order; the zero initial
+        # state contributes nothing to the first step
+        z_i, z_f, z_c, z_o = tf.split(z, 4, axis=-1)
+        c_new = cell.recurrent_activation(z_i) * cell.activation(z_c)
+        c = c_new if c is None else cell.recurrent_activation(z_f) * c + c_new
+        h = cell.recurrent_activation(z_o) * cell.activation(c)
+        outputs.append(h)
+    
+    return tf.stack(outputs, axis=1) if layer.return_sequences else h
+
 
 class PathogenSpreadModel:
     """
     LSTM-based model for predicting pathogen spread patterns over time and space.
+    
+    The 'cnn_lstm' architecture predicts a fixed spatial_dim grid. The
+    'convlstm' architecture is fully convolutional: it is trained on
+    spatial_dim patches and predicts grids of any size.
     """
     
     def __init__(
@@ -94,26 +111,33 @@ class PathogenSpreadModel:
         lstm_units: int = 64,
         learning_rate: float = 0.001,
         dropout_rate: float = 0.2,
-        model_path: Optional[str] = None
+        model_path: Optional[str] = None,
+        architecture: str = 'cnn_lstm'
     ):
         """
         Initialize the model.
         
         Args:
-            spatial_dim: Spatial dimension for the grid (square)
+            spatial_dim: Spatial dimension for the grid (square), the
+                training patch size of the convlstm architecture
             time_steps: Number of time steps to consider for prediction
             features: Number of features per grid cell
-            lstm_units: Number of LSTM units
+            lstm_units: Number of LSTM units (ConvLSTM filters for convlstm)
             learning_rate: Learning rate for Adam optimizer
             dropout_rate: Dropout rate for regularization
             model_path: Path to a saved model to load
+            architecture: Model architecture, one of ARCHITECTURES
         """
+        if architecture not in ARCHITECTURES:
+            raise ValueError(f"Unknown architecture '{architecture}'. Expected one of {list(ARCHITECTURES)}")
+        
         self.spatial_dim = spatial_dim
         self.time_steps = time_steps
         self.features = features
         self.lstm_units = lstm_units
         self.learning_rate = learning_rate
         self.dropout_rate = dropout_rate
+        self.architecture = architecture
         
         # Initialize model
         if model_path and os.path.exists(model_path):
@@ -129,6 +153,175 @@ class PathogenSpreadModel:
             loss='mean_squared_error',
             metrics=['mae']
         )
+        
+        # Compiled inference path, traced here so the first prediction does not pay for it
+        self._inference_fn = self._build_inference_function()
+        # Backend predict and predict_spread run on
+        self.set_runner(None)
+        # Encoder and decoder of incremental rollouts, built on first use
+        self._incremental_fns = None
+        # Cache of predict_spread rollouts, off by default
+        self.cache = None
+    
+    def _build_inference_function(self) -> tf.types.experimental.GenericFunction:
+        """
+        Compile the forward pass of the model for inference.
+        
+        model.predict sets up a data adapter and callbacks on every call,
+        which dominates the cost of the small batches of a rollout. The
+        tf.function has a fixed input signature with a free batch dimension,
+        so it is traced once and then called directly on arrays.
+        
+        Keras builds ConvLSTM2D layers for a fixed grid, so the convlstm
+        architecture runs the unrolled graph of _build_export_function
+        instead, which takes any grid size.
+        
+        Returns:
+            Function mapping inputs (batch, time_steps, spatial_dim, spatial_dim,
+            features) to predictions (batch, spatial_dim, spatial_dim, features)
+        """
+        if self.architecture == 'convlstm':
+            infer = self._build_export_function()
+        else:
+            input_spec = tf.TensorSpec((None,) + self._input_shape(), tf.float32)
+            
+            @tf.function(input_signature=[input_spec])
+            def infer(inputs):
+                return self.model(inputs, training=False)
+        
+        # Warm up: trace and run the graph once
+        infer(tf.zeros((1, self.time_steps, self.spatial_dim, self.spatial_dim, self.features), tf.float32))
+        
+        return infer
+    
+    def _input_shape(self) -> Tuple[Optional[int], ...]:
+        """
+        Get the shape of one input window at inference time.
+        
+        Returns:
+            (time_steps, spatial_dim, spatial_dim, features), with free grid
+            dimensions for the convlstm architecture
+        """
+        if self.architecture == 'convlstm':
+            return (self.time_steps, None, None, self.features)
+        return tuple(self.model.input_shape[1:])
+    
+    def set_runner(self, runner: Optional[InferenceRunner] = None) -> None:
+        """
+        Choose the inference backend of predict and predict_spread.
+        
+        Args:
+            runner: Runner of an exported model (see inference_backends.load_runner),
+                or None for the compiled Keras model
+        """
+        self.runner = runner if runner is not None else FunctionRunner(self._inference_fn, INFERENCE_BATCH_SIZE)
+        self._model_version = None
+    
+    def set_cache(self, cache: Optional[PredictionCache] = None) -> None:
+        """
+        Cache the rollouts of predict_spread and predict_spread_batch.
+        
+        Args:
+            cache: Prediction cache, or None to always roll out
+        """
+        self.cache = cache
+    
+    def model_version(self) -> str:
+        """
+        Get a fingerprint of the predictions the model currently makes.
+        
+        The version hashes the architecture, shapes and weights of the model
+        together with the inference backend, and is recomputed after training
+        or a backend swap, so cached predictions of an older model never match.
+        
+        Returns:
+            Version string '<backend>-<hash>'
+        """
+        if self._model_version is None:
+            digest = hashlib.blake2b(digest_size=8)
+            digest.update(json.dumps([self.architecture, self.spatial_dim, self.time_steps, self.features]).encode())
+            for weights in self.model.get_weights():
+                digest.update(np.ascontiguousarray(weights).tobytes())
+            self._model_version = f"{self.runner.name}-{digest.hexdigest()}"
+        
+        return self._model_version
+    
+    def _build_incremental_functions(
+        self
+    ) -> Tuple[tf.types.experimental.GenericFunction, tf.types.experimental.GenericFunction]:
+        """
+        Split the forward pass into a per-frame encoder and a window decoder.
+        
+        The encoder runs the TimeDistributed layers on single frames and
+        applies the input projection of the first LSTM (or ConvLSTM2D) layer,
+        which together are nearly all of the model's work. The decoder runs
+        the recurrence of the first recurrent layer from the projected frames
+        of a window, then the remaining layers. Chaining the two gives the
+        same predictions as the full model, but each frame is only encoded
+        once in a rollout.
+        
+        Returns:
+            Tuple of (encode, decode) functions: encode maps frames (batch,
+            spatial_dim, spatial_dim, features) to projections (batch, 4 *
+            lstm_units), or (batch, spatial_dim, spatial_dim, 4 * lstm_units)
+            for convlstm, and decode maps the projections of a window (batch,
+            time_steps, ...) to predictions
+        """
+        layers = [layer for layer in self.model.layers if not isinstance(layer, Dropout)]
+        lstm_indices = [k for k, layer in enumerate(layers) if isinstance(layer, RECURRENT_LAYERS)]
+        if not lstm_indices or not all(isinstance(layer, TimeDistributed) for layer in layers[:lstm_indices[0]]):
+            raise ValueError("Incremental rollouts need a TimeDistributed encoder followed by LSTM layers")
+        
+        encoder = [layer.layer for layer in layers[:lstm_indices[0]]]
+        first_lstm, decoder = layers[lstm_indices[0]], layers[lstm_indices[0] + 1:]
+        window_length = self.time_steps
+        
+        if isinstance(first_lstm, ConvLSTM2D):
+            projection_shape = (None, None, 4 * first_lstm.cell.filters)
+        else:
+            projection_shape = (4 * first_lstm.cell.units,)
+        
+        # The LSTM layers are unrolled over the fixed window, which also keeps
+        # the graph free of the TensorList ops the TFLite converter rejects
+        
+        @tf.function(input_signature=[tf.TensorSpec((None,) + self._input_shape()[1:], tf.float32)])
+        def encode(frames):
+            x = frames
+            for layer in encoder:
+                x = layer(x, training=False)
+            return _input_projection(first_lstm, x)
+        
+        @tf.function(input_signature=[tf.TensorSpec((None, window_length) + projection_shape, tf.float32)])
+        def decode(projections):
+            x = _unrolled_lstm(first_lstm, projections, projected=True)
+            for layer in decoder:
+                x = _unrolled_lstm(layer, x) if isinstance(layer, RECURRENT_LAYERS) else layer(x, training=False)
+            return x
+        
+        return encode, decode
+    
+    def _build_export_function(self) -> tf.types.experimental.GenericFunction:
+        """
+        Build the forward pass as a graph that inference converters accept.
+        
+        Chains the functions of _build_incremental_functions over a whole
+        window, so the LSTM layers are unrolled rather than while loops.
+        
+        Returns:
+            Function mapping inputs (batch, time_steps, spatial_dim,
+            spatial_dim, features) to predictions
+        """
+        # Inlined rather than nested, so converters can freeze the captured weights
+        encode, decode = (function.python_function for function in self._build_incremental_functions())
+        input_shape = self._input_shape()
+        
+        @tf.function(input_signature=[tf.TensorSpec((None,) + input_shape, tf.float32)])
+        def forward(inputs):
+            # Dynamic shapes, as the convlstm grid size is only known at call time
+            projections = encode(tf.reshape(inputs, tf.concat([[-1], tf.shape(inputs)[2:]], axis=0)))
+            return decode(tf.reshape(projections, tf.concat([[-1, input_shape[0]], tf.shape(projections)[1:]], axis=0)))
+        
+        return forward
     
     def _build_model(self) -> Model:
         """
@@ -137,6 +330,9 @@ class PathogenSpreadModel:
         Returns:
             Compiled TensorFlow model
         """
+        if self.architecture == 'convlstm':
+            return self._build_convlstm_model()
+        
         # Input shape for sequence of spatial grids with features
         input_shape = (self.time_steps, self.spatial_dim, self.spatial_dim, self.features)
         
@@ -173,12 +369,48 @@ class PathogenSpreadModel:
         
         return model
     
+    def _build_convlstm_model(self) -> Model:
+        """
+        Build the fully convolutional ConvLSTM model architecture.
+        
+        Every layer is a convolution with 'same' padding, so no weight
+        depends on the grid size and each cell is predicted from its
+        neighbourhood. The Keras model is built for spatial_dim patches to
+        train on; inference runs the same weights on any grid (see
+        _build_inference_function).
+        
+        Returns:
+            Compiled TensorFlow model
+        """
+        input_shape = (self.time_steps, self.spatial_dim, self.spatial_dim, self.features)
+        
+        model = Sequential([
+            # Encoder: per-frame features, then the spatio-temporal recurrence
+            TimeDistributed(
+                Conv2D(32, (3, 3), activation='relu', padding='same'),
+                input_shape=input_shape
+            ),
+            ConvLSTM2D(self.lstm_units, (3, 3), padding='same', return_sequences=True),
+            Dropout(self.dropout_rate),
+            ConvLSTM2D(self.lstm_units, (3, 3), padding='same'),
+            Dropout(self.dropout_rate),
+            
+            # Decoder: per-cell prediction of the next frame
+            Conv2D(32, (3, 3), activation='relu', padding='same'),
+            Conv2D(self.features, (1, 1), activation='linear')
+        ])
+        
+        logger.info(f"ConvLSTM model architecture created with input shape {input_shape}")
+        model.summary(print_fn=logger.info)
+        
+        return model
+    
     def train(
         self,
-        X_train: np.ndarray,
-        y_train: np.ndarray,
-        X_val: np.ndarray,
-        y_val: np.ndarray,
+        X_train: Union[np.ndarray, tf.keras.utils.Sequence],
+        y_train: Optional[np.ndarray],
+        X_val: Union[np.ndarray, tf.keras.utils.Sequence],
+        y_val: Optional[np.ndarray],
         epochs: int = 50,
         batch_size: int = 16,
         patience: int = 5,
@@ -188,12 +420,14 @@ class PathogenSpreadModel:
         Train the model.
         
         Args:
-            X_train: Training input data (time_steps, spatial_dim, spatial_dim, features)
-            y_train: Training target data (spatial_dim, spatial_dim, features)
-            X_val: Validation input data
-            y_val: Validation target data
+            X_train: Training input data (time_steps, spatial_dim, spatial_dim, features),
+                or a Keras Sequence yielding (inputs, targets) batches
+            y_train: Training target data (spatial_dim, spatial_dim, features),
+                None when X_train is a Sequence
+            X_val: Validation input data, or a Keras Sequence of validation batches
+            y_val: Validation target data, None when X_val is a Sequence
             epochs: Number of training epochs
-            batch_size: Batch size for training
+            batch_size: Batch size for training (ignored for Sequence inputs)
             patience: Patience for early stopping
             save_path: Path to save the trained model
             
@@ -221,16 +455,24 @@ class PathogenSpreadModel:
             )
         
         # Train the model
-        logger.info(f"Training model with {X_train.shape[0]} samples for {epochs} epochs")
+        if isinstance(X_train, tf.keras.utils.Sequence):
+            # Batches are read lazily from the sequences
+            logger.info(f"Training model with {len(X_train)} batches per epoch for {epochs} epochs")
+            fit_data = {'x': X_train, 'validation_data': X_val}
+        else:
+            logger.info(f"Training model with {X_train.shape[0]} samples for {epochs} epochs")
+            fit_data = {'x': X_train, 'y': y_train, 'batch_size': batch_size, 'validation_data': (X_val, y_val)}
+        
         history = self.model.fit(
-            X_train, y_train,
+            **fit_data,
             epochs=epochs,
-            batch_size=batch_size,
-            validation_data=(X_val, y_val),
             callbacks=callbacks,
             verbose=2
         )
         
+        # The weights changed, so predictions cached for them are stale
+        self._model_version = None
+        
         # Save the trained model if path is provided and no ModelCheckpoint was used
         if save_path and not any(isinstance(cb, ModelCheckpoint) for cb in callbacks):
             self.save_model(save_path)
@@ -247,14 +489,16 @@ class PathogenSpreadModel:
         Returns:
             Predicted spread patterns of shape (batch_size, spatial_dim, spatial_dim, features)
         """
-        logger.info(f"Making predictions with input of shape {X.shape}")
-        return self.model.predict(X)
+        X = np.asarray(X, dtype=INPUT_DTYPE)
+        logger.debug(f"Making predictions with {self.runner.name} backend and input of shape {X.shape}")
+        return self.runner.predict(X)
     
     def predict_spread(
         self,
         initial_state: np.ndarray,
         time_steps: int,
-        weather_sequence: Optional[np.ndarray] = None
+        weather_sequence: Optional[np.ndarray] = None,
+        incremental: bool = False
     ) -> np.ndarray:
         """
         Predict the spread of a pathogen over time.
@@ -263,32 +507,150 @@ class PathogenSpreadModel:
             initial_state: Initial state of the system (spatial_dim, spatial_dim, features)
             time_steps: Number of time steps to predict forward
             weather_sequence: Optional sequence of weather conditions for each future time step
+            incremental: Encode each frame only once (see predict_spread_batch)
             
         Returns:
             Predicted spread over time (time_steps, spatial_dim, spatial_dim, features)
         """
-        # Initialize the prediction sequence with the initial state
-        current_sequence = np.zeros((1, self.time_steps, self.spatial_dim, self.spatial_dim, self.features))
-        current_sequence[0, -1] = initial_state  # Set the last time step to the initial state
+        weather_sequences = None if weather_sequence is None else np.asarray(weather_sequence)[None]
+        return self.predict_spread_batch(initial_state[None], time_steps, weather_sequences, incremental)[0]
+    
+    def predict_spread_batch(
+        self,
+        initial_states: np.ndarray,
+        time_steps: int,
+        weather_sequences: Optional[np.ndarray] = None,
+        incremental: bool = False
+    ) -> np.ndarray:
+        """
+        Predict the spread of several pathogen outbreaks over time at once.
         
-        # Generate predictions for each future time step
-        predictions = []
+        All outbreaks are rolled out together with one forward pass of the
+        model per time step, instead of one Keras call per outbreak and step.
         
-        for i in range(time_steps):
-            # Make a prediction for the next time step
-            next_step = self.model.predict(current_sequence)
-            predictions.append(next_step[0])  # Store prediction
+        In incremental mode the encodings of the frames in the input window
+        are kept in a ring buffer, so each step encodes only the newest frame
+        and reruns the cheap LSTM recurrence over the cached window (see
+        _build_incremental_functions). The predictions match the full
+        forward pass up to float rounding.
+        
+        With a cache set (see set_cache), outbreaks whose state, horizon and
+        weather were rolled out before by the same model version are served
+        from the cache, and only the others are rolled out.
+        
+        Args:
+            initial_states: Initial states (N, spatial_dim, spatial_dim, features),
+                of any grid size for the convlstm architecture
+            time_steps: Number of time steps to predict forward
+            weather_sequences: Optional weather conditions for each future time
+                step, (N, T, spatial_dim, spatial_dim, C) per outbreak or
+                (T, spatial_dim, spatial_dim, C) shared by all; they replace
+                the last C feature channels of each prediction fed back to
+                the model
+            incremental: Encode each frame only once instead of every step
             
-            # Update the sequence by shifting and adding the new prediction
-            current_sequence[0, :-1] = current_sequence[0, 1:]
-            current_sequence[0, -1] = next_step[0]
+        Returns:
+            Predicted spread over time (N, time_steps, spatial_dim, spatial_dim, features)
+        """
+        if incremental and self.runner.name != 'keras':
+            raise ValueError(f"Incremental rollouts need the Keras model, not the {self.runner.name} backend")
+        
+        initial_states = np.asarray(initial_states, dtype=INPUT_DTYPE)
+        num_states = len(initial_states)
+        
+        if weather_sequences is not None:
+            weather_sequences = np.asarray(weather_sequences, dtype=INPUT_DTYPE)
+            if weather_sequences.ndim == 4:
+                weather_sequences = np.broadcast_to(weather_sequences, (num_states,) + weather_sequences.shape)
+        
+        if self.cache is None:
+            return self._rollout(initial_states, time_steps, weather_sequences, incremental)
+        
+        version = self.model_version()
+        keys = [
+            self.cache.make_key(version, initial_states[k], time_steps,
+                                None if weather_sequences is None else weather_sequences[k])
+            for k in range(num_states)
+        ]
+        
+        predictions = np.zeros((num_states, time_steps) + initial_states.shape[1:3] + (self.features,),
+                               dtype=INPUT_DTYPE)
+        misses = []
+        for k, key in enumerate(keys):
+            cached = self.cache.get(key, version)
+            if cached is None:
+                misses.append(k)
+            else:
+                predictions[k] = cached
+        
+        if misses:
+            predictions[misses] = self._rollout(
+                initial_states[misses], time_steps,
+                None if weather_sequences is None else weather_sequences[misses], incremental
+            )
+            for k in misses:
+                self.cache.put(keys[k], version, predictions[k])
+        
+        return predictions
+    
+    def _rollout(
+        self,
+        initial_states: np.ndarray,
+        time_steps: int,
+        weather_sequences: Optional[np.ndarray],
+        incremental: bool
+    ) -> np.ndarray:
+        """
+        Roll out a batch of outbreaks without the cache (see predict_spread_batch).
+        
+        Args:
+            initial_states: Initial states (N, H, W, features)
+            time_steps: Number of time steps to predict forward
+            weather_sequences: Optional weather sequences (N, T, H, W, C)
+            incremental: Encode each frame only once instead of every step
             
-            # If weather sequence is provided, incorporate it
-            if weather_sequence is not None and i < len(weather_sequence):
+        Returns:
+            Predicted spread over time (N, time_steps, H, W, features)
+        """
+        num_states = len(initial_states)
+        frame_shape = tuple(initial_states.shape[1:3]) + (self.features,)
+        
+        # Frames fed to the model: time_steps - 1 empty frames, the initial
+        # states, then every prediction, so each step's input is a window of
+        # this buffer and nothing is shifted
+        history = np.zeros((num_states, self.time_steps + time_steps) + frame_shape, dtype=INPUT_DTYPE)
+        history[:, self.time_steps - 1] = initial_states
+        
+        # Preallocate the rollout instead of stacking per-step predictions at the end
+        predictions = np.zeros((num_states, time_steps) + frame_shape, dtype=INPUT_DTYPE)
+        
+        if incremental:
+            if self._incremental_fns is None:
+                self._incremental_fns = self._build_incremental_functions()
+            encode, decode = self._incremental_fns
+            
+            # Ring buffer of encoded frames: frame j of the history lives in slot j % self.time_steps
+            encodings = np.array(encode(history[:, :self.time_steps].reshape((-1,) + frame_shape)))
+            encodings = encodings.reshape((num_states, self.time_steps) + encodings.shape[1:])
+            window_slots = np.arange(self.time_steps)
+        
+        for i in range(time_steps):
+            if incremental:
+                predictions[:, i] = decode(encodings[:, (window_slots + i) % self.time_steps])
+            else:
+                predictions[:, i] = self.runner(history[:, i:i + self.time_steps])
+            history[:, self.time_steps + i] = predictions[:, i]
+            
+            # If weather sequences are provided, incorporate them
+            if weather_sequences is not None and i < weather_sequences.shape[1]:
                 # Assuming the last feature channels are for weather
-                current_sequence[0, -1, :, :, -weather_sequence.shape[-1]:] = weather_sequence[i]
+                history[:, self.time_steps + i, :, :, -weather_sequences.shape[-1]:] = weather_sequences[:, i]
+            
+            if incremental and i + 1 < time_steps:
+                # The new frame replaces the oldest frame of the window
+                encodings[:, i % self.time_steps] = encode(history[:, self.time_steps + i])
         
-        return np.array(predictions)
+        return predictions
     
     def generate_probability_heatmap(
         self,
@@ -364,7 +726,8 @@ class PathogenSpreadModel:
             'features': self.features,
             'lstm_units': self.lstm_units,
             'learning_rate': self.learning_rate,
-            'dropout_rate': self.dropout_rate
+            'dropout_rate': self.dropout_rate,
+            'architecture': self.architecture
         }
         
         metadata_path = os.path.join(os.path.dirname(save_path), 
@@ -402,7 +765,8 @@ class PathogenSpreadModel:
                 lstm_units=metadata['lstm_units'],
                 learning_rate=metadata['learning_rate'],
                 dropout_rate=metadata['dropout_rate'],
-                model_path=model_path
+                model_path=model_path,
+                architecture=metadata.get('architecture', 'cnn_lstm')
             )
         else:
             # Create with default parameters
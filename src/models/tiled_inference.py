@@ -0,0 +1,211 @@
+"""
+Sliding-window predictions over fields larger than the model grid.
+
+Cuts a large input window into overlapping tiles of the model's grid size,
+predicts them in batches and blends the tile predictions with a window that
+fades out towards the tile edges, so the seams between tiles do not show.
+Tiles are read from and accumulated into memory-mapped arrays, so memory use
+is bounded by one batch of tiles whatever the field size.
+"""
+
+import logging
+import os
+from typing import Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from src.models.spread_prediction import INPUT_DTYPE
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+# Default number of cells neighbouring tiles share along each axis
+DEFAULT_OVERLAP = 8
+
+# Default number of tiles predicted together
+DEFAULT_TILE_BATCH_SIZE = 256
+
+
+def tile_offsets(length: int, tile_size: int, overlap: int) -> List[int]:
+    """
+    Get the start offsets of overlapping tiles covering an axis.
+    
+    Tiles advance by tile_size - overlap cells; the last tile is aligned with
+    the end of the axis, so it may overlap its neighbour by more. An axis
+    shorter than a tile is covered by one tile at offset 0.
+    
+    Args:
+        length: Length of the axis in cells
+        tile_size: Tile length in cells
+        overlap: Minimum number of cells neighbouring tiles share
+    
+    Returns:
+        Sorted tile offsets
+    """
+    if not 0 <= overlap < tile_size:
+        raise ValueError(f"Tile overlap must be in [0, {tile_size}), got {overlap}")
+    
+    offsets = list(range(0, max(length - tile_size, 0) + 1, tile_size - overlap))
+    if offsets[-1] + tile_size < length:
+        offsets.append(length - tile_size)
+    
+    return offsets
+
+
+def blending_window(tile_size: int, overlap: int) -> np.ndarray:
+    """
+    Get the 1D blending weights of a tile.
+    
+    Weights ramp linearly up over the first overlap cells, stay 1 in the
+    interior and ramp down over the last overlap cells. They never reach
+    0, so the edges of the field, which only one tile covers, keep their
+    predictions. The 2D window of a tile is the outer product of two of
+    these.
+    
+    Args:
+        tile_size: Tile length in cells
+        overlap: Number of cells of each ramp
+    
+    Returns:
+        Weights (tile_size,)
+    """
+    cells = np.arange(tile_size)
+    ramp = np.minimum(cells + 1, tile_size - cells) / (overlap + 1)
+    return np.minimum(ramp, 1).astype(np.float32)
+
+
+def _blending_normalizer(length: int, offsets: List[int], window: np.ndarray) -> np.ndarray:
+    """
+    Get the sum of the blending weights of all tiles covering each cell of an axis.
+    
+    Tiles form a grid and their windows are separable, so the 2D sum of
+    weights is the outer product of the per-axis sums.
+    
+    Args:
+        length: Length of the axis in cells
+        offsets: Tile offsets along the axis
+        window: 1D blending weights of a tile
+    
+    Returns:
+        Weight sums (length,)
+    """
+    normalizer = np.zeros(length, dtype=np.float32)
+    for offset in offsets:
+        stop = min(offset + len(window), length)
+        normalizer[offset:stop] += window[:stop - offset]
+    return normalizer
+
+
+def _iter_tile_batches(
+    tiles: List[Tuple[int, int]],
+    batch_size: int
+) -> Iterator[List[Tuple[int, int]]]:
+    """
+    Split tile positions into batches.
+    
+    Args:
+        tiles: (row, column) offsets of the tiles
+        batch_size: Maximum number of tiles per batch
+    
+    Yields:
+        Lists of tile offsets
+    """
+    for start in range(0, len(tiles), batch_size):
+        yield tiles[start:start + batch_size]
+
+
+def predict_tiled(
+    model,
+    X: Union[np.ndarray, str],
+    output_path: Optional[str] = None,
+    overlap: int = DEFAULT_OVERLAP,
+    batch_size: int = DEFAULT_TILE_BATCH_SIZE,
+    tile_size: Optional[int] = None
+) -> np.ndarray:
+    """
+    Predict the next frame of a field of any size with overlapping tiles.
+    
+    Tile batches are gathered from X, predicted with model.predict and added,
+    weighted by their blending windows, into the output array. The weighted
+    sum is normalized at the end, one band of rows at a time. When X is a
+    memory-mapped array or .npy path and output_path is set, only one batch
+    of tiles and one band of rows are held in memory.
+    
+    Fields smaller than a tile along an axis are zero-padded, as empty cells.
+    
+    Args:
+        model: PathogenSpreadModel to predict with
+        X: Input window (time_steps, H, W, features), or the path of a .npy
+            file holding one, which is memory-mapped
+        output_path: Path of the .npy file the prediction is written to
+            through a memory map; None keeps the prediction in memory
+        overlap: Minimum number of cells neighbouring tiles share
+        batch_size: Number of tiles passed to model.predict at once
+        tile_size: Tile size in cells; defaults to the model's spatial_dim,
+            which is the only size the cnn_lstm architecture accepts
+    
+    Returns:
+        Prediction (H, W, features) as float32, memory-mapped if output_path is set
+    """
+    if isinstance(X, str):
+        X = np.load(X, mmap_mode='r')
+    
+    if X.ndim != 4 or X.shape[0] != model.time_steps or X.shape[-1] != model.features:
+        raise ValueError(f"Expected an input window of shape ({model.time_steps}, H, W, {model.features}), "
+                         f"got {X.shape}")
+    
+    if tile_size is None:
+        tile_size = model.spatial_dim
+    elif tile_size != model.spatial_dim and model.architecture != 'convlstm':
+        raise ValueError(f"The {model.architecture} architecture only predicts tiles of size {model.spatial_dim}")
+    
+    _, height, width, features = X.shape
+    row_offsets = tile_offsets(height, tile_size, overlap)
+    column_offsets = tile_offsets(width, tile_size, overlap)
+    tiles = [(row, column) for row in row_offsets for column in column_offsets]
+    
+    window = blending_window(tile_size, overlap)
+    tile_weights = np.outer(window, window)[..., None]
+    
+    if output_path is not None:
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        output = np.lib.format.open_memmap(output_path, mode='w+', dtype=np.float32,
+                                           shape=(height, width, features))
+    else:
+        output = np.zeros((height, width, features), dtype=np.float32)
+    
+    logger.info(f"Predicting a {height}x{width} field with {len(tiles)} tiles of size {tile_size}")
+    
+    batch = np.zeros((min(batch_size, len(tiles)), model.time_steps, tile_size, tile_size, features),
+                     dtype=INPUT_DTYPE)
+    
+    for tile_batch in _iter_tile_batches(tiles, batch_size):
+        for k, (row, column) in enumerate(tile_batch):
+            tile = X[:, row:row + tile_size, column:column + tile_size]
+            if tile.shape[1:3] != (tile_size, tile_size):
+                batch[k] = 0
+            batch[k, :, :tile.shape[1], :tile.shape[2]] = tile
+        
+        predictions = model.predict(batch[:len(tile_batch)])
+        
+        for (row, column), prediction in zip(tile_batch, predictions):
+            rows, columns = min(tile_size, height - row), min(tile_size, width - column)
+            output[row:row + rows, column:column + columns] += (prediction * tile_weights)[:rows, :columns]
+    
+    # Normalize by the summed weights in bands of rows, to bound the memory of a memory-mapped output
+    row_normalizer = _blending_normalizer(height, row_offsets, window)
+    column_normalizer = _blending_normalizer(width, column_offsets, window)
+    
+    for start in range(0, height, tile_size):
+        stop = min(start + tile_size, height)
+        output[start:stop] /= np.outer(row_normalizer[start:stop], column_normalizer)[..., None]
+    
+    if output_path is not None:
+        output.flush()
+        logger.info(f"Tiled prediction written to {output_path}")
+    
+    return output
@@ -130,6 +130,255 @@ class TestMachineLearningModels:
         assert np.all(heatmap >= 0)  # Probabilities should be non-negative
         assert np.all(heatmap <= 1)  # Probabilities should be normalized
     
+    def test_compiled_inference_matches_keras_predict(self, trained_test_model):
+        """Test that the compiled inference path gives the same predictions as model.predict."""
+        from src.models.spread_prediction import INFERENCE_BATCH_SIZE
+        
+        model = trained_test_model
+        X, _ = generate_synthetic_dataset(
+            dataset_size=INFERENCE_BATCH_SIZE + 5, spatial_dim=model.spatial_dim,
+            time_steps=model.time_steps, features=model.features, random_seed=3
+        )
+        
+        np.testing.assert_allclose(model.predict(X), model.model.predict(X, verbose=0), rtol=1e-5, atol=1e-6)
+        assert model.predict(X[:0]).shape == (0, model.spatial_dim, model.spatial_dim, model.features)
+    
+    def test_batched_spread_prediction(self, trained_test_model):
+        """Test that a batched rollout matches rolling out each outbreak on its own."""
+        from src.models.inference_backends import FunctionRunner
+        
+        model = trained_test_model
+        initial_states = np.stack([
+            generate_initial_state(spatial_dim=model.spatial_dim, features=model.features, random_seed=seed)
+            for seed in range(3)
+        ])
+        weather = np.random.default_rng(0).random((3, 2, model.spatial_dim, model.spatial_dim, 2))
+        
+        # One forward pass per step for the whole batch
+        calls = []
+        
+        def counting_inference(inputs):
+            calls.append(inputs.shape)
+            return model._inference_fn(inputs)
+        
+        model.set_runner(FunctionRunner(counting_inference))
+        try:
+            predictions = model.predict_spread_batch(initial_states, time_steps=4, weather_sequences=weather)
+        finally:
+            model.set_runner(None)
+        
+        assert predictions.shape == (3, 4, model.spatial_dim, model.spatial_dim, model.features)
+        assert calls == [(3, model.time_steps, model.spatial_dim, model.spatial_dim, model.features)] * 4
+        
+        for k in range(3):
+            np.testing.assert_allclose(
+                predictions[k], model.predict_spread(initial_states[k], 4, weather[k]), rtol=1e-5, atol=1e-6
+            )
+        
+        # A shared weather sequence applies to every outbreak
+        shared = model.predict_spread_batch(initial_states, time_steps=4, weather_sequences=weather[0])
+        np.testing.assert_allclose(shared[0], predictions[0], rtol=1e-5, atol=1e-6)
+    
+    def test_incremental_spread_prediction(self, trained_test_model):
+        """Test that incremental rollouts match rolling out the full model every step."""
+        model = trained_test_model
+        initial_states = np.stack([
+            generate_initial_state(spatial_dim=model.spatial_dim, features=model.features, random_seed=seed)
+            for seed in range(2)
+        ])
+        weather = np.random.default_rng(1).random((2, 3, model.spatial_dim, model.spatial_dim, 2))
+        
+        full = model.predict_spread_batch(initial_states, time_steps=6, weather_sequences=weather)
+        incremental = model.predict_spread_batch(initial_states, time_steps=6, weather_sequences=weather,
+                                                 incremental=True)
+        np.testing.assert_allclose(incremental, full, rtol=1e-4, atol=1e-6)
+        
+        np.testing.assert_allclose(
+            model.predict_spread(initial_states[0], 6, weather[0], incremental=True), full[0], rtol=1e-4, atol=1e-6
+        )
+    
+    def test_tflite_backends(self, trained_test_model, temp_model_dir):
+        """Test exporting the model to TFLite and predicting through the runner interface."""
+        from src.models.inference_backends import backend_report, export_model, load_runner
+        
+        model = trained_test_model
+        backends = ('tflite', 'tflite_float16', 'tflite_int8')
+        manifest = export_model(model, temp_model_dir, backends, calibration_samples=8)
+        assert set(manifest['backends']) == set(backends)
+        
+        X, y = generate_synthetic_dataset(dataset_size=6, spatial_dim=model.spatial_dim,
+                                          time_steps=model.time_steps, features=model.features, random_seed=2)
+        expected = model.predict(X)
+        initial_state = generate_initial_state(spatial_dim=model.spatial_dim, features=model.features, random_seed=1)
+        expected_rollout = model.predict_spread(initial_state, 3)
+        scale = np.abs(expected).max()
+        
+        for backend, tolerance in zip(backends, (1e-5, 1e-2, 0.2)):
+            model.set_runner(load_runner(temp_model_dir, backend, batch_size=4))
+            try:
+                np.testing.assert_allclose(model.predict(X), expected, atol=tolerance * scale)
+                np.testing.assert_allclose(model.predict_spread(initial_state, 3), expected_rollout,
+                                           atol=tolerance * scale)
+                with pytest.raises(ValueError):
+                    model.predict_spread(initial_state, 3, incremental=True)
+            finally:
+                model.set_runner(None)
+        
+        report = backend_report(model, [load_runner(temp_model_dir, backend) for backend in backends], X, y,
+                                latency_samples=5)
+        assert [row['backend'] for row in report] == ['keras', *backends]
+        assert report[0]['max_diff'] == 0
+        assert all(row['p99_ms'] >= row['p50_ms'] > 0 for row in report)
+    
+    def test_onnx_backend(self, trained_test_model, temp_model_dir):
+        """Test exporting the model to ONNX and running it with ONNX Runtime."""
+        pytest.importorskip("tf2onnx")
+        pytest.importorskip("onnxruntime")
+        from src.models.inference_backends import export_model, load_runner
+        
+        model = trained_test_model
+        export_model(model, temp_model_dir, ('onnx',))
+        X, _ = generate_synthetic_dataset(dataset_size=3, spatial_dim=model.spatial_dim,
+                                          time_steps=model.time_steps, features=model.features, random_seed=2)
+        
+        np.testing.assert_allclose(load_runner(temp_model_dir, 'onnx').predict(X), model.predict(X),
+                                   rtol=1e-4, atol=1e-6)
+    
+    def test_convlstm_architecture(self, temp_model_dir):
+        """Test training the fully convolutional model on patches and predicting larger grids."""
+        from src.models.inference_backends import export_model, load_runner
+        
+        model = PathogenSpreadModel(spatial_dim=8, time_steps=3, features=5, lstm_units=4, architecture='convlstm')
+        X, y = generate_synthetic_dataset(dataset_size=8, spatial_dim=8, time_steps=3, features=5, random_seed=0)
+        model.train(X[:6], y[:6], X[6:], y[6:], epochs=1, batch_size=2)
+        
+        # The compiled path runs the Keras model's weights on the patch size ...
+        np.testing.assert_allclose(model.predict(X), model.model.predict(X, verbose=0), rtol=1e-4, atol=1e-6)
+        
+        # ... and on any other grid, with weights independent of the grid size
+        larger = PathogenSpreadModel(spatial_dim=32, time_steps=3, features=5, lstm_units=4, architecture='convlstm')
+        assert larger.model.count_params() == model.model.count_params()
+        
+        initial_state = generate_initial_state(spatial_dim=20, features=5, random_seed=1)
+        rollout = model.predict_spread(initial_state, 2)
+        assert rollout.shape == (2, 20, 20, 5)
+        np.testing.assert_allclose(model.predict_spread(initial_state, 2, incremental=True), rollout,
+                                   rtol=1e-4, atol=1e-6)
+        
+        # Exports keep the free grid size
+        export_model(model, temp_model_dir, ('tflite',))
+        X_large, _ = generate_synthetic_dataset(dataset_size=2, spatial_dim=20, time_steps=3, features=5,
+                                                random_seed=2)
+        np.testing.assert_allclose(load_runner(temp_model_dir, 'tflite').predict(X_large), model.predict(X_large),
+                                   rtol=1e-4, atol=1e-5)
+        
+        # The architecture is restored from the saved metadata
+        model_path = os.path.join(temp_model_dir, "convlstm_model.keras")
+        model.save_model(model_path)
+        loaded = PathogenSpreadModel.load_model(model_path)
+        assert loaded.architecture == 'convlstm'
+        np.testing.assert_allclose(loaded.predict_spread(initial_state, 2), rollout, rtol=1e-4, atol=1e-6)
+        
+        with pytest.raises(ValueError):
+            PathogenSpreadModel(architecture='transformer')
+    
+    def test_tiled_prediction(self, trained_test_model, temp_model_dir):
+        """Test predicting a field larger than the model grid with blended tiles."""
+        from src.models.tiled_inference import predict_tiled, tile_offsets
+        
+        model = trained_test_model
+        assert tile_offsets(40, 16, 4) == [0, 12, 24]
+        assert tile_offsets(10, 16, 4) == [0]
+        
+        # A field of one tile is a plain prediction
+        X, _ = generate_synthetic_dataset(dataset_size=1, spatial_dim=model.spatial_dim, time_steps=model.time_steps,
+                                          features=model.features, random_seed=0)
+        np.testing.assert_allclose(predict_tiled(model, X[0]), model.predict(X)[0], rtol=1e-5, atol=1e-6)
+        
+        # The blending weights sum to 1 everywhere, so a model repeating the
+        # last frame reproduces it exactly across the seams and field edges
+        class LastFrameModel:
+            spatial_dim, time_steps, features, architecture = model.spatial_dim, model.time_steps, 5, 'cnn_lstm'
+            
+            def predict(self, batch):
+                return batch[:, -1]
+        
+        field = np.random.default_rng(1).random((model.time_steps, 45, 37, 5)).astype(np.float32)
+        input_path = os.path.join(temp_model_dir, "field.npy")
+        np.save(input_path, field)
+        output_path = os.path.join(temp_model_dir, "prediction.npy")
+        
+        prediction = predict_tiled(LastFrameModel(), input_path, output_path, overlap=6, batch_size=4)
+        assert isinstance(prediction, np.memmap)
+        np.testing.assert_allclose(np.load(output_path), field[-1], rtol=1e-5)
+        
+        # The trained model covers the whole field with finite predictions
+        prediction = predict_tiled(model, field, batch_size=8)
+        assert prediction.shape == (45, 37, 5)
+        assert np.all(np.isfinite(prediction))
+        
+        with pytest.raises(ValueError):
+            predict_tiled(model, field, tile_size=24)
+    
+    def test_prediction_cache(self, trained_test_model):
+        """Test serving repeated rollouts from the prediction cache."""
+        from src.models.prediction_cache import PredictionCache
+        
+        class FakeRedis:
+            def __init__(self):
+                self.data = {}
+            
+            def get(self, key):
+                return self.data.get(key)
+            
+            def set(self, key, value, ex=None):
+                self.data[key] = value
+        
+        model = trained_test_model
+        initial_states = np.stack([
+            generate_initial_state(spatial_dim=model.spatial_dim, features=model.features, random_seed=seed)
+            for seed in range(2)
+        ])
+        expected = model.predict_spread_batch(initial_states, time_steps=3)
+        
+        redis_client = FakeRedis()
+        cache = PredictionCache(redis_client=redis_client)
+        model.set_cache(cache)
+        try:
+            first = model.predict_spread_batch(initial_states, time_steps=3)
+            # The second outbreak is cached by the first call, the first one is new
+            second = model.predict_spread(initial_states[1], 3)
+            horizon = model.predict_spread(initial_states[1], 2)
+        finally:
+            model.set_cache(None)
+        
+        np.testing.assert_allclose(first, expected, rtol=1e-5, atol=1e-6)
+        np.testing.assert_array_equal(second, first[1])
+        np.testing.assert_allclose(horizon, expected[1, :2], rtol=1e-5, atol=1e-6)
+        assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 3
+        assert len(redis_client.data) == 3
+        
+        # A new process finds the rollouts in Redis
+        shared = PredictionCache(redis_client=redis_client)
+        key = shared.make_key(model.model_version(), initial_states[0].astype(np.float32), 3)
+        np.testing.assert_array_equal(shared.get(key, model.model_version()), first[0])
+        assert shared.stats()['redis_hits'] == 1
+        
+        # Swapping the model drops the local entries, and keys differ per version
+        other_key = cache.make_key('other-version', initial_states[0].astype(np.float32), 3)
+        assert cache.get(other_key, 'other-version') is None
+        assert cache.stats()['entries'] == 0 and cache.stats()['invalidations'] == 1
+        
+        # Entries are evicted least recently used first once over the size bound
+        small = PredictionCache(max_bytes=2 * first[0].nbytes)
+        keys = [small.make_key('v', np.full((2, 2), k, dtype=np.float32), 3) for k in range(3)]
+        for k in range(2):
+            small.put(keys[k], 'v', first[0])
+        small.get(keys[0], 'v')
+        small.put(keys[2], 'v', first[0])
+        assert small.get(keys[1], 'v') is None and small.get(keys[0], 'v') is not None
+        assert small.stats()['evictions'] == 1
+    
     def test_model_save_load(self, trained_test_model, temp_model_dir):
         """Test saving and loading the model."""
         model = trained_test_model
@@ -172,3 +421,718 @@ class TestMachineLearningModels:
         """Test converting heatmap to GeoJSON."""
         # Create a simple heatmap
 
+
+
+class TestSpreadSimulation:
+    """Tests for the synthetic spread simulation engines."""
+    
+    @pytest.mark.parametrize("threat_type", ['FUNGAL', 'BACTERIAL'])
+    def test_vectorized_radial_matches_loop(self, threat_type):
+        """Test that the vectorized radial engine reproduces the loop engine."""
+        from src.models.data_generator import RADIAL_ENGINE_TOLERANCE
+        
+        initial_state = generate_initial_state(
+            spatial_dim=24,
+            concentration=0.8,
+            num_points=3,
+            random_seed=2
+        )
+        
+        sequences = [
+            simulate_spread(initial_state, time_steps=4, threat_type=threat_type,
+                            engine=engine, rng=np.random.default_rng(2), dtype='float64')
+            for engine in ('loop', 'vectorized')
+        ]
+        
+        assert sequences[0].shape == sequences[1].shape
+        assert np.max(np.abs(sequences[0] - sequences[1])) <= RADIAL_ENGINE_TOLERANCE
+    
+    def test_vectorized_radial_large_radius(self, monkeypatch):
+        """Test the vectorized engine when spread radii exceed one cell."""
+        from src.models import data_generator
+        
+        behaviors = dict(data_generator.SPREAD_BEHAVIORS)
+        behaviors['FUNGAL'] = dict(behaviors['FUNGAL'], spread_rate=0.9)
+        monkeypatch.setattr(data_generator, 'SPREAD_BEHAVIORS', behaviors)
+        
+        initial_state = generate_initial_state(spatial_dim=24, num_points=3, random_seed=2)
+        loop = simulate_spread(initial_state, 3, 'FUNGAL', engine='loop',
+                               rng=np.random.default_rng(3), dtype='float64')
+        vectorized = simulate_spread(initial_state, 3, 'FUNGAL', engine='vectorized',
+                                     rng=np.random.default_rng(3), dtype='float64')
+        
+        assert np.max(np.abs(loop - vectorized)) <= data_generator.RADIAL_ENGINE_TOLERANCE
+    
+    def test_unknown_engine(self):
+        """Test that an unknown engine name is rejected."""
+        initial_state = generate_initial_state(spatial_dim=24, num_points=3, random_seed=2)
+        
+        with pytest.raises(ValueError):
+            simulate_spread(initial_state, 2, engine='gpu')
+    
+    @pytest.mark.parametrize("threat_type", ['VIRAL', 'PEST'])
+    def test_vectorized_stochastic_patterns(self, threat_type):
+        """Test that the jump and directional engines are seeded and leave global RNG alone."""
+        initial_state = generate_initial_state(spatial_dim=24, concentration=0.9, num_points=3, random_seed=2)
+        
+        np.random.seed(0)
+        global_before = np.random.get_state()[1].copy()
+        first = simulate_spread(initial_state, 5, threat_type, random_seed=11)
+        second = simulate_spread(initial_state, 5, threat_type, random_seed=11)
+        
+        np.testing.assert_array_equal(first, second)
+        np.testing.assert_array_equal(np.random.get_state()[1], global_before)
+        assert np.all(first >= 0) and np.all(first <= 1)
+        
+        # Spread should reach cells that were uninfected at the start
+        assert np.sum(first[-1, :, :, 0] > 0.01) > np.sum(initial_state[:, :, 0] > 0.01)
+    
+    @pytest.mark.parametrize("threat_type", ['FUNGAL', 'BACTERIAL', 'VIRAL', 'PEST'])
+    def test_batch_of_one_matches_single(self, threat_type):
+        """Test that a single-scenario batch reproduces simulate_spread."""
+        from src.models.data_generator import simulate_spread_batch
+        
+        initial_state = generate_initial_state(spatial_dim=24, concentration=0.9, num_points=3, random_seed=2)
+        
+        single = simulate_spread(initial_state, 4, threat_type, rng=np.random.default_rng(5), dtype='float64')
+        batch = simulate_spread_batch(initial_state[np.newaxis], 4, [threat_type],
+                                      rng=np.random.default_rng(5), dtype='float64')
+        
+        np.testing.assert_allclose(batch[0], single, atol=1e-12)
+    
+    def test_mixed_threat_batch(self):
+        """Test batched simulation of scenarios with different threat types."""
+        from src.models.data_generator import simulate_spread_batch
+        
+        initial_states = np.stack([
+            generate_initial_state(spatial_dim=24, concentration=0.9, num_points=3, random_seed=seed)
+            for seed in (2, 15, 20, 23)
+        ])
+        
+        sequences = simulate_spread_batch(
+            initial_states, 5, ['FUNGAL', 'PEST', 'VIRAL', 'BACTERIAL'], random_seed=0
+        )
+        
+        assert sequences.shape == (4, 5, 24, 24, 5)
+        np.testing.assert_array_equal(sequences[:, 0], initial_states)
+        assert np.all(sequences >= 0) and np.all(sequences <= 1)
+        
+        with pytest.raises(ValueError):
+            simulate_spread_batch(initial_states, 5, ['FUNGAL', 'PEST'])
+    
+    def test_batched_dataset_generation(self):
+        """Test generating a synthetic dataset in simulation batches."""
+        np.random.seed(0)
+        X, y = generate_synthetic_dataset(dataset_size=5, spatial_dim=32, time_steps=3, batch_size=2)
+        
+        assert X.shape == (5, 3, 32, 32, 5)
+        assert y.shape == (5, 32, 32, 5)
+        assert not np.any(np.isnan(X))
+    
+    def test_seeded_dataset_independent_of_workers(self):
+        """Test that a root seed gives the same dataset for any number of workers."""
+        X_serial, y_serial = generate_synthetic_dataset(
+            dataset_size=6, spatial_dim=16, time_steps=3, random_seed=123
+        )
+        X_parallel, y_parallel = generate_synthetic_dataset(
+            dataset_size=6, spatial_dim=16, time_steps=3, random_seed=123, workers=2
+        )
+        X_other, _ = generate_synthetic_dataset(
+            dataset_size=6, spatial_dim=16, time_steps=3, random_seed=124
+        )
+        
+        np.testing.assert_array_equal(X_serial, X_parallel)
+        np.testing.assert_array_equal(y_serial, y_parallel)
+        assert not np.array_equal(X_serial, X_other)
+    
+    def test_sharded_dataset_writer(self, temp_model_dir):
+        """Test writing a dataset to shards and reading it back lazily."""
+        from src.models.data_generator import write_synthetic_dataset, ShardedDataset
+        
+        X, y = generate_synthetic_dataset(
+            dataset_size=7, spatial_dim=16, time_steps=3, batch_size=3, random_seed=9
+        )
+        manifest = write_synthetic_dataset(
+            temp_model_dir, dataset_size=7, spatial_dim=16, time_steps=3,
+            shard_size=4, batch_size=3, random_seed=9
+        )
+        
+        assert [shard['num_samples'] for shard in manifest['shards']] == [4, 3]
+        
+        dataset = ShardedDataset(temp_model_dir)
+        assert len(dataset) == 7
+        assert isinstance(dataset.shards[0][0], np.memmap)
+        
+        indices = [6, 0, 3, 4]
+        X_batch, y_batch = dataset.get_batch(indices)
+        np.testing.assert_array_equal(X_batch, X[indices])
+        np.testing.assert_array_equal(y_batch, y[indices])
+    
+    def test_training_from_shards(self, temp_model_dir):
+        """Test training the model from lazily loaded shard batches."""
+        from src.models.data_generator import write_synthetic_dataset, ShardedDataset
+        from src.models.model_trainer import ShardedBatchSequence, split_sharded_dataset
+        
+        write_synthetic_dataset(
+            temp_model_dir, dataset_size=10, spatial_dim=16, time_steps=3, shard_size=4, random_seed=1
+        )
+        dataset = ShardedDataset(temp_model_dir)
+        train_indices, val_indices = split_sharded_dataset(dataset, val_split=0.2)
+        
+        model = PathogenSpreadModel(spatial_dim=16, time_steps=3, features=5, lstm_units=8)
+        history = model.train(
+            X_train=ShardedBatchSequence(dataset, train_indices, batch_size=4),
+            y_train=None,
+            X_val=ShardedBatchSequence(dataset, val_indices, batch_size=4, shuffle=False),
+            y_val=None,
+            epochs=1
+        )
+        
+        assert len(val_indices) == 2
+        assert len(history['loss']) == 1
+    
+    def test_dtype_policy(self):
+        """Test that generated data follows the requested float dtype."""
+        initial_state = generate_initial_state(spatial_dim=16, num_points=2, random_seed=4)
+        sequence = simulate_spread(initial_state, time_steps=3, random_seed=4)
+        
+        assert initial_state.dtype == np.float32
+        assert sequence.dtype == np.float32
+        
+        X32, _ = generate_synthetic_dataset(dataset_size=3, spatial_dim=16, time_steps=3, random_seed=5)
+        X16, y16 = generate_synthetic_dataset(
+            dataset_size=3, spatial_dim=16, time_steps=3, random_seed=5, dtype='float16'
+        )
+        
+        assert X32.dtype == np.float32
+        assert X16.dtype == np.float16 and y16.dtype == np.float16
+        # float16 storage is a rounding of the same float32 simulation
+        np.testing.assert_allclose(X16, X32, atol=1e-3)
+        
+        with pytest.raises(ValueError):
+            generate_initial_state(spatial_dim=16, dtype='int32')
+    
+    def test_float16_shards(self, temp_model_dir):
+        """Test that sharded datasets are stored and read back in float16."""
+        from src.models.data_generator import write_synthetic_dataset, ShardedDataset
+        
+        manifest = write_synthetic_dataset(
+            temp_model_dir, dataset_size=3, spatial_dim=16, time_steps=3, random_seed=6, dtype='float16'
+        )
+        dataset = ShardedDataset(temp_model_dir)
+        X_batch, _ = dataset.get_batch([0, 2])
+        
+        assert manifest['dtype'] == 'float16'
+        assert dataset.shards[0][0].dtype == np.float16
+        assert X_batch.dtype == np.float16
+    
+    def test_disc_falloff_at_grid_edges(self):
+        """Test that disc masks are clipped to the grid and keep row-major order."""
+        from src.models.data_generator import _disc_falloff
+        
+        spatial_dim = 10
+        for x, y, radius in [(0, 0, 3), (9, 4, 5), (5, 5, 2), (2, 9, 12)]:
+            window, mask, falloff = _disc_falloff(np.arange(spatial_dim), x, y, radius)
+            
+            expected = [
+                1 - np.sqrt((i - x) ** 2 + (j - y) ** 2) / radius
+                for i in range(max(0, x - radius), min(spatial_dim, x + radius + 1))
+                for j in range(max(0, y - radius), min(spatial_dim, y + radius + 1))
+                if np.sqrt((i - x) ** 2 + (j - y) ** 2) <= radius
+            ]
+            
+            assert np.zeros((spatial_dim, spatial_dim))[window].shape == mask.shape
+            np.testing.assert_array_equal(falloff, expected)
+    
+    def test_dataset_cache(self, temp_model_dir, monkeypatch):
+        """Test that cached datasets are reused, keyed by parameters and evicted by size."""
+        from src.models import dataset_cache
+        from src.models.dataset_cache import DatasetCache
+        
+        calls = []
+        write = dataset_cache.write_synthetic_dataset
+        monkeypatch.setattr(dataset_cache, 'write_synthetic_dataset',
+                            lambda **kwargs: calls.append(kwargs) or write(**kwargs))
+        
+        cache = DatasetCache(temp_model_dir)
+        params = dict(dataset_size=4, spatial_dim=16, time_steps=3, random_seed=7)
+        first = cache.get_or_create(**params)
+        second = cache.get_or_create(**params, workers=2, shard_size=2)
+        
+        assert len(calls) == 1
+        np.testing.assert_array_equal(first.get_batch(range(4))[0], second.get_batch(range(4))[0])
+        
+        cache.get_or_create(**dict(params, random_seed=8))
+        assert len(calls) == 2 and len(cache.entries()) == 2
+        
+        with pytest.raises(ValueError):
+            cache.get_or_create(**dict(params, random_seed=None))
+        
+        # A budget that fits one dataset keeps only the most recently used one
+        cache.max_bytes = cache.entries()[-1]['bytes']
+        cache.get_or_create(**params)
+        assert [entry['key'] for entry in cache.entries()] == [os.path.basename(first.dataset_dir)]
+    
+    @pytest.mark.parametrize("engine", ['loop', 'vectorized', 'sparse'])
+    def test_streaming_simulation_checkpoint(self, engine, temp_model_dir):
+        """Test that streamed states match simulate_spread and survive a checkpoint."""
+        from src.models.data_generator import SpreadSimulation, iter_spread
+        
+        initial_state = generate_initial_state(spatial_dim=16, concentration=0.9, num_points=3, random_seed=2)
+        expected = simulate_spread(initial_state, 6, 'VIRAL', engine=engine, random_seed=3)
+        
+        streamed = list(iter_spread(initial_state, 6, 'VIRAL', engine=engine, random_seed=3))
+        np.testing.assert_array_equal(np.stack(streamed), expected)
+        
+        simulation = SpreadSimulation(initial_state, 'VIRAL', random_seed=3, engine=engine)
+        for _ in simulation.run(2):
+            pass
+        checkpoint_path = os.path.join(temp_model_dir, 'spread.npz')
+        simulation.checkpoint(checkpoint_path)
+        
+        # Advance the global state to make sure the resumed run does not depend on it
+        np.random.random(100)
+        resumed = SpreadSimulation.resume(checkpoint_path)
+        
+        assert resumed.step == 2
+        np.testing.assert_array_equal(np.stack(list(resumed.run(3))), expected[3:])
+    
+    @pytest.mark.parametrize("threat_type", ['FUNGAL', 'BACTERIAL', 'VIRAL', 'PEST'])
+    def test_sparse_engine_matches_vectorized(self, threat_type):
+        """Test that the sparse engine reproduces the vectorized engine on a mostly empty grid."""
+        from src.models.data_generator import RADIAL_ENGINE_TOLERANCE, SPARSE_SUPPORT_TOLERANCE
+        
+        initial_state = generate_initial_state(spatial_dim=48, concentration=0.9, num_points=2, random_seed=2)
+        
+        vectorized = simulate_spread(initial_state, 6, threat_type, engine='vectorized',
+                                     random_seed=4, dtype='float64')
+        sparse = simulate_spread(initial_state, 6, threat_type, engine='sparse',
+                                 random_seed=4, dtype='float64')
+        
+        assert np.max(np.abs(vectorized - sparse)) <= RADIAL_ENGINE_TOLERANCE + SPARSE_SUPPORT_TOLERANCE
+        assert np.mean(sparse[-1, :, :, 0] > 0) < 1
+    
+    def test_sparse_support_shrinks_after_burnout(self):
+        """Test that the sparse engine drops cells whose concentration has decayed away."""
+        from src.models.data_generator import SpreadSimulation
+        
+        # Concentrations below the spread threshold in unfavorable weather only decay
+        initial_state = np.zeros((32, 32, 5))
+        initial_state[8:16, 8:16, 0] = 0.005
+        initial_state[:, :, 4] = 1.0
+        
+        simulation = SpreadSimulation(initial_state, 'PEST', random_seed=0, engine='sparse', dtype='float64')
+        assert len(simulation.support) == 64
+        
+        for _ in range(120):
+            simulation.advance()
+        
+        assert len(simulation.support) == 0
+        assert np.all(simulation.state[:, :, 0] == 0)
+    
+    @pytest.mark.parametrize("threat_type", ['FUNGAL', 'VIRAL', 'PEST'])
+    def test_tiled_simulation_independent_of_tiling(self, threat_type):
+        """Test that tiled simulations give the same result for any tiling and worker count."""
+        from src.models.data_generator import simulate_spread_tiled
+        
+        initial_state = generate_initial_state(spatial_dim=40, concentration=0.9, num_points=4, random_seed=2)
+        
+        single_tile = simulate_spread_tiled(initial_state, 4, threat_type, random_seed=5, tile_size=40)
+        small_tiles = simulate_spread_tiled(initial_state, 4, threat_type, random_seed=5, tile_size=13)
+        parallel = simulate_spread_tiled(initial_state, 4, threat_type, random_seed=5, tile_size=20, workers=2)
+        
+        np.testing.assert_array_equal(single_tile, small_tiles)
+        np.testing.assert_array_equal(single_tile, parallel)
+        assert not np.array_equal(
+            single_tile, simulate_spread_tiled(initial_state, 4, threat_type, random_seed=6, tile_size=40)
+        )
+    
+    def test_tiled_simulation_follows_vectorized_engine(self):
+        """Test that the deterministic part of a tiled step matches the vectorized engine."""
+        from src.models.data_generator import TiledSpreadSimulation, spread_halo_width
+        
+        initial_state = generate_initial_state(spatial_dim=40, concentration=0.9, num_points=4, random_seed=2)
+        vectorized = simulate_spread(initial_state, 2, 'FUNGAL', random_seed=5)
+        
+        with TiledSpreadSimulation(initial_state, 'FUNGAL', random_seed=5, tile_size=16) as simulation:
+            simulation.advance()
+            # Radial spread and decay are deterministic; only the weather drift is drawn differently
+            np.testing.assert_array_equal(simulation.frame()[:, :, 0], vectorized[1, :, :, 0])
+        
+        assert spread_halo_width() == max(spread_halo_width(name) for name in ['FUNGAL', 'BACTERIAL', 'VIRAL', 'PEST'])
+        with pytest.raises(ValueError):
+            TiledSpreadSimulation(initial_state, 'VIRAL', halo=spread_halo_width('VIRAL') - 1)
+    
+    def test_gaussian_environment_fields(self):
+        """Test that Gaussian fields have unit variance and the configured correlation length."""
+        from src.models.data_generator import GaussianEnvironment
+        
+        environment = GaussianEnvironment((128, 128), correlation_length=4.0)
+        fields = environment.field(np.random.default_rng(0), (32,))
+        
+        assert fields.shape == (32, 128, 128)
+        assert abs(fields.var() - 1) < 0.1
+        correlation = np.mean(fields * np.roll(fields, 4, axis=-1)) / fields.var()
+        assert abs(correlation - np.exp(-0.5)) < 0.05
+    
+    @pytest.mark.parametrize("engine", ['loop', 'vectorized', 'sparse'])
+    def test_gaussian_environment_simulation(self, engine, temp_model_dir):
+        """Test seeded simulations with the correlated environment model."""
+        from src.models.data_generator import SpreadSimulation
+        
+        initial_state = generate_initial_state(spatial_dim=32, environment='gaussian', random_seed=1)
+        np.testing.assert_array_equal(
+            initial_state, generate_initial_state(spatial_dim=32, environment='gaussian', random_seed=1)
+        )
+        
+        # Neighbouring cells share their weather
+        temperature = initial_state[:, :, 1]
+        assert np.corrcoef(temperature[:, :-1].ravel(), temperature[:, 1:].ravel())[0, 1] > 0.9
+        
+        expected = simulate_spread(initial_state, 6, 'VIRAL', engine=engine, random_seed=3, environment='gaussian')
+        assert expected.min() >= 0 and expected.max() <= 1
+        
+        # The drift of the previous step is part of the checkpoint
+        simulation = SpreadSimulation(initial_state, 'VIRAL', random_seed=3, engine=engine, environment='gaussian')
+        for _ in simulation.run(2):
+            pass
+        checkpoint_path = os.path.join(temp_model_dir, 'spread.npz')
+        simulation.checkpoint(checkpoint_path)
+        resumed = SpreadSimulation.resume(checkpoint_path)
+        
+        np.testing.assert_array_equal(np.stack(list(resumed.run(3))), expected[3:])
+    
+    def test_unknown_environment(self):
+        """Test that unknown environment models are rejected."""
+        with pytest.raises(ValueError):
+            generate_initial_state(spatial_dim=8, environment='uniform')
+    
+    def test_ensemble_accumulator_statistics(self):
+        """Test the streaming ensemble statistics against exact ones."""
+        from src.models.ensemble_forecast import EnsembleAccumulator
+        
+        rng = np.random.default_rng(0)
+        peaks = rng.random((400, 3, 4)) * (rng.random((400, 3, 4)) > 0.3)
+        
+        accumulator = EnsembleAccumulator((3, 4), thresholds=(0.5,), num_bins=200)
+        accumulator.update(peaks[:150])
+        accumulator.update(peaks[150:])
+        
+        np.testing.assert_allclose(accumulator.exceedance_probabilities()[0], np.mean(peaks > 0.5, axis=0))
+        np.testing.assert_allclose(accumulator.mean(), peaks.mean(axis=0))
+        np.testing.assert_allclose(
+            accumulator.quantiles([0.1, 0.5, 0.9]), np.quantile(peaks, [0.1, 0.5, 0.9], axis=0), atol=1 / 100
+        )
+    
+    def test_ensemble_forecast(self):
+        """Test that ensemble forecasts are reproducible heatmaps that stop once converged."""
+        from src.models.data_generator import simulate_spread_batch
+        from src.models.ensemble_forecast import ensemble_forecast
+        
+        initial_state = generate_initial_state(spatial_dim=16, concentration=0.8, num_points=2, random_seed=1)
+        forecast = ensemble_forecast(initial_state, 5, 'VIRAL', max_realizations=400, batch_size=40,
+                                     tolerance=0.05, random_seed=0)
+        
+        assert forecast['probability'].shape == (16, 16)
+        assert forecast['probability'].min() >= 0 and forecast['probability'].max() <= 1
+        assert forecast['converged'] and forecast['num_realizations'] < 400
+        assert np.all(forecast['quantiles'][0.05] <= forecast['quantiles'][0.95])
+        
+        repeated = ensemble_forecast(initial_state, 5, 'VIRAL', max_realizations=400, batch_size=40,
+                                     tolerance=0.05, random_seed=0)
+        np.testing.assert_array_equal(forecast['probability'], repeated['probability'])
+        
+        geojson = convert_to_geojson(forecast['probability'], origin_lat=40.0, origin_lon=-100.0)
+        assert len(geojson['features']) == np.count_nonzero(forecast['probability'])
+        
+        # The peak is taken over the forecast steps only, as in generate_probability_heatmap
+        single = ensemble_forecast(initial_state, 5, 'VIRAL', max_realizations=40, batch_size=40, random_seed=0)
+        sequences = simulate_spread_batch(
+            np.broadcast_to(initial_state, (40,) + initial_state.shape), 5, 'VIRAL',
+            rng=np.random.default_rng(np.random.SeedSequence(0).spawn(1)[0])
+        )
+        peaks = np.clip(sequences[:, 1:, :, :, 0].max(axis=1), 0, 1)
+        np.testing.assert_allclose(single['mean'], peaks.mean(axis=0), rtol=1e-5, atol=1e-6)
+        
+        with pytest.raises(ValueError):
+            ensemble_forecast(initial_state, 1, 'VIRAL')
+        with pytest.raises(ValueError):
+            ensemble_forecast(initial_state, 5, 'VIRAL', max_realizations=0)
+        with pytest.raises(ValueError):
+            ensemble_forecast(initial_state, 5, 'VIRAL', batch_size=0)
+    
+    def test_spread_behavior_files(self, temp_model_dir, monkeypatch):
+        """Test that saved spread behaviors are loaded into the generator."""
+        from src.models import data_generator
+        
+        monkeypatch.setattr(data_generator, 'SPREAD_BEHAVIORS', dict(data_generator.SPREAD_BEHAVIORS))
+        # Restored after the test, since loading exports the file path
+        monkeypatch.setenv(data_generator.SPREAD_BEHAVIORS_ENV, '')
+        
+        behaviors = {'FUNGAL': dict(data_generator.SPREAD_BEHAVIORS['FUNGAL'], spread_rate=0.4)}
+        path = os.path.join(temp_model_dir, 'behaviors.json')
+        saved = data_generator.save_spread_behaviors(path, behaviors)
+        loaded = data_generator.load_spread_behaviors(path)
+        
+        assert loaded['version'] == saved['version'] == data_generator.spread_behaviors_version(behaviors)
+        assert data_generator.SPREAD_BEHAVIORS['FUNGAL']['spread_rate'] == 0.4
+        assert data_generator.SPREAD_BEHAVIORS['VIRAL'] == data_generator.DEFAULT_SPREAD_BEHAVIORS['VIRAL']
+        assert os.environ[data_generator.SPREAD_BEHAVIORS_ENV] == os.path.abspath(path)
+        
+        # Batched simulations use the loaded behaviors unless given their own
+        initial_state = generate_initial_state(spatial_dim=16, concentration=0.8, num_points=2, random_seed=1)
+        simulated = data_generator.simulate_spread_batch(initial_state[None], 4, 'FUNGAL', random_seed=0)
+        np.testing.assert_array_equal(simulated, data_generator.simulate_spread_batch(
+            initial_state[None], 4, 'FUNGAL', random_seed=0, behaviors=[behaviors['FUNGAL']]
+        ))
+        assert not np.array_equal(simulated, data_generator.simulate_spread_batch(
+            initial_state[None], 4, 'FUNGAL', random_seed=0,
+            behaviors=[data_generator.DEFAULT_SPREAD_BEHAVIORS['FUNGAL']]
+        ))
+    
+    def test_calibration_recovers_observed_spread(self):
+        """Test that calibration fits observed outbreaks better than the default parameters."""
+        from src.models.data_generator import SPREAD_BEHAVIORS, simulate_spread_batch
+        from src.models.calibration import CALIBRATED_PARAMETERS, _evaluate_candidates, calibrate_threat_type
+        
+        initial_states = np.stack([
+            generate_initial_state(spatial_dim=16, concentration=0.8, num_points=2, random_seed=seed)
+            for seed in range(2)
+        ])
+        true_behavior = dict(SPREAD_BEHAVIORS['FUNGAL'], spread_rate=0.35, intensity_decay=0.25)
+        observed = simulate_spread_batch(
+            initial_states, 6, 'FUNGAL', random_seed=9, dtype='float64', behaviors=[true_behavior] * 2
+        )[:, 1:, :, :, 0]
+        
+        result = calibrate_threat_type('FUNGAL', initial_states, observed, iterations=8,
+                                       population_size=32, random_seed=0)
+        
+        default = np.array([[SPREAD_BEHAVIORS['FUNGAL'][name] for name in CALIBRATED_PARAMETERS]])
+        default_loss = _evaluate_candidates(('FUNGAL', default, initial_states, observed, 2, np.random.SeedSequence(0)))
+        assert result['loss'] < 0.2 * default_loss[0]
+        assert result['behavior']['pattern'] == 'radial'
+        assert result['candidates_evaluated'] == 32 * len(result['history'])
+        
+        with pytest.raises(ValueError):
+            calibrate_threat_type('FUNGAL', initial_states, observed, iterations=0)
+        with pytest.raises(ValueError):
+            calibrate_threat_type('FUNGAL', initial_states, observed, population_size=1)
+        with pytest.raises(ValueError):
+            calibrate_threat_type('FUNGAL', initial_states, observed, batch_size=0)
+    
+    def test_susceptibility_raster_window(self, temp_model_dir):
+        """Test that susceptibility rasters are opened as read-only memory-mapped windows."""
+        from src.models.data_generator import load_susceptibility_raster
+        
+        crop_types = np.arange(100, dtype=np.uint8).reshape(10, 10) % 4
+        npy_path = os.path.join(temp_model_dir, 'crops.npy')
+        raw_path = os.path.join(temp_model_dir, 'crops.bin')
+        np.save(npy_path, crop_types)
+        crop_types.tofile(raw_path)
+        
+        window = load_susceptibility_raster(npy_path, window=(2, 3, 4, 5))
+        assert isinstance(window, np.memmap) and not window.flags.writeable
+        np.testing.assert_array_equal(window, crop_types[2:6, 3:8])
+        
+        hosts = load_susceptibility_raster(raw_path, window=(2, 3, 4, 5), shape=(10, 10), dtype='uint8',
+                                           host_classes=[1, 2])
+        np.testing.assert_array_equal(hosts, np.isin(crop_types[2:6, 3:8], [1, 2]))
+    
+    @pytest.mark.parametrize("threat_type", ['FUNGAL', 'VIRAL', 'PEST'])
+    def test_susceptibility_limits_spread_to_hosts(self, threat_type, temp_model_dir):
+        """Test that non-host cells are never infected and the sparse engine still matches."""
+        from src.models.data_generator import RADIAL_ENGINE_TOLERANCE, SPARSE_SUPPORT_TOLERANCE, SpreadSimulation
+        
+        hosts = np.random.default_rng(0).random((6, 6)) < 0.4
+        susceptibility = np.kron(hosts, np.ones((5, 5)))
+        susceptibility[susceptibility > 0] = 0.8
+        
+        initial_state = generate_initial_state(spatial_dim=30, concentration=0.9, num_points=3, random_seed=2,
+                                               dtype='float64', susceptibility=susceptibility)
+        assert initial_state[:, :, 0].max() > 0
+        
+        sequences = {
+            engine: simulate_spread(initial_state, 5, threat_type, random_seed=3, engine=engine,
+                                    dtype='float64', susceptibility=susceptibility)
+            for engine in ['vectorized', 'sparse']
+        }
+        assert np.all(sequences['sparse'][:, susceptibility == 0, 0] == 0)
+        np.testing.assert_allclose(sequences['sparse'], sequences['vectorized'],
+                                   atol=RADIAL_ENGINE_TOLERANCE + SPARSE_SUPPORT_TOLERANCE)
+        
+        # The raster is part of the checkpoint
+        simulation = SpreadSimulation(initial_state, threat_type, random_seed=3, engine='sparse',
+                                      dtype='float64', susceptibility=susceptibility)
+        simulation.advance()
+        checkpoint_path = os.path.join(temp_model_dir, 'spread.npz')
+        simulation.checkpoint(checkpoint_path)
+        resumed = SpreadSimulation.resume(checkpoint_path)
+        np.testing.assert_array_equal(np.stack(list(resumed.run(3))), sequences['sparse'][2:])
+    
+    @pytest.mark.parametrize("transform", range(8))
+    def test_dihedral_transform_commutes_with_spread(self, transform):
+        """Test that transforming a state and simulating it matches simulating and transforming."""
+        from src.models.augmentation import dihedral_transform
+        from src.models.data_generator import _spread_step
+        
+        state = generate_initial_state(spatial_dim=24, concentration=0.9, num_points=3, random_seed=4, dtype='float64')
+        
+        # The radial pattern is exactly symmetric (the weather drift is random noise either way)
+        expected = dihedral_transform(_spread_step(state, 'FUNGAL', 'vectorized', np.random.default_rng(0)), transform)
+        actual = _spread_step(dihedral_transform(state, transform), 'FUNGAL', 'vectorized', np.random.default_rng(0))
+        np.testing.assert_array_equal(actual[:, :, 0], expected[:, :, 0])
+        
+        # Wind keeps pointing at the same transformed neighbour: the cell downwind
+        # of (12, 12) is marked, transformed, and looked up from the transformed wind
+        marker = np.zeros((24, 24, 1))
+        marker[12, 12, 0], marker[14, 12, 0] = 1, 2
+        transformed = dihedral_transform(marker, transform, wind_channel=None)[:, :, 0]
+        downwind = np.argwhere(transformed == 2)[0] - np.argwhere(transformed == 1)[0]
+        
+        wind_state = np.zeros((24, 24, 5))  # Wind direction 0 points along +rows
+        angle = 2 * np.pi * dihedral_transform(wind_state, transform)[0, 0, 3]
+        np.testing.assert_allclose(2 * np.array([np.cos(angle), np.sin(angle)]), downwind, atol=1e-12)
+    
+    def test_augmented_batch_sequence(self):
+        """Test that augmented batches hold a consistent dihedral transform of every sample."""
+        from src.models.augmentation import dihedral_transform
+        from src.models.model_trainer import ArrayDataset, ShardedBatchSequence
+        
+        X, y = generate_synthetic_dataset(dataset_size=6, spatial_dim=8, time_steps=3, random_seed=0)
+        X_original = X.copy()
+        sequence = ShardedBatchSequence(ArrayDataset(X, y), np.arange(6), batch_size=6, shuffle=False,
+                                        augment=True, random_seed=1)
+        X_batch, y_batch = sequence[0]
+        
+        assert X_batch.shape == X.shape and y_batch.shape == y.shape
+        for k in range(6):
+            matches = [
+                t for t in range(8)
+                if np.allclose(dihedral_transform(X[k], t), X_batch[k])
+                and np.allclose(dihedral_transform(y[k], t), y_batch[k])
+            ]
+            assert matches
+        
+        # The stored samples are not modified
+        np.testing.assert_array_equal(X, X_original)
+    
+    def test_batch_sequence_order_follows_seed(self):
+        """Test that the seed reproduces the shuffled batch order independently of the global state."""
+        from src.models.model_trainer import ArrayDataset, ShardedBatchSequence
+        
+        X, y = generate_synthetic_dataset(dataset_size=16, spatial_dim=8, time_steps=3, random_seed=0)
+        orders = []
+        for global_seed in (0, 1):
+            np.random.seed(global_seed)
+            sequence = ShardedBatchSequence(ArrayDataset(X, y), np.arange(16), batch_size=4, random_seed=3)
+            sequence.on_epoch_end()
+            orders.append(sequence.indices.copy())
+        
+        np.testing.assert_array_equal(orders[0], orders[1])
+    
+    @pytest.mark.parametrize("threat_type", ["FUNGAL", "VIRAL", "PEST"])
+    def test_adaptive_simulation_fully_refined_matches_tiled(self, threat_type):
+        """Test that an adaptive simulation with every block refined matches the tiled simulation."""
+        from src.models.data_generator import AdaptiveSpreadSimulation, simulate_spread_tiled
+        
+        initial_state = generate_initial_state(spatial_dim=64, num_points=3, random_seed=2)
+        simulation = AdaptiveSpreadSimulation(initial_state, threat_type, block_size=16,
+                                              gradient_threshold=-1, random_seed=3)
+        simulation.advance(5)
+        
+        assert simulation.refined_fraction == 1
+        np.testing.assert_array_equal(
+            simulation.frame(), simulate_spread_tiled(initial_state, 6, threat_type, random_seed=3, tile_size=16)
+        )
+    
+    def test_adaptive_simulation_refines_around_outbreak(self):
+        """Test that fine blocks follow the outbreak and coarse blocks resample to their mean."""
+        from src.models.data_generator import AdaptiveSpreadSimulation, simulate_spread_tiled
+        
+        initial_state = generate_initial_state(spatial_dim=256, num_points=1, random_seed=1)
+        simulation = AdaptiveSpreadSimulation(initial_state, 'VIRAL', block_size=16, random_seed=3)
+        initial_fraction = simulation.refined_fraction
+        simulation.advance(20)
+        
+        # The outbreak grows, but most of the domain stays coarse
+        assert initial_fraction < simulation.refined_fraction < 0.25
+        infected = np.argwhere(simulation.frame()[:, :, 0] > 0) // 16
+        assert all((int(bi), int(bj)) in simulation.blocks for bi, bj in infected)
+        
+        # Coarse blocks away from the outbreak never see it, so the fine
+        # blocks reproduce the tiled simulation
+        np.testing.assert_array_equal(
+            simulation.frame()[:, :, 0],
+            simulate_spread_tiled(initial_state, 21, 'VIRAL', random_seed=3, tile_size=64)[:, :, 0]
+        )
+        
+        coarse = simulation.resample(cell_size=16)
+        assert coarse.shape == (16, 16, 5)
+        np.testing.assert_allclose(coarse, simulation.coarse, rtol=1e-5, atol=1e-6)
+        np.testing.assert_allclose(
+            simulation.resample(window=(32, 96, 64, 128), cell_size=4),
+            simulation.frame()[32:96, 64:128].reshape(16, 4, 16, 4, 5).mean(axis=(1, 3)),
+            rtol=1e-5, atol=1e-6
+        )
+    
+    def test_adaptive_simulation_coarsens_uniform_regions(self):
+        """Test that uniform regions are coarsened and follow the mean-field spread."""
+        from src.models.data_generator import (
+            SPREAD_BEHAVIORS, AdaptiveSpreadSimulation, _uniform_spread_gain, calculate_favorability
+        )
+        
+        initial_state = np.full((64, 64, 5), 0.5)
+        initial_state[:, :, 0] = 0.2
+        simulation = AdaptiveSpreadSimulation(initial_state, 'FUNGAL', block_size=16, dtype='float64')
+        assert not simulation.blocks
+        
+        simulation.advance(1)
+        favorability = calculate_favorability('FUNGAL', np.array(0.5), np.array(0.5), np.array(0.5))
+        gain = _uniform_spread_gain('FUNGAL', np.array(0.2), favorability)
+        decay = 1 - SPREAD_BEHAVIORS['FUNGAL']['intensity_decay'] * (1 - favorability)
+        np.testing.assert_allclose(simulation.frame()[:, :, 0], np.clip((0.2 + gain) * decay, 0, 1))
+        
+        with pytest.raises(ValueError):
+            AdaptiveSpreadSimulation(np.zeros((40, 40, 5)), block_size=16)
+        with pytest.raises(ValueError):
+            AdaptiveSpreadSimulation(np.zeros((64, 64, 5)), 'VIRAL', block_size=8)
+    
+    def test_sliding_window_samples(self, temp_model_dir):
+        """Test that every window of a simulated sequence becomes a sample."""
+        from src.models.data_generator import sequence_windows, write_synthetic_dataset, ShardedDataset
+        
+        sequences = np.arange(2 * 6 * 2 * 2 * 1, dtype=np.float32).reshape(2, 6, 2, 2, 1)
+        X_windows, y_windows = sequence_windows(sequences, 3)
+        assert X_windows.shape == (2, 3, 3, 2, 2, 1) and y_windows.shape == (2, 3, 2, 2, 1)
+        assert np.shares_memory(X_windows, sequences) and np.shares_memory(y_windows, sequences)
+        np.testing.assert_array_equal(X_windows[1, 2], sequences[1, 2:5])
+        np.testing.assert_array_equal(y_windows[1, 2], sequences[1, 5])
+        
+        X, y = generate_synthetic_dataset(
+            dataset_size=10, spatial_dim=16, time_steps=3, batch_size=2, random_seed=4, windows_per_sequence=4
+        )
+        assert X.shape == (10, 3, 16, 16, 5) and y.shape == (10, 16, 16, 5)
+        # Consecutive windows of one sequence overlap by all but one frame
+        np.testing.assert_array_equal(X[1, :-1], X[0, 1:])
+        np.testing.assert_array_equal(X[1, -1], y[0])
+        
+        manifest = write_synthetic_dataset(
+            temp_model_dir, dataset_size=10, spatial_dim=16, time_steps=3, shard_size=3,
+            batch_size=2, workers=2, random_seed=4, windows_per_sequence=4
+        )
+        assert manifest['windows_per_sequence'] == 4
+        
+        X_shards, y_shards = ShardedDataset(temp_model_dir).get_batch(np.arange(10))
+        np.testing.assert_array_equal(X_shards, X)
+        np.testing.assert_array_equal(y_shards, y)
+        
+        # The windows of one simulation stay on one side of the split
+        from src.models.model_trainer import split_sequence_groups, split_sharded_dataset
+        
+        train_indices, val_indices = split_sharded_dataset(ShardedDataset(temp_model_dir), val_split=0.4)
+        np.testing.assert_array_equal(train_indices, np.arange(8))
+        np.testing.assert_array_equal(val_indices, [8, 9])
+        
+        train_indices, val_indices = split_sequence_groups(10, 0.4, 4, rng=np.random.default_rng(0))
+        assert sorted(np.concatenate([train_indices, val_indices])) == list(range(10))
+        assert not set(train_indices // 4) & set(val_indices // 4)